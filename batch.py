@@ -0,0 +1,154 @@
+import argparse
+import os
+import sys
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Deque, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from evaluation.expr import RuntimeException
+from evaluation.type_checker import TypeException
+from parsing.lexer import LexerException
+from parsing.parser import ParserException
+from repl import evaluator_engines, lexer_engines, load, parser_engines, program_cache, read_expressions
+
+DEFAULT_CHUNK_SIZE = 1000
+
+# (value, None) or (None, formatted error)
+Result = Tuple[Any, Optional[str]]
+
+
+class BatchOptions:
+    def __init__(self, lexer: str, parser: str, evaluator: str, optimize: bool, cache: bool, check: bool = False) -> None:
+        self.lexer = lexer
+        self.parser = parser
+        self.evaluator = evaluator
+        self.optimize = optimize
+        self.cache = cache
+        self.check = check
+
+
+# set once per worker process by initialize_worker so tasks only carry their inputs
+worker_options: Optional[BatchOptions] = None
+
+
+def initialize_worker(options: BatchOptions):
+    global worker_options
+    worker_options = options
+
+
+def evaluate_one(input: str, options: BatchOptions) -> Result:
+    try:
+        cache = program_cache if options.cache else None
+        program = load(input, options.lexer, options.parser, options.evaluator, options.optimize, cache, check=options.check)
+        return program(), None
+    except (LexerException, ParserException, RuntimeException, TypeException) as e:
+        return None, str(e)
+    except Exception as e:
+        # e.g. division by zero, one bad item shouldn't stop the batch
+        return None, '{}: {}'.format(type(e).__name__, e)
+
+
+def evaluate_chunk(inputs: List[str], options: Optional[BatchOptions] = None) -> List[Result]:
+    if options is None:
+        options = worker_options
+    return [evaluate_one(input, options) for input in inputs]
+
+
+def chunks(inputs: Iterable[str], size: int) -> Iterator[List[str]]:
+    chunk: List[str] = []
+    for input in inputs:
+        chunk.append(input)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+
+    if chunk:
+        yield chunk
+
+
+def evaluate_batch(inputs: Iterable[str], workers: Optional[int] = None, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                   lexer: str = 'char', parser: str = 'recursive', evaluator: str = 'recursive', optimize: bool = False,
+                   cache: bool = False, check: bool = False) -> Iterator[Result]:
+    # Evaluates independent expressions across a pool of processes and yields one result per input, in input order.
+    # Inputs are sent in chunks of `chunk_size` so each task is a single list of strings each way, and only a couple of
+    # chunks per worker are in flight at once so inputs can be streamed without holding all of them in memory.
+    # workers=1 evaluates in this process. With `check` inputs which are certain to fail are reported without being
+    # evaluated.
+    options = BatchOptions(lexer, parser, evaluator, optimize, cache, check)
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    if workers <= 1:
+        for chunk in chunks(inputs, chunk_size):
+            yield from evaluate_chunk(chunk, options)
+        return
+
+    with ProcessPoolExecutor(workers, initializer=initialize_worker, initargs=(options,)) as executor:
+        pending: Deque[Future] = deque()
+        try:
+            for chunk in chunks(inputs, chunk_size):
+                pending.append(executor.submit(evaluate_chunk, chunk))
+                if len(pending) >= workers * 2:
+                    yield from pending.popleft().result()
+
+            while pending:
+                yield from pending.popleft().result()
+        finally:
+            # only matters when the caller stops early
+            for future in pending:
+                future.cancel()
+
+
+def run(lines: Iterable[str], output: TextIO, workers: Optional[int] = None, chunk_size: int = DEFAULT_CHUNK_SIZE,
+        lexer: str = 'char', parser: str = 'recursive', evaluator: str = 'recursive', optimize: bool = False,
+        cache: bool = False, check: bool = False) -> int:
+    # Writes the same lines as repl.run, one result per non blank line and errors prefixed with their line, and
+    # returns how many failed. The line numbers are queued as the inputs are read since results come back in order.
+    numbers: Deque[int] = deque()
+
+    def inputs() -> Iterator[str]:
+        for number, input in read_expressions(lines):
+            numbers.append(number)
+            yield input
+
+    errors = 0
+    for value, error in evaluate_batch(inputs(), workers, chunk_size, lexer, parser, evaluator, optimize, cache, check):
+        number = numbers.popleft()
+        if error is None:
+            output.write('{}\n'.format(value))
+        else:
+            errors += 1
+            output.write('line {}: {}\n'.format(number, error))
+    output.flush()
+    return errors
+
+
+def parse_arguments(arguments: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='Evaluates lox expressions, one per line, across a pool of processes')
+    parser.add_argument('file', nargs='?', default='-', help='file to evaluate, \'-\' or omitted for stdin')
+    parser.add_argument('--workers', type=int, help='processes to evaluate with, defaults to the number of CPUs')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help='expressions sent to a worker at once')
+    parser.add_argument('--lexer', choices=lexer_engines.keys(), default='char')
+    parser.add_argument('--parser', choices=parser_engines.keys(), default='recursive')
+    parser.add_argument('--evaluator', choices=evaluator_engines.keys(), default='recursive')
+    parser.add_argument('--optimize', action='store_true', help='fold constants before evaluating')
+    parser.add_argument('--cache', action='store_true', help='reuse the programs of repeated expressions within a worker')
+    parser.add_argument('--check', action='store_true',
+                        help='type check each expression and report the first operand which can never be what its operator '
+                             'needs instead of evaluating it')
+    return parser.parse_args(arguments)
+
+
+def run_file(arguments: argparse.Namespace) -> int:
+    options = (arguments.workers, arguments.chunk_size, arguments.lexer, arguments.parser, arguments.evaluator,
+               arguments.optimize, arguments.cache, arguments.check)
+    if arguments.file == '-':
+        errors = run(sys.stdin, sys.stdout, *options)
+    else:
+        with open(arguments.file) as lines:
+            errors = run(lines, sys.stdout, *options)
+    return 0 if errors == 0 else 1
+
+
+if __name__ == '__main__':
+    sys.exit(run_file(parse_arguments()))
@@ -0,0 +1,70 @@
+# Times variable heavy programs whose statements sit at increasing depths of nested blocks, every statement reads
+# variables from the outermost, middle and innermost scopes. Resolved (depth, slot) bindings don't walk the scopes, so
+# the median time per statement shouldn't grow with the nesting, single runs vary by about a third either way here so
+# compare medians rather than the best times.
+#
+#   python -m benchmarks.scope_depth
+import statistics
+import time
+from typing import List, Tuple
+
+from evaluation.interpreter import Interpreter
+from evaluation.resolver import Resolver
+from parsing.parser import Parser
+from parsing.regex_lexer import get_token_buffer
+from parsing.stmt import Stmt
+
+DEPTHS = [1, 8, 32, 128, 256, 1024]
+STATEMENTS = 2000
+REPEATS = 50
+
+
+def generate(depth: int, statements: int) -> str:
+    lines = ['var v0 = 1;']
+    for level in range(1, depth):
+        lines.append('{')
+        lines.append('var v{} = {};'.format(level, level + 1))
+
+    middle = depth // 2
+    inner = depth - 1
+    lines.append('var x = 0;')
+    lines.append('var y = 1;')
+    for i in range(statements):
+        if i % 2:
+            lines.append('x = x + y * v0 - v{};'.format(middle))
+        else:
+            lines.append('y = y + v{} / 2 - v0;'.format(inner))
+    lines.append('x;')
+
+    lines.extend('}' * (depth - 1))
+    return '\n'.join(lines)
+
+
+def compile(source: str) -> List[Stmt]:
+    program = Parser(get_token_buffer(source)).parse()
+    Resolver().resolve(program)
+    return program
+
+
+def measure(program: List[Stmt]) -> Tuple[float, float]:
+    # (best, median) of REPEATS runs after a warm-up, single runs are too noisy to compare depths
+    Interpreter().execute(program)
+
+    timings: List[float] = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        Interpreter().execute(program)
+        timings.append(time.perf_counter() - start)
+
+    return min(timings), statistics.median(timings)
+
+
+def main():
+    print('{:>6} {:>12} {:>14} {:>16}'.format('depth', 'best (ms)', 'median (ms)', 'median/stmt (us)'))
+    for depth in DEPTHS:
+        best, median = measure(compile(generate(depth, STATEMENTS)))
+        print('{:>6} {:>12.2f} {:>14.2f} {:>16.3f}'.format(depth, best * 1e3, median * 1e3, median / STATEMENTS * 1e6))
+
+
+if __name__ == '__main__':
+    main()
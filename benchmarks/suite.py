@@ -0,0 +1,201 @@
+# Times lexing, parsing and evaluating each of the generated workloads separately and measures what each phase
+# allocates, printing a table and optionally writing the results as JSON. A previous run's JSON can be passed with
+# --compare to flag phases which got slower or allocate more, the exit status is 1 when any did.
+#
+#   python -m benchmarks.suite --output before.json
+#   python -m benchmarks.suite --compare before.json
+#
+# Timings are the best of --repeats runs after a warm-up, the minimum is the least affected by whatever else the
+# machine is doing. Allocations are measured in a separate run under tracemalloc as it slows everything down.
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from benchmarks.workloads import default_sizes, generate, workloads
+from repl import evaluator_engines, lexer_engines, parser_engines, parse, prepare, tokenize
+
+FORMAT_VERSION = 1
+PHASES = ['lex', 'parse', 'evaluate']
+DEFAULT_REPEATS = 10
+# relative change in time, or allocated bytes, that counts as a regression
+DEFAULT_THRESHOLD = 0.10
+# changes in peak memory smaller than this are noise from tracemalloc's own bookkeeping
+MIN_BYTES_CHANGE = 4096
+
+Measurement = Dict[str, Any]
+
+
+def time_phase(run: Callable[[], Any], repeats: int) -> Tuple[float, float]:
+    run()
+
+    timings: List[float] = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - start)
+
+    return min(timings), statistics.median(timings)
+
+
+def trace_phase(run: Callable[[], Any]) -> Tuple[int, int, int]:
+    # (peak bytes, bytes and blocks still held by the result) of one run. Tracing starts right before the run so the
+    # peak and everything still traced afterwards belong to it, tracemalloc.reset_peak only exists from python 3.9
+    tracemalloc.start()
+    try:
+        result = run()
+        _, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+
+    traced = after.statistics('filename')
+    del result
+    return peak, sum(statistic.size for statistic in traced), sum(statistic.count for statistic in traced)
+
+
+def measure_phase(run: Callable[[], Any], repeats: int) -> Measurement:
+    best, median = time_phase(run, repeats)
+    peak, retained_bytes, retained_blocks = trace_phase(run)
+    return {
+        'best': best,
+        'median': median,
+        'peak_bytes': peak,
+        'retained_bytes': retained_bytes,
+        'retained_blocks': retained_blocks,
+    }
+
+
+def measure_workload(source: str, lexer: str, parser: str, evaluator: str, repeats: int) -> Dict[str, Measurement]:
+    tokens = tokenize(source, lexer)
+    expr = parse(tokens, parser)
+    program = prepare(expr, evaluator)
+
+    return {
+        'lex': measure_phase(lambda: tokenize(source, lexer), repeats),
+        'parse': measure_phase(lambda: parse(tokens, parser), repeats),
+        'evaluate': measure_phase(program, repeats),
+    }
+
+
+def run_suite(names: List[str], lexer: str = 'char', parser: str = 'recursive', evaluator: str = 'recursive',
+              repeats: int = DEFAULT_REPEATS, scale: float = 1.0, seed: int = 0) -> Dict[str, Any]:
+    results: Dict[str, Any] = {}
+    for name in names:
+        size = max(1, int(default_sizes[name] * scale))
+        source = generate(name, size, seed)
+        results[name] = {
+            'size': size,
+            'characters': len(source),
+            'phases': measure_workload(source, lexer, parser, evaluator, repeats),
+        }
+
+    return {
+        'version': FORMAT_VERSION,
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'engines': {'lexer': lexer, 'parser': parser, 'evaluator': evaluator},
+        'repeats': repeats,
+        'scale': scale,
+        'seed': seed,
+        'workloads': results,
+    }
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float = DEFAULT_THRESHOLD) -> List[str]:
+    # describes every phase whose best time or peak memory grew by more than `threshold`, only workloads and phases in
+    # both runs are compared and runs of different inputs or engines aren't comparable at all
+    for setting in ['version', 'engines', 'scale', 'seed']:
+        if baseline.get(setting) != current.get(setting):
+            raise ValueError('Can\'t compare runs with different {}: {} and {}'.format(
+                setting, baseline.get(setting), current.get(setting)))
+
+    regressions: List[str] = []
+    for name, workload in current['workloads'].items():
+        previous = baseline['workloads'].get(name)
+        if previous is None:
+            continue
+
+        for phase, measurement in workload['phases'].items():
+            before = previous['phases'].get(phase)
+            if before is None:
+                continue
+
+            for metric in ['best', 'peak_bytes']:
+                if metric == 'peak_bytes' and measurement[metric] - before[metric] < MIN_BYTES_CHANGE:
+                    continue
+                if before[metric] > 0 and measurement[metric] > before[metric] * (1 + threshold):
+                    regressions.append('{} {}: {} went from {} to {} ({:+.1%})'.format(
+                        name, phase, metric, format_metric(metric, before[metric]), format_metric(metric, measurement[metric]),
+                        measurement[metric] / before[metric] - 1))
+
+    return regressions
+
+
+def format_metric(metric: str, value: float) -> str:
+    if metric in ('best', 'median'):
+        return '{:.3f}ms'.format(value * 1e3)
+    return '{}B'.format(value)
+
+
+def print_results(results: Dict[str, Any]):
+    print('{:<22} {:<9} {:>11} {:>11} {:>12} {:>12}'.format(
+        'workload', 'phase', 'best (ms)', 'median (ms)', 'peak (KiB)', 'blocks held'))
+    for name, workload in results['workloads'].items():
+        for phase in PHASES:
+            measurement = workload['phases'][phase]
+            print('{:<22} {:<9} {:>11.3f} {:>11.3f} {:>12.1f} {:>12}'.format(
+                name, phase, measurement['best'] * 1e3, measurement['median'] * 1e3, measurement['peak_bytes'] / 1024,
+                measurement['retained_blocks']))
+
+
+def parse_arguments(arguments: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='Benchmarks the lexer, parser and evaluator on generated workloads')
+    parser.add_argument('workloads', nargs='*',
+                        help='workloads to run, all of them by default: {}'.format(', '.join(workloads.keys())))
+    parser.add_argument('--lexer', choices=lexer_engines.keys(), default='char')
+    parser.add_argument('--parser', choices=parser_engines.keys(), default='recursive')
+    parser.add_argument('--evaluator', choices=evaluator_engines.keys(), default='recursive')
+    parser.add_argument('--repeats', type=int, default=DEFAULT_REPEATS)
+    parser.add_argument('--scale', type=float, default=1.0, help='multiplies the size of every workload')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='write the results to this file as JSON')
+    parser.add_argument('--compare', help='JSON results of a previous run to check for regressions')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='relative slowdown that counts as a regression')
+    args = parser.parse_args(arguments)
+
+    unknown = [name for name in args.workloads if name not in workloads]
+    if unknown:
+        parser.error('unknown workloads: {}'.format(', '.join(unknown)))
+    return args
+
+
+def main(arguments: Optional[List[str]] = None) -> int:
+    args = parse_arguments(arguments)
+    results = run_suite(args.workloads or list(workloads.keys()), args.lexer, args.parser, args.evaluator, args.repeats,
+                        args.scale, args.seed)
+    print_results(results)
+
+    if args.output is not None:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.compare is None:
+        return 0
+
+    with open(args.compare) as f:
+        baseline = json.load(f)
+
+    regressions = compare(baseline, results, args.threshold)
+    for regression in regressions:
+        print('regression: {}'.format(regression))
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,113 @@
+# Deterministic generators of expression sources for the benchmarks. Each one takes a size and a seeded random so the
+# same arguments always produce the same source, and runs from different machines or commits measure the same input.
+# Every generated expression evaluates without errors.
+import random
+from typing import Callable, Dict, List
+
+Generator = Callable[[int, random.Random], str]
+
+# the recursive parser and evaluator use several python frames per level of nesting, and chains of left associative
+# operators nest one level per operator
+MAX_NESTING = 100
+CHAIN_LENGTH = 50
+
+
+def number(rng: random.Random) -> str:
+    if rng.random() < 0.5:
+        return str(rng.randint(1, 999))
+    return '{}.{}'.format(rng.randint(0, 999), rng.randint(1, 99))
+
+
+def chain(parts: List[str], separator: str) -> str:
+    # joins the parts in groups of CHAIN_LENGTH so long chains don't nest deeper than the engines can go
+    groups = ['({})'.format(separator.join(parts[start:start + CHAIN_LENGTH])) for start in range(0, len(parts), CHAIN_LENGTH)]
+    return separator.join(groups)
+
+
+def literal_chain(size: int, rng: random.Random) -> str:
+    # a long flat chain of additive and multiplicative operators, the most common shape of real expressions
+    parts = []
+    for _ in range(size):
+        operator = rng.choice(['', '-', '*'])
+        parts.append('{} {} {}'.format(number(rng), operator, number(rng)) if operator else number(rng))
+    return chain(parts, ' + ')
+
+
+def deep_nesting(size: int, rng: random.Random) -> str:
+    # groupings, negations and right nested operators as deep as the recursive engines allow, repeated `size` times
+    def nested(depth: int) -> str:
+        if depth == 0:
+            return number(rng)
+        shape = depth % 3
+        if shape == 0:
+            return '({})'.format(nested(depth - 1))
+        if shape == 1:
+            return '-{}'.format(nested(depth - 1))
+        return '{} + ({})'.format(number(rng), nested(depth - 1))
+
+    return chain([nested(MAX_NESTING) for _ in range(size)], ' + ')
+
+
+def string_concatenation(size: int, rng: random.Random) -> str:
+    # strings joined with each other and with numbers and booleans, which have to be converted first
+    parts = ['"start"']
+    for _ in range(size - 1):
+        kind = rng.random()
+        if kind < 0.6:
+            parts.append('"{}"'.format(''.join(rng.choice('abcdefghijklmnopqrstuvwxyz ') for _ in range(rng.randint(1, 16)))))
+        elif kind < 0.9:
+            parts.append(number(rng))
+        else:
+            parts.append(rng.choice(['true', 'false']))
+    return chain(parts, ' + ')
+
+
+def comment_heavy(size: int, rng: random.Random) -> str:
+    # a short expression spread over lines which are mostly comments and whitespace, only the lexer has much to do
+    parts = []
+    for _ in range(size):
+        lines = ['{}// {}'.format(' ' * rng.randint(0, 8), 'comment ' * rng.randint(1, 10)) for _ in range(rng.randint(1, 4))]
+        lines.append(number(rng))
+        parts.append('\n'.join(lines))
+    return chain(parts, '\n+ ')
+
+
+def mixed(size: int, rng: random.Random) -> str:
+    # random trees of every operator with a realistic spread of depth, comparisons are only applied to numbers
+    def arithmetic(depth: int) -> str:
+        if depth == 0 or rng.random() < 0.3:
+            return number(rng)
+        choice = rng.random()
+        if choice < 0.15:
+            return '({})'.format(arithmetic(depth - 1))
+        if choice < 0.25:
+            return '-{}'.format(arithmetic(depth - 1))
+        return '{} {} {}'.format(arithmetic(depth - 1), rng.choice('+-*'), arithmetic(depth - 1))
+
+    def condition() -> str:
+        operator = rng.choice(['==', '!=', '>', '>=', '<', '<='])
+        return '!({} {} {})'.format(arithmetic(4), operator, arithmetic(4))
+
+    parts = [arithmetic(6) if rng.random() < 0.8 else '({} == {})'.format(condition(), condition()) for _ in range(size)]
+    return '"" + ' + chain(['({})'.format(part) for part in parts], ' + ')
+
+
+workloads: Dict[str, Generator] = {
+    'literal_chain': literal_chain,
+    'deep_nesting': deep_nesting,
+    'string_concatenation': string_concatenation,
+    'comment_heavy': comment_heavy,
+    'mixed': mixed,
+}
+
+default_sizes: Dict[str, int] = {
+    'literal_chain': 2000,
+    'deep_nesting': 20,
+    'string_concatenation': 2000,
+    'comment_heavy': 500,
+    'mixed': 100,
+}
+
+
+def generate(name: str, size: int, seed: int = 0) -> str:
+    return workloads[name](size, random.Random(seed))
@@ -0,0 +1,78 @@
+import operator
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import parsing.expr as exprs
+from evaluation.expr import ExprEvaluator, numeric_binary_operations
+
+# operand types that have fast operations, bool is left out as `type(value) is int` doesn't match it
+numeric_types = (int, float)
+
+binary_number_operations: Dict[exprs.BinaryOperatorType, Callable[[Any, Any], Any]] = {
+    exprs.BinaryOperatorType.PLUS: operator.add,
+    **numeric_binary_operations,
+}
+
+# feedback of a node that has seen more than one combination of operand types, `type(value) is None` never matches
+# so it stays on the generic path
+GENERIC_BINARY: Tuple[Any, Any, Any] = (None, None, None)
+GENERIC_UNARY: Tuple[Any, Any] = (None, None)
+
+
+def binary_fast_path(operator_type: exprs.BinaryOperatorType, left: type, right: type) -> Optional[Callable[[Any, Any], Any]]:
+    # an operation that gives the same result and errors as ExprEvaluator for operands of exactly these types
+    if left in numeric_types and right in numeric_types:
+        return binary_number_operations.get(operator_type)
+    if left is str and right is str and operator_type == exprs.BinaryOperatorType.PLUS:
+        return operator.add
+    return None
+
+
+class AdaptiveEvaluator(ExprEvaluator):
+    # Quickens operators with the types of the operands they see. The first evaluation of a binary or unary node
+    # goes through ExprEvaluator and, if its operand types have a fast operation, records them and the operation on
+    # the node. Later evaluations with the same operand types apply the operation straight away without any of the
+    # checks, anything else goes back through ExprEvaluator so results and errors are always the same. A node that
+    # sees a second combination of types is left generic rather than flipping between them. Binary nodes whose
+    # operands the type checker proved are numbers, bools included, record their operation the first time and always
+    # apply it without checking types, unary ones negate straight away.
+    #
+    # The feedback is kept on the nodes so it lasts as long as the tree, across evaluators. It's only ever replaced
+    # whole, so evaluating a tree on several threads at once is safe.
+    def visit_binary(self, node: exprs.Binary):
+        left = self.evaluate(node.left)
+        right = self.evaluate(node.right)
+        if node.numeric_operands:
+            feedback = node.feedback
+            if feedback is None or feedback[2] is None:
+                # any operation already recorded is the right one, the generic one is replaced
+                feedback = node.feedback = (None, None, binary_number_operations[node.operator.type])
+            return feedback[2](left, right)
+
+        feedback = node.feedback
+        if feedback is not None and type(left) is feedback[0] and type(right) is feedback[1]:
+            return feedback[2](left, right)
+
+        value = self.apply_binary(node, left, right)
+        if feedback is None:
+            fast = binary_fast_path(node.operator.type, type(left), type(right))
+            node.feedback = (type(left), type(right), fast) if fast is not None else GENERIC_BINARY
+        elif feedback is not GENERIC_BINARY:
+            node.feedback = GENERIC_BINARY
+        return value
+
+    # NOT doesn't check its operand so it's already as fast as it gets
+    def visit_unary_negate(self, node: exprs.Unary):
+        value = self.evaluate(node.expression)
+        if node.numeric_operands:
+            return -value
+
+        feedback = node.feedback
+        if feedback is not None and type(value) is feedback[0]:
+            return feedback[1](value)
+
+        result = self.apply_unary(node, value)
+        if feedback is None:
+            node.feedback = (type(value), operator.neg) if type(value) in numeric_types else GENERIC_UNARY
+        elif feedback is not GENERIC_UNARY:
+            node.feedback = GENERIC_UNARY
+        return result
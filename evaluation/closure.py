@@ -0,0 +1,96 @@
+from typing import Any, Callable, Dict, Optional
+
+import parsing.expr as exprs
+from evaluation.expr import is_truthy, lookup_variable, numeric_binary_operations, RuntimeException, to_string
+from parsing.expr import Expr, ExprVisitor
+
+CompiledExpr = Callable[[], Any]
+
+
+class ClosureCompiler(ExprVisitor):
+    # Compiles a tree once into nested closures which can be called repeatedly, each closure already knows which
+    # operation it performs so there is no visitor dispatch or operator lookup left at evaluation time. Variables are
+    # looked up in `variables` when the closure runs, so it can be updated between calls.
+    def __init__(self, variables: Optional[Dict[str, Any]] = None) -> None:
+        self.__variables = variables if variables is not None else {}
+
+    def compile(self, expression: Expr) -> CompiledExpr:
+        return expression.accept(self)
+
+    def evaluate(self, expression: Expr):
+        return self.compile(expression)()
+
+    def visit_binary(self, node: exprs.Binary) -> CompiledExpr:
+        left = self.compile(node.left)
+        right = self.compile(node.right)
+
+        # operators whose operands evaluation/type_checker.py proved are numbers don't check them
+        if node.operator.type == exprs.BinaryOperatorType.PLUS:
+            if node.numeric_operands:
+                return lambda: left() + right()
+
+            def plus():
+                left_value = left()
+                right_value = right()
+                if isinstance(left_value, str) or isinstance(right_value, str):
+                    return '{}{}'.format(to_string(left_value), to_string(right_value))
+                return left_value + right_value
+
+            return plus
+
+        operation = numeric_binary_operations.get(node.operator.type)
+        if operation is None:
+            raise Exception('Handler for {} was None'.format(node.operator))
+
+        if node.numeric_operands:
+            return lambda: operation(left(), right())
+
+        left_span = node.left.span
+        right_span = node.right.span
+
+        def numeric():
+            left_value = left()
+            right_value = right()
+            if not isinstance(left_value, (int, float)):
+                raise RuntimeException(left_span, 'Expected a number')
+            if not isinstance(right_value, (int, float)):
+                raise RuntimeException(right_span, 'Expected a number')
+            return operation(left_value, right_value)
+
+        return numeric
+
+    def visit_grouping(self, node: exprs.Grouping) -> CompiledExpr:
+        return self.compile(node.expression)
+
+    def visit_literal(self, node: exprs.Literal) -> CompiledExpr:
+        value = node.value
+        return lambda: value
+
+    def visit_unary(self, node: exprs.Unary) -> CompiledExpr:
+        expression = self.compile(node.expression)
+
+        if node.operator.type == exprs.UnaryOperatorType.NOT:
+            return lambda: not is_truthy(expression())
+
+        if node.operator.type == exprs.UnaryOperatorType.NEGATE:
+            if node.numeric_operands:
+                return lambda: -expression()
+
+            span = node.expression.span
+
+            def negate():
+                value = expression()
+                if not isinstance(value, (int, float)):
+                    raise RuntimeException(span, 'Expected a number')
+                return -value
+
+            return negate
+
+        raise Exception('Handler for {} was None'.format(node.operator))
+
+    def visit_variable(self, node: exprs.Variable) -> CompiledExpr:
+        variables = self.__variables
+        span = node.span
+        name = node.name
+
+        return lambda: lookup_variable(variables, span, name)
@@ -0,0 +1,300 @@
+import operator
+from typing import Any, Callable, Dict, List, Mapping, Optional
+
+import numpy as np
+
+import parsing.expr as exprs
+from evaluation.expr import ExprEvaluator, lookup_variable, RuntimeException
+from parsing.expr import Expr, ExprVisitor
+
+# what evaluating a single row can raise, nil + 1 raises a TypeError in every engine
+row_errors = (RuntimeException, ArithmeticError, TypeError)
+
+# a column is either an array with one value per row or a python value shared by every row
+Column = Any
+
+numeric_operations: Dict[exprs.BinaryOperatorType, Callable[[Any, Any], Any]] = {
+    exprs.BinaryOperatorType.PLUS: operator.add,
+    exprs.BinaryOperatorType.MINUS: operator.sub,
+    exprs.BinaryOperatorType.MULTIPLY: operator.mul,
+    exprs.BinaryOperatorType.DIVIDE: operator.truediv,
+}
+numeric_comparisons: Dict[exprs.BinaryOperatorType, Callable[[Any, Any], Any]] = {
+    exprs.BinaryOperatorType.EQUAL: operator.eq,
+    exprs.BinaryOperatorType.NOT_EQUAL: operator.ne,
+    exprs.BinaryOperatorType.GREATER: operator.gt,
+    exprs.BinaryOperatorType.GREATER_EQUAL: operator.ge,
+    exprs.BinaryOperatorType.LESS: operator.lt,
+    exprs.BinaryOperatorType.LESS_EQUAL: operator.le,
+}
+
+
+int64_min = int(np.iinfo(np.int64).min)
+int64_max = int(np.iinfo(np.int64).max)
+# ints further from 0 than this may change when converted to float64
+float_exact_limit = 2 ** 53
+
+
+def is_number_column(value: Column) -> bool:
+    # uint64 arrays and python ints which don't fit in an int64 are left to python's ints row by row
+    if isinstance(value, np.ndarray):
+        return value.dtype.kind in 'bif' or value.dtype.kind == 'u' and value.dtype.itemsize < 8
+    if isinstance(value, int):
+        return int64_min <= value <= int64_max
+    return isinstance(value, float)
+
+
+def is_int_column(value: Column) -> bool:
+    if isinstance(value, np.ndarray):
+        return value.dtype.kind in 'biu'
+    return isinstance(value, int)
+
+
+def magnitude(value: Column) -> int:
+    # the largest absolute value in an int column, as a python int so it can't wrap itself
+    if isinstance(value, np.ndarray):
+        if not len(value):
+            return 0
+        return max(abs(int(value.min())), abs(int(value.max())))
+    return abs(int(value))
+
+
+def may_wrap(operator_type: exprs.BinaryOperatorType, left: Column, right: Column) -> bool:
+    # two min/max passes which rule out wrapping for most columns, so the exact checks below are rarely needed
+    if operator_type == exprs.BinaryOperatorType.MULTIPLY:
+        return magnitude(left) * magnitude(right) > int64_max
+    return magnitude(left) + magnitude(right) > int64_max
+
+
+def wrapped_rows(operator_type: exprs.BinaryOperatorType, left: Column, right: Column, result: Column) -> Column:
+    # the rows of an int64 operation whose result wrapped around instead of growing like a python int
+    if operator_type == exprs.BinaryOperatorType.PLUS:
+        return ((left ^ result) & (right ^ result)) < 0
+    if operator_type == exprs.BinaryOperatorType.MINUS:
+        return ((left ^ right) & (left ^ result)) < 0
+
+    # a product which wrapped can't be divided back into its left operand, dividing by 0 or -1 is avoided since
+    # neither can wrap except for -1 * int64_min
+    divisor = np.where((right == 0) | (right == -1), 1, right)
+    return np.where(right == -1, left == int64_min, (right != 0) & (result // divisor != left))
+
+
+def inexact_as_float(value: Column) -> Column:
+    # the rows of an int column which numpy would round when mixing it with floats, python compares and divides them
+    # exactly
+    if not is_int_column(value) or magnitude(value) <= float_exact_limit:
+        return False
+    return (value > float_exact_limit) | (value < -float_exact_limit)
+
+
+def is_string_column(value: Column) -> bool:
+    if isinstance(value, np.ndarray):
+        return value.dtype.kind == 'U'
+    return isinstance(value, str)
+
+
+def to_arithmetic(value: Column) -> Column:
+    # true + true is 2 in lox (and python) but numpy treats booleans as logical values, and narrower types would
+    # wrap or lose precision much earlier than python's ints and floats
+    if isinstance(value, np.ndarray):
+        if value.dtype.kind in 'biu' and value.dtype != np.int64:
+            return value.astype(np.int64)
+        if value.dtype.kind == 'f' and value.dtype != np.float64:
+            return value.astype(np.float64)
+        return value
+    return int(value) if isinstance(value, bool) else value
+
+
+class BatchResult:
+    def __init__(self, values: np.ndarray, errors: np.ndarray) -> None:
+        self.__values = values
+        self.__errors = errors
+
+    @property
+    def values(self) -> np.ndarray:
+        # rows which failed hold an arbitrary value
+        return self.__values
+
+    @property
+    def errors(self) -> np.ndarray:
+        # the exception each row raised, or None
+        return self.__errors
+
+    @property
+    def failed(self) -> np.ndarray:
+        return np.not_equal(self.__errors, None)
+
+
+class ColumnarEvaluator(ExprVisitor):
+    # Evaluates one expression for every row of a set of columns (one per variable) at once. Numbers and strings in
+    # numpy arrays are handled with vectorized operations; anything else, e.g. object arrays mixing types or nil, falls
+    # back to ExprEvaluator row by row so the results and errors are always the ones a row on its own would give. Each
+    # row keeps the first error it raised and is ignored by the rest of the expression.
+    #
+    # Integer columns are int64. When a result would not fit, or an int would be rounded where python compares or
+    # divides it exactly, the operation is evaluated row by row with python's ints instead.
+    def __init__(self, columns: Mapping[str, Any], length: Optional[int] = None) -> None:
+        self.__columns: Dict[str, Column] = {}
+
+        for name, values in columns.items():
+            column = np.asarray(values)
+            if column.ndim == 0:
+                self.__columns[name] = column.item()
+                continue
+            if column.ndim != 1:
+                raise ValueError('Column \'{}\' has to be one dimensional'.format(name))
+            if length is None:
+                length = len(column)
+            elif len(column) != length:
+                raise ValueError('Column \'{}\' has {} rows, expected {}'.format(name, len(column), length))
+            self.__columns[name] = column
+
+        self.__length = length if length is not None else 1
+        self.__rows = ExprEvaluator()
+        self.__errors = np.full(self.__length, None, dtype=object)
+        self.__failed = np.zeros(self.__length, dtype=bool)
+
+    def evaluate(self, expression: Expr) -> np.ndarray:
+        # raises the error of the first row that failed, i.e. what evaluating the rows in order would raise
+        result = self.evaluate_rows(expression)
+
+        failed = np.flatnonzero(result.failed)
+        if len(failed):
+            raise result.errors[failed[0]]
+
+        return result.values
+
+    def evaluate_rows(self, expression: Expr) -> BatchResult:
+        self.__errors = np.full(self.__length, None, dtype=object)
+        self.__failed = np.zeros(self.__length, dtype=bool)
+
+        values = self.__to_array(expression.accept(self))
+        return BatchResult(values, self.__errors)
+
+    def visit_binary(self, node: exprs.Binary) -> Column:
+        left = node.left.accept(self)
+        right = node.right.accept(self)
+
+        if not isinstance(left, np.ndarray) and not isinstance(right, np.ndarray):
+            return self.__apply_scalar(lambda: self.__rows.apply_binary(node, left, right))
+
+        operator_type = node.operator.type
+        if is_number_column(left) and is_number_column(right):
+            if self.__is_inexact(operator_type, left, right):
+                return self.__apply_rows(lambda l, r: self.__rows.apply_binary(node, l, r), left, right)
+
+            comparison = numeric_comparisons.get(operator_type)
+            if comparison is not None:
+                return comparison(left, right)
+
+            arithmetic_left = to_arithmetic(left)
+            arithmetic_right = to_arithmetic(right)
+            if operator_type == exprs.BinaryOperatorType.DIVIDE:
+                self.__check_division(node, arithmetic_left, arithmetic_right)
+
+            with np.errstate(all='ignore'):
+                result = numeric_operations[operator_type](arithmetic_left, arithmetic_right)
+
+            if result.dtype == np.int64 and may_wrap(operator_type, arithmetic_left, arithmetic_right):
+                if self.__any_row(wrapped_rows(operator_type, arithmetic_left, arithmetic_right, result)):
+                    return self.__apply_rows(lambda l, r: self.__rows.apply_binary(node, l, r), left, right)
+            return result
+
+        if operator_type == exprs.BinaryOperatorType.PLUS and is_string_column(left) and is_string_column(right):
+            return np.char.add(left, right)
+
+        return self.__apply_rows(lambda l, r: self.__rows.apply_binary(node, l, r), left, right)
+
+    def visit_grouping(self, node: exprs.Grouping) -> Column:
+        return node.expression.accept(self)
+
+    def visit_literal(self, node: exprs.Literal) -> Column:
+        return node.value
+
+    def visit_unary(self, node: exprs.Unary) -> Column:
+        value = node.expression.accept(self)
+
+        if not isinstance(value, np.ndarray):
+            return self.__apply_scalar(lambda: self.__rows.apply_unary(node, value))
+
+        if node.operator.type == exprs.UnaryOperatorType.NEGATE and is_number_column(value):
+            arithmetic = to_arithmetic(value)
+            # only int64_min has no int64 negation
+            wraps = arithmetic.dtype == np.int64 and magnitude(arithmetic) > int64_max
+            if not wraps or not self.__any_row(arithmetic == int64_min):
+                return -arithmetic
+        if node.operator.type == exprs.UnaryOperatorType.NOT:
+            # numbers and strings are only falsy when they're 0 or empty
+            if is_number_column(value):
+                return value == 0
+            if is_string_column(value):
+                return np.char.str_len(value) == 0
+
+        return self.__apply_rows(lambda v: self.__rows.apply_unary(node, v), value)
+
+    def visit_variable(self, node: exprs.Variable) -> Column:
+        return self.__apply_scalar(lambda: lookup_variable(self.__columns, node.span, node.name))
+
+    def __is_inexact(self, operator_type: exprs.BinaryOperatorType, left: Column, right: Column) -> bool:
+        # numpy converts ints to float64 to divide them or to compare them with floats, python doesn't round them
+        if operator_type == exprs.BinaryOperatorType.DIVIDE:
+            if is_int_column(left) and is_int_column(right):
+                return self.__any_row(inexact_as_float(left) | inexact_as_float(right))
+            return False
+        if operator_type in numeric_comparisons and is_int_column(left) != is_int_column(right):
+            return self.__any_row(inexact_as_float(left) | inexact_as_float(right))
+        return False
+
+    def __any_row(self, rows: Column) -> bool:
+        # whether `rows`, a mask or a value for every row, holds for any row which hasn't failed
+        return bool((np.broadcast_to(rows, (self.__length,)) & ~self.__failed).any())
+
+    def __check_division(self, node: exprs.Binary, left: Column, right: Column):
+        zero = np.broadcast_to(right == 0, (self.__length,)) & ~self.__failed
+        if not zero.any():
+            return
+
+        # the rows are evaluated again to get python's error for them
+        lefts = np.broadcast_to(left, (self.__length,))
+        rights = np.broadcast_to(right, (self.__length,))
+        for row in np.flatnonzero(zero):
+            try:
+                self.__rows.apply_binary(node, lefts[row].item(), rights[row].item())
+            except row_errors as e:
+                self.__fail(row, e)
+
+    def __apply_scalar(self, apply: Callable[[], Any]) -> Column:
+        # the same value, or error, for every row
+        try:
+            return apply()
+        except row_errors as e:
+            self.__fail(~self.__failed, e)
+            return None
+
+    def __apply_rows(self, apply: Callable[..., Any], *operands: Column) -> np.ndarray:
+        columns: List[List[Any]] = [operand.tolist() if isinstance(operand, np.ndarray) else [operand] * self.__length
+                                    for operand in operands]
+        result = np.full(self.__length, None, dtype=object)
+        failed = self.__failed
+
+        for row, values in enumerate(zip(*columns)):
+            if failed[row]:
+                continue
+            try:
+                result[row] = apply(*values)
+            except row_errors as e:
+                self.__fail(row, e)
+
+        return result
+
+    def __fail(self, rows: Any, error: Exception):
+        # `rows` is an index or a mask of rows which haven't failed yet
+        self.__errors[rows] = error
+        self.__failed[rows] = True
+
+    def __to_array(self, value: Column) -> np.ndarray:
+        if isinstance(value, np.ndarray):
+            return value
+        if value is None:
+            return np.full(self.__length, None, dtype=object)
+        return np.full(self.__length, value)
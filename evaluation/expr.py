@@ -1,3 +1,4 @@
+import operator
 from typing import Any, Callable, Dict, Optional
 
 import parsing.expr as exprs
@@ -38,6 +39,27 @@ def to_string(value: Any) -> str:
     return text
 
 
+# the operations behind number_binary_op handlers, for engines that do their own dispatch
+numeric_binary_operations: Dict[exprs.BinaryOperatorType, Callable[[Any, Any], Any]] = {
+    exprs.BinaryOperatorType.MINUS: operator.sub,
+    exprs.BinaryOperatorType.MULTIPLY: operator.mul,
+    exprs.BinaryOperatorType.DIVIDE: operator.truediv,
+    exprs.BinaryOperatorType.EQUAL: is_equal,
+    exprs.BinaryOperatorType.NOT_EQUAL: lambda left, right: not is_equal(left, right),
+    exprs.BinaryOperatorType.GREATER: operator.gt,
+    exprs.BinaryOperatorType.GREATER_EQUAL: operator.ge,
+    exprs.BinaryOperatorType.LESS: operator.lt,
+    exprs.BinaryOperatorType.LESS_EQUAL: operator.le,
+}
+
+
+def lookup_variable(variables: Dict[str, Any], span: Optional[SourceSpan], name: str) -> Any:
+    try:
+        return variables[name]
+    except KeyError:
+        raise RuntimeException(span, 'Undefined variable \'{}\''.format(name)) from None
+
+
 def number_binary_op(handler: BinaryOpHandler) -> BinaryOpHandler:
     def wrapped(self: 'ExprEvaluator', node: exprs.Binary, left: Any, right: Any):
         self.assert_numeric(node.left.span, left)
@@ -57,6 +79,21 @@ def number_unary_op(handler: UnaryOpHandler) -> UnaryOpHandler:
     return wrapped
 
 
+def numeric_binary_visitor(operator_type: exprs.BinaryOperatorType) -> Callable[['ExprEvaluator', exprs.Binary], Any]:
+    operation = numeric_binary_operations[operator_type]
+
+    def visit(self: 'ExprEvaluator', node: exprs.Binary):
+        left = self.evaluate(node.left)
+        right = self.evaluate(node.right)
+        if not node.numeric_operands:
+            self.assert_numeric(node.left.span, left)
+            self.assert_numeric(node.right.span, right)
+
+        return operation(left, right)
+
+    return visit
+
+
 class ExprEvaluator(ExprVisitor):
     __binary_switch: Dict[exprs.BinaryOperatorType, BinaryOpHandler] = {
         exprs.BinaryOperatorType.PLUS: lambda self, node, left, right: self.__handle_plus(node, left, right),
@@ -65,7 +102,7 @@ class ExprEvaluator(ExprVisitor):
         exprs.BinaryOperatorType.DIVIDE: number_binary_op(lambda self, _, left, right: left / right),
         exprs.BinaryOperatorType.EQUAL: number_binary_op(lambda self, _, left, right: is_equal(left, right)),
         exprs.BinaryOperatorType.NOT_EQUAL: number_binary_op(lambda self, _, left, right: not is_equal(left, right)),
-        exprs.BinaryOperatorType.GREATER: number_binary_op(lambda self, _, left, right: left >= right),
+        exprs.BinaryOperatorType.GREATER: number_binary_op(lambda self, _, left, right: left > right),
         exprs.BinaryOperatorType.GREATER_EQUAL: number_binary_op(lambda self, _, left, right: left >= right),
         exprs.BinaryOperatorType.LESS: number_binary_op(lambda self, _, left, right: left < right),
         exprs.BinaryOperatorType.LESS_EQUAL: number_binary_op(lambda self, _, left, right: left <= right),
@@ -75,18 +112,32 @@ class ExprEvaluator(ExprVisitor):
         exprs.UnaryOperatorType.NOT: lambda self, _, value: not is_truthy(value),
     }
 
+    def __init__(self, variables: Optional[Dict[str, Any]] = None) -> None:
+        self.__variables = variables if variables is not None else {}
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+
+        # subclasses which change how operators are applied don't get the specialized visit methods
+        if cls.apply_binary is not ExprEvaluator.apply_binary:
+            for opcode in exprs.binary_opcodes.values():
+                cls.expr_table[opcode] = cls.visit_binary
+        if cls.apply_unary is not ExprEvaluator.apply_unary:
+            for opcode in exprs.unary_opcodes.values():
+                cls.expr_table[opcode] = cls.visit_unary
+
+    @property
+    def variables(self) -> Dict[str, Any]:
+        return self.__variables
+
     def evaluate(self, expression: Expr):
-        return expression.accept(self)
+        return self.expr_table[expression.opcode](self, expression)
 
     def visit_binary(self, node: exprs.Binary):
         left = self.evaluate(node.left)
         right = self.evaluate(node.right)
 
-        handler = self.__binary_switch.get(node.operator.type)
-        if handler is None:
-            raise Exception('Handler for {} was None'.format(node.operator))
-
-        return handler(self, node, left, right)
+        return self.apply_binary(node, left, right)
 
     def visit_grouping(self, node: exprs.Grouping):
         return self.evaluate(node.expression)
@@ -97,6 +148,47 @@ class ExprEvaluator(ExprVisitor):
     def visit_unary(self, node: exprs.Unary):
         value = self.evaluate(node.expression)
 
+        return self.apply_unary(node, value)
+
+    # each operator is dispatched straight to its own method, these behave exactly like visit_binary and visit_unary
+    # but skip checking operands which evaluation/type_checker.py proved are numbers
+    def visit_binary_plus(self, node: exprs.Binary):
+        if node.numeric_operands:
+            return self.evaluate(node.left) + self.evaluate(node.right)
+
+        return self.__handle_plus(node, self.evaluate(node.left), self.evaluate(node.right))
+
+    visit_binary_minus = numeric_binary_visitor(exprs.BinaryOperatorType.MINUS)
+    visit_binary_multiply = numeric_binary_visitor(exprs.BinaryOperatorType.MULTIPLY)
+    visit_binary_divide = numeric_binary_visitor(exprs.BinaryOperatorType.DIVIDE)
+    visit_binary_equal = numeric_binary_visitor(exprs.BinaryOperatorType.EQUAL)
+    visit_binary_not_equal = numeric_binary_visitor(exprs.BinaryOperatorType.NOT_EQUAL)
+    visit_binary_greater = numeric_binary_visitor(exprs.BinaryOperatorType.GREATER)
+    visit_binary_greater_equal = numeric_binary_visitor(exprs.BinaryOperatorType.GREATER_EQUAL)
+    visit_binary_less = numeric_binary_visitor(exprs.BinaryOperatorType.LESS)
+    visit_binary_less_equal = numeric_binary_visitor(exprs.BinaryOperatorType.LESS_EQUAL)
+
+    def visit_unary_negate(self, node: exprs.Unary):
+        value = self.evaluate(node.expression)
+        if not node.numeric_operands:
+            self.assert_numeric(node.expression.span, value)
+
+        return -value
+
+    def visit_unary_not(self, node: exprs.Unary):
+        return not is_truthy(self.evaluate(node.expression))
+
+    def visit_variable(self, node: exprs.Variable):
+        return lookup_variable(self.__variables, node.span, node.name)
+
+    def apply_binary(self, node: exprs.Binary, left: Any, right: Any) -> Any:
+        handler = self.__binary_switch.get(node.operator.type)
+        if handler is None:
+            raise Exception('Handler for {} was None'.format(node.operator))
+
+        return handler(self, node, left, right)
+
+    def apply_unary(self, node: exprs.Unary, value: Any) -> Any:
         handler = self.__unary_switch.get(node.operator.type)
         if handler is None:
             raise Exception('Handler for {} was None'.format(node.operator))
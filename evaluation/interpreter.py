@@ -0,0 +1,72 @@
+from typing import Any, Dict, Iterator, List, Optional
+
+import parsing.expr as exprs
+import parsing.stmt as stmts
+from evaluation.expr import ExprEvaluator, RuntimeException
+from parsing.stmt import Stmt, StmtVisitor
+
+
+class Interpreter(ExprEvaluator, StmtVisitor):
+    # Runs programs which have been through the Resolver. Each scope is an array of its variables in order of
+    # declaration and the arrays of the scopes that are currently open are kept in a list indexed by depth, so a bound
+    # variable is always frames[depth][slot]. Unbound names use the variables passed in, like ExprEvaluator.
+    def __init__(self, variables: Optional[Dict[str, Any]] = None) -> None:
+        super().__init__(variables)
+        self.__frames: List[List[Any]] = []
+        self.__globals: List[Any] = []
+        self.__result: Any = None
+
+    @property
+    def globals(self) -> List[Any]:
+        # the values of the top level declarations of the last program, in order, up to an error if it raised one
+        return self.__globals
+
+    def execute(self, statements: List[Stmt]) -> Any:
+        # returns the value of the last expression statement, blocks are entered with an explicit stack so nesting
+        # doesn't grow python's stack and are never dispatched to a visit method
+        self.__frames = [[]]
+        self.__globals = self.__frames[0]
+        self.__result = None
+        blocks: List[Iterator[Stmt]] = [iter(statements)]
+
+        while blocks:
+            statement = next(blocks[-1], None)
+            if statement is None:
+                blocks.pop()
+                self.__frames.pop()
+            elif type(statement) is stmts.Block:
+                self.__frames.append([])
+                blocks.append(iter(statement.statements))
+            else:
+                statement.accept(self)
+
+        return self.__result
+
+    # statements
+    def visit_expression(self, node: stmts.Expression):
+        self.__result = self.evaluate(node.expression)
+
+    def visit_var(self, node: stmts.Var):
+        value = self.evaluate(node.initializer) if node.initializer is not None else None
+        self.__frames[-1].append(value)
+
+    # expressions
+    def visit_assign(self, node: exprs.Assign):
+        value = self.evaluate(node.value)
+
+        binding = node.binding
+        if binding is not None:
+            self.__frames[binding[0]][binding[1]] = value
+        elif node.name in self.variables:
+            self.variables[node.name] = value
+        else:
+            raise RuntimeException(node.span, 'Undefined variable \'{}\''.format(node.name))
+
+        return value
+
+    def visit_variable(self, node: exprs.Variable):
+        binding = node.binding
+        if binding is None:
+            return super().visit_variable(node)
+
+        return self.__frames[binding[0]][binding[1]]
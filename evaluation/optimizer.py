@@ -0,0 +1,186 @@
+from typing import List, Optional, Tuple
+
+import parsing.expr as exprs
+from evaluation.expr import ExprEvaluator, RuntimeException
+from parsing.expr import Expr, ExprVisitor
+from parsing.source import SourceSpan
+
+numeric_results = {
+    exprs.BinaryOperatorType.MINUS,
+    exprs.BinaryOperatorType.MULTIPLY,
+    exprs.BinaryOperatorType.DIVIDE,
+}
+
+
+def count_nodes(expression: Expr) -> int:
+    count = 0
+    stack: List[Expr] = [expression]
+
+    while stack:
+        node = stack.pop()
+        count += 1
+
+        if isinstance(node, exprs.Binary):
+            stack.append(node.left)
+            stack.append(node.right)
+        elif isinstance(node, exprs.Grouping):
+            stack.append(node.expression)
+        elif isinstance(node, exprs.Unary):
+            stack.append(node.expression)
+
+    return count
+
+
+def with_span(node: Expr, span: Optional[SourceSpan]) -> Expr:
+    # copies a node so it can take the place of an ancestor, operand errors are reported at the ancestor's span
+    if isinstance(node, exprs.Binary):
+        copy: Expr = exprs.Binary(node.left, node.operator, node.right)
+    elif isinstance(node, exprs.Grouping):
+        copy = exprs.Grouping(node.expression)
+    elif isinstance(node, exprs.Literal):
+        copy = exprs.Literal(node.value)
+    elif isinstance(node, exprs.Unary):
+        copy = exprs.Unary(node.operator, node.expression)
+    elif isinstance(node, exprs.Variable):
+        copy = exprs.Variable(node.name)
+    else:
+        raise Exception('Unexpected node {}'.format(node))
+
+    copy.span = span
+    return copy
+
+
+def is_number_literal(node: Expr, value: int) -> bool:
+    return isinstance(node, exprs.Literal) and type(node.value) is int and node.value == value
+
+
+def is_numeric(node: Expr) -> bool:
+    # true if the node either evaluates to an int or float or raises, booleans pass numeric checks but are excluded
+    # because e.g. true * 1 is 1
+    if isinstance(node, exprs.Literal):
+        return type(node.value) is int or type(node.value) is float
+    if isinstance(node, exprs.Binary):
+        return node.operator.type in numeric_results
+    if isinstance(node, exprs.Unary):
+        return node.operator.type == exprs.UnaryOperatorType.NEGATE
+
+    return False
+
+
+class Optimizer(ExprVisitor):
+    # Folds constant subtrees, removes groupings and applies identities that cannot change a result
+    # (x * 1, 1 * x, x - 0 and --x for numeric x). Subtrees that raise when evaluated are left in place so the
+    # error still happens at evaluation time and at the same span.
+    #
+    # The tree is rewritten in post order with an explicit stack like StackEvaluator, so the deep trees StackParser
+    # produces can be optimized without hitting the recursion limit.
+    def __init__(self) -> None:
+        self.__evaluator = ExprEvaluator()
+        self.__eliminated = 0
+
+    @property
+    def eliminated(self) -> int:
+        return self.__eliminated
+
+    def optimize(self, expression: Expr) -> Expr:
+        optimized = self.__rewrite(expression)
+        self.__eliminated += count_nodes(expression) - count_nodes(optimized)
+        return optimized
+
+    def visit_binary(self, node: exprs.Binary) -> Expr:
+        return self.__rewrite(node)
+
+    def visit_grouping(self, node: exprs.Grouping) -> Expr:
+        return self.__rewrite(node)
+
+    def visit_literal(self, node: exprs.Literal) -> Expr:
+        return node
+
+    def visit_variable(self, node: exprs.Variable) -> Expr:
+        return node
+
+    def visit_unary(self, node: exprs.Unary) -> Expr:
+        return self.__rewrite(node)
+
+    def __rewrite(self, expression: Expr) -> Expr:
+        results: List[Expr] = []
+        # (node, operands rewritten)
+        stack: List[Tuple[Expr, bool]] = [(expression, False)]
+
+        while stack:
+            node, ready = stack.pop()
+            node_type = type(node)
+
+            if node_type is exprs.Binary:
+                if ready:
+                    right = results.pop()
+                    results[-1] = self.__binary(node, results[-1], right)
+                else:
+                    stack.append((node, True))
+                    stack.append((node.right, False))
+                    stack.append((node.left, False))
+            elif node_type is exprs.Grouping:
+                if ready:
+                    results[-1] = with_span(results[-1], node.span)
+                else:
+                    stack.append((node, True))
+                    stack.append((node.expression, False))
+            elif node_type is exprs.Unary:
+                if ready:
+                    results[-1] = self.__unary(node, results[-1])
+                else:
+                    stack.append((node, True))
+                    stack.append((node.expression, False))
+            else:
+                results.append(node.accept(self))
+
+        return results.pop()
+
+    def __binary(self, node: exprs.Binary, left: Expr, right: Expr) -> Expr:
+        if left is node.left and right is node.right:
+            optimized: Expr = node
+        else:
+            optimized = exprs.Binary(left, node.operator, right)
+            optimized.span = node.span
+
+        if isinstance(left, exprs.Literal) and isinstance(right, exprs.Literal):
+            return self.__fold(optimized, lambda: self.__evaluator.apply_binary(optimized, left.value, right.value))
+
+        operator_type = node.operator.type
+        if operator_type == exprs.BinaryOperatorType.MULTIPLY:
+            if is_number_literal(right, 1) and is_numeric(left):
+                return with_span(left, node.span)
+            if is_number_literal(left, 1) and is_numeric(right):
+                return with_span(right, node.span)
+        elif operator_type == exprs.BinaryOperatorType.MINUS:
+            if is_number_literal(right, 0) and is_numeric(left):
+                return with_span(left, node.span)
+
+        return optimized
+
+    def __unary(self, node: exprs.Unary, expression: Expr) -> Expr:
+        if expression is node.expression:
+            optimized: Expr = node
+        else:
+            optimized = exprs.Unary(node.operator, expression)
+            optimized.span = node.span
+
+        if isinstance(expression, exprs.Literal):
+            return self.__fold(optimized, lambda: self.__evaluator.apply_unary(optimized, expression.value))
+
+        if node.operator.type == exprs.UnaryOperatorType.NEGATE and isinstance(expression, exprs.Unary):
+            if expression.operator.type == exprs.UnaryOperatorType.NEGATE and is_numeric(expression.expression):
+                return with_span(expression.expression, node.span)
+
+        return optimized
+
+    @staticmethod
+    def __fold(node: Expr, evaluate) -> Expr:
+        try:
+            value = evaluate()
+        except (RuntimeException, ArithmeticError):
+            return node
+
+        literal = exprs.Literal(value)
+        literal.span = node.span
+        return literal
@@ -0,0 +1,164 @@
+import ast
+from typing import Any, Callable, Dict, List, NoReturn, Optional, Tuple
+
+import parsing.expr as exprs
+from evaluation.expr import is_truthy, lookup_variable, RuntimeException, to_string
+from parsing.expr import Expr, ExprVisitor
+from parsing.source import SourceSpan
+
+CompiledExpr = Callable[[], Any]
+
+number = (int, float)
+
+numeric_operators: Dict[exprs.BinaryOperatorType, ast.AST] = {
+    exprs.BinaryOperatorType.MINUS: ast.Sub(),
+    exprs.BinaryOperatorType.MULTIPLY: ast.Mult(),
+    exprs.BinaryOperatorType.DIVIDE: ast.Div(),
+}
+# is_equal only differs from == for nil, which is never a number
+numeric_comparisons: Dict[exprs.BinaryOperatorType, ast.AST] = {
+    exprs.BinaryOperatorType.EQUAL: ast.Eq(),
+    exprs.BinaryOperatorType.NOT_EQUAL: ast.NotEq(),
+    exprs.BinaryOperatorType.GREATER: ast.Gt(),
+    exprs.BinaryOperatorType.GREATER_EQUAL: ast.GtE(),
+    exprs.BinaryOperatorType.LESS: ast.Lt(),
+    exprs.BinaryOperatorType.LESS_EQUAL: ast.LtE(),
+}
+
+
+def raise_not_numeric(spans: List[Tuple[SourceSpan, ...]], index: int, *values: Any) -> NoReturn:
+    # called once a check failed, reports the first operand that is not a number
+    for span, value in zip(spans[index], values):
+        if not isinstance(value, number):
+            raise RuntimeException(span, 'Expected a number')
+
+    raise Exception('Operands are numbers')
+
+
+def lookup_variable_at(variables: Dict[str, Any], spans: List[Tuple[SourceSpan, ...]], index: int, name: str) -> Any:
+    if name in variables:
+        return variables[name]
+    return lookup_variable(variables, spans[index][0], name)
+
+
+class PythonCompiler(ExprVisitor):
+    # Translates a tree into a python function and compiles it with compile(), so evaluating it runs as python
+    # bytecode. Operands are kept in local variables (via :=) so they are evaluated once and in the same order as
+    # ExprEvaluator, and failed numeric checks are reported through a table of operand spans. Variables are looked
+    # up in `variables` when the function runs.
+    def __init__(self, variables: Optional[Dict[str, Any]] = None) -> None:
+        self.__variables = variables if variables is not None else {}
+        self.__spans: List[Tuple[SourceSpan, ...]] = []
+        self.__temporaries = 0
+
+    def compile(self, expression: Expr) -> CompiledExpr:
+        self.__spans = []
+        self.__temporaries = 0
+
+        body = expression.accept(self)
+
+        helpers: Dict[str, Any] = {
+            '_isinstance': isinstance,
+            '_number': number,
+            '_str': str,
+            '_to_string': to_string,
+            '_is_truthy': is_truthy,
+            '_raise_not_numeric': raise_not_numeric,
+            '_spans': self.__spans,
+            '_lookup_variable': lookup_variable_at,
+            '_variables': self.__variables,
+        }
+
+        # helpers are bound as default arguments so they are fast locals rather than global lookups
+        arguments = ast.arguments(
+            posonlyargs=[], args=[ast.arg(arg=name) for name in helpers], vararg=None,
+            kwonlyargs=[], kw_defaults=[], kwarg=None, defaults=[ast.Name(id=name, ctx=ast.Load()) for name in helpers],
+        )
+        function = ast.FunctionDef(name='expression', args=arguments, body=[ast.Return(value=body)], decorator_list=[],
+                                   returns=None)
+        if 'type_params' in ast.FunctionDef._fields:
+            # python 3.12+
+            function.type_params = []
+        module = ast.fix_missing_locations(ast.Module(body=[function], type_ignores=[]))
+
+        namespace = dict(helpers)
+        exec(compile(module, '<lox>', 'exec'), namespace)
+        return namespace['expression']
+
+    def evaluate(self, expression: Expr):
+        return self.compile(expression)()
+
+    def visit_binary(self, node: exprs.Binary) -> ast.expr:
+        left_name, right_name = self.__temporary(), self.__temporary()
+        left = ast.NamedExpr(target=ast.Name(id=left_name, ctx=ast.Store()), value=node.left.accept(self))
+        right = ast.NamedExpr(target=ast.Name(id=right_name, ctx=ast.Store()), value=node.right.accept(self))
+        left_value = ast.Name(id=left_name, ctx=ast.Load())
+        right_value = ast.Name(id=right_name, ctx=ast.Load())
+
+        if node.operator.type == exprs.BinaryOperatorType.PLUS:
+            # _to_string(l) + _to_string(r) if _isinstance(l := ..., _str) | _isinstance(r := ..., _str) else l + r
+            concatenate = ast.BinOp(left=self.__call('_to_string', left_value), op=ast.Add(),
+                                    right=self.__call('_to_string', right_value))
+            is_string = ast.BinOp(left=self.__call('_isinstance', left, self.__name('_str')), op=ast.BitOr(),
+                                  right=self.__call('_isinstance', right, self.__name('_str')))
+            add = ast.BinOp(left=left_value, op=ast.Add(), right=right_value)
+            return ast.IfExp(test=is_string, body=concatenate, orelse=add)
+
+        if node.operator.type in numeric_operators:
+            operation = ast.BinOp(left=left_value, op=numeric_operators[node.operator.type], right=right_value)
+        elif node.operator.type in numeric_comparisons:
+            operation = ast.Compare(left=left_value, ops=[numeric_comparisons[node.operator.type]], comparators=[right_value])
+        else:
+            raise Exception('Handler for {} was None'.format(node.operator))
+
+        # l - r if _isinstance(l := ..., _number) & _isinstance(r := ..., _number) else _raise_not_numeric(...)
+        # & rather than `and` so the right operand is evaluated before the left one is checked
+        is_numeric = ast.BinOp(left=self.__call('_isinstance', left, self.__name('_number')), op=ast.BitAnd(),
+                               right=self.__call('_isinstance', right, self.__name('_number')))
+        error = self.__raise_not_numeric((node.left.span, node.right.span), left_value, right_value)
+        return ast.IfExp(test=is_numeric, body=operation, orelse=error)
+
+    def visit_grouping(self, node: exprs.Grouping) -> ast.expr:
+        return node.expression.accept(self)
+
+    def visit_literal(self, node: exprs.Literal) -> ast.expr:
+        return ast.Constant(value=node.value)
+
+    def visit_unary(self, node: exprs.Unary) -> ast.expr:
+        if node.operator.type == exprs.UnaryOperatorType.NOT:
+            return ast.UnaryOp(op=ast.Not(), operand=self.__call('_is_truthy', node.expression.accept(self)))
+
+        if node.operator.type == exprs.UnaryOperatorType.NEGATE:
+            name = self.__temporary()
+            value = ast.NamedExpr(target=ast.Name(id=name, ctx=ast.Store()), value=node.expression.accept(self))
+            negate = ast.UnaryOp(op=ast.USub(), operand=ast.Name(id=name, ctx=ast.Load()))
+            error = self.__raise_not_numeric((node.expression.span,), ast.Name(id=name, ctx=ast.Load()))
+            return ast.IfExp(test=self.__call('_isinstance', value, self.__name('_number')), body=negate, orelse=error)
+
+        raise Exception('Handler for {} was None'.format(node.operator))
+
+    def visit_variable(self, node: exprs.Variable) -> ast.expr:
+        # _lookup_variable(_variables, _spans, i, name)
+        index = len(self.__spans)
+        self.__spans.append((node.span,))
+
+        return self.__call('_lookup_variable', self.__name('_variables'), self.__name('_spans'), ast.Constant(value=index),
+                           ast.Constant(value=node.name))
+
+    def __raise_not_numeric(self, spans: Tuple[SourceSpan, ...], *values: ast.expr) -> ast.expr:
+        index = len(self.__spans)
+        self.__spans.append(spans)
+
+        return self.__call('_raise_not_numeric', self.__name('_spans'), ast.Constant(value=index), *values)
+
+    def __temporary(self) -> str:
+        self.__temporaries += 1
+        return '_t{}'.format(self.__temporaries)
+
+    @staticmethod
+    def __name(name: str) -> ast.expr:
+        return ast.Name(id=name, ctx=ast.Load())
+
+    @staticmethod
+    def __call(function: str, *args: ast.expr) -> ast.expr:
+        return ast.Call(func=ast.Name(id=function, ctx=ast.Load()), args=list(args), keywords=[])
@@ -0,0 +1,107 @@
+from typing import Dict, Iterator, List, Optional
+
+import parsing.expr as exprs
+import parsing.stmt as stmts
+from parsing.expr import ExprVisitor
+from parsing.source import highlight, SourceSpan
+from parsing.stmt import Stmt, StmtVisitor
+
+# slot of a name that has been declared but whose initializer is still being resolved
+UNINITIALIZED = -1
+
+
+class Resolver(ExprVisitor, StmtVisitor):
+    # Binds every variable reference and assignment to the (depth, slot) of its declaration, where depth is the
+    # absolute nesting of the declaring scope (the program is depth 0) and slot is the declaration's position in that
+    # scope. Environments can then be one array per scope and every lookup two index operations, however deep the
+    # reference is nested. Names which aren't declared anywhere are left unbound and are looked up by name at runtime.
+    #
+    # Bindings are stored on the nodes, so a tree can't be shared between programs (e.g. by hash-consing it).
+    def __init__(self) -> None:
+        self.__scopes: List[Dict[str, int]] = []
+
+    def resolve(self, statements: List[Stmt]) -> None:
+        # blocks are entered with an explicit stack so nesting doesn't grow python's stack, like Interpreter.execute.
+        # They're never dispatched to a visit method
+        self.__scopes = [{}]
+        blocks: List[Iterator[Stmt]] = [iter(statements)]
+
+        while blocks:
+            statement = next(blocks[-1], None)
+            if statement is None:
+                blocks.pop()
+                self.__scopes.pop()
+            elif type(statement) is stmts.Block:
+                self.__scopes.append({})
+                blocks.append(iter(statement.statements))
+            else:
+                statement.accept(self)
+
+    # statements
+    def visit_expression(self, node: stmts.Expression):
+        node.expression.accept(self)
+
+    def visit_var(self, node: stmts.Var):
+        scope = self.__scopes[-1]
+        if node.name in scope:
+            raise ResolverException(node.span, 'Already a variable called \'{}\' in this scope'.format(node.name))
+
+        scope[node.name] = UNINITIALIZED
+        if node.initializer is not None:
+            node.initializer.accept(self)
+        # the interpreter appends to the scope's array, so slots have to follow the order of declaration
+        scope[node.name] = len(scope) - 1
+
+    # expressions
+    def visit_assign(self, node: exprs.Assign):
+        node.value.accept(self)
+        node.binding = self.__lookup(node.name, node.span)
+
+    def visit_binary(self, node: exprs.Binary):
+        node.left.accept(self)
+        node.right.accept(self)
+
+    def visit_grouping(self, node: exprs.Grouping):
+        node.expression.accept(self)
+
+    def visit_literal(self, node: exprs.Literal):
+        pass
+
+    def visit_unary(self, node: exprs.Unary):
+        node.expression.accept(self)
+
+    def visit_variable(self, node: exprs.Variable):
+        node.binding = self.__lookup(node.name, node.span)
+
+    def __lookup(self, name: str, span: Optional[SourceSpan]):
+        for depth in range(len(self.__scopes) - 1, -1, -1):
+            slot = self.__scopes[depth].get(name)
+            if slot is None:
+                continue
+            if slot == UNINITIALIZED:
+                raise ResolverException(span, 'Can\'t read \'{}\' in its own initializer'.format(name))
+
+            return depth, slot
+
+        return None
+
+
+class ResolverException(Exception):
+    def __init__(self, span: Optional[SourceSpan], message: str) -> None:
+        self.__span = span
+        self.__message = message
+
+    @property
+    def span(self) -> Optional[SourceSpan]:
+        return self.__span
+
+    @property
+    def message(self) -> str:
+        return self.__message
+
+    def __str__(self) -> str:
+        output = '{} at {}'.format(self.__message, self.__span)
+        if self.__span is None:
+            return output
+
+        return '{}\n{}'.format(output, highlight(self.__span))
@@ -0,0 +1,45 @@
+from typing import Any, Dict, Optional, Set
+
+from evaluation.expr import ExprEvaluator
+from parsing.expr import Expr
+from parsing.hash_cons import shared_nodes
+
+missing = object()
+
+
+class SharedEvaluator(ExprEvaluator):
+    # Evaluates trees built by parsing.hash_cons, a subtree with more than one parent is only computed the first time
+    # it is reached during an evaluation and its value is reused after that. Expressions have no side effects and
+    # variables can't change during an evaluation so this gives the same results as ExprEvaluator; a subtree that
+    # raises ends the evaluation so errors are never reused.
+    #
+    # `shared` is the result of shared_nodes for the trees this evaluator will be given, so it isn't worked out again
+    # for every evaluation.
+    def __init__(self, variables: Optional[Dict[str, Any]] = None, shared: Optional[Set[int]] = None) -> None:
+        super().__init__(variables)
+        self.__known_shared = shared
+        self.__shared: Optional[Set[int]] = None
+        self.__values: Dict[int, Any] = {}
+
+    def evaluate(self, expression: Expr):
+        if self.__shared is not None:
+            return self.__evaluate(expression)
+
+        self.__shared = shared_nodes(expression) if self.__known_shared is None else self.__known_shared
+        try:
+            return self.__evaluate(expression)
+        finally:
+            self.__shared = None
+            self.__values = {}
+
+    def __evaluate(self, expression: Expr):
+        key = id(expression)
+        if key not in self.__shared:
+            return self.expr_table[expression.opcode](self, expression)
+
+        value = self.__values.get(key, missing)
+        if value is missing:
+            value = self.expr_table[expression.opcode](self, expression)
+            self.__values[key] = value
+
+        return value
@@ -0,0 +1,42 @@
+from typing import Any, List, Tuple
+
+import parsing.expr as exprs
+from evaluation.expr import ExprEvaluator
+from parsing.expr import Expr
+
+
+class StackEvaluator(ExprEvaluator):
+    # Walks the tree in post order with an explicit stack instead of recursing through accept(), so arbitrarily
+    # deep expressions can be evaluated. Operators are applied exactly as in ExprEvaluator.
+    def evaluate(self, expression: Expr):
+        values: List[Any] = []
+        # (node, operands evaluated)
+        stack: List[Tuple[Expr, bool]] = [(expression, False)]
+
+        while stack:
+            node, ready = stack.pop()
+            node_type = type(node)
+
+            if node_type is exprs.Literal:
+                values.append(node.value)
+            elif node_type is exprs.Grouping:
+                stack.append((node.expression, False))
+            elif node_type is exprs.Binary:
+                if ready:
+                    right = values.pop()
+                    values[-1] = self.apply_binary(node, values[-1], right)
+                else:
+                    stack.append((node, True))
+                    stack.append((node.right, False))
+                    stack.append((node.left, False))
+            elif node_type is exprs.Unary:
+                if ready:
+                    values[-1] = self.apply_unary(node, values[-1])
+                else:
+                    stack.append((node, True))
+                    stack.append((node.expression, False))
+            else:
+                # unknown nodes are delegated to their visitor method
+                values.append(node.accept(self))
+
+        return values.pop()
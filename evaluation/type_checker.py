@@ -0,0 +1,188 @@
+from enum import Flag, auto
+from typing import Any, List, Optional, Tuple
+
+import parsing.expr as exprs
+from parsing.expr import Expr, ExprVisitor
+from parsing.source import highlight, SourceSpan
+
+
+class ValueType(Flag):
+    # the kinds of value an expression can evaluate to, a node's type is every kind it might produce
+    NIL = auto()
+    BOOLEAN = auto()
+    NUMBER = auto()
+    STRING = auto()
+
+    # bool counts as a number everywhere numbers are expected
+    NUMERIC = BOOLEAN | NUMBER
+    ANY = NIL | BOOLEAN | NUMBER | STRING
+
+
+def literal_type(value: Any) -> ValueType:
+    if value is None:
+        return ValueType.NIL
+    if isinstance(value, bool):
+        return ValueType.BOOLEAN
+    if isinstance(value, (int, float)):
+        return ValueType.NUMBER
+    if isinstance(value, str):
+        return ValueType.STRING
+    return ValueType.ANY
+
+
+def is_numeric(value_type: ValueType) -> bool:
+    return value_type & ~ValueType.NUMERIC == ValueType(0)
+
+
+# operators which need numbers and what they produce, PLUS also takes strings so it's handled on its own
+numeric_binary_results = {
+    exprs.BinaryOperatorType.MINUS: ValueType.NUMBER,
+    exprs.BinaryOperatorType.MULTIPLY: ValueType.NUMBER,
+    exprs.BinaryOperatorType.DIVIDE: ValueType.NUMBER,
+    exprs.BinaryOperatorType.EQUAL: ValueType.BOOLEAN,
+    exprs.BinaryOperatorType.NOT_EQUAL: ValueType.BOOLEAN,
+    exprs.BinaryOperatorType.GREATER: ValueType.BOOLEAN,
+    exprs.BinaryOperatorType.GREATER_EQUAL: ValueType.BOOLEAN,
+    exprs.BinaryOperatorType.LESS: ValueType.BOOLEAN,
+    exprs.BinaryOperatorType.LESS_EQUAL: ValueType.BOOLEAN,
+}
+
+
+class TypeChecker(ExprVisitor):
+    # Infers what each node of a tree can evaluate to without running it. Operators whose operands can only be numbers
+    # get numeric_operands set so the engines can skip checking them, and operands which can never be what their
+    # operator needs are reported as errors. Evaluating the tree fails at each of them unless it fails earlier, e.g. on
+    # a division by zero or an undefined variable in an operand evaluated before.
+    #
+    # Variables can hold anything, so the annotations only depend on the shape of the tree and stay correct however it
+    # is shared or evaluated. Trees are walked with an explicit stack like the Optimizer, so their depth isn't limited
+    # by python's recursion limit.
+    def __init__(self) -> None:
+        self.__errors: List[TypeException] = []
+
+    def check(self, expression: Expr) -> List['TypeException']:
+        self.__errors = []
+        self.infer(expression)
+        errors, self.__errors = self.__errors, []
+        return errors
+
+    def infer(self, expression: Expr) -> ValueType:
+        return self.__infer(expression)
+
+    def visit_assign(self, node: exprs.Assign) -> ValueType:
+        return self.__infer(node)
+
+    def visit_binary(self, node: exprs.Binary) -> ValueType:
+        return self.__infer(node)
+
+    def visit_grouping(self, node: exprs.Grouping) -> ValueType:
+        return self.__infer(node)
+
+    def visit_literal(self, node: exprs.Literal) -> ValueType:
+        return literal_type(node.value)
+
+    def visit_unary(self, node: exprs.Unary) -> ValueType:
+        return self.__infer(node)
+
+    def visit_variable(self, node: exprs.Variable) -> ValueType:
+        return ValueType.ANY
+
+    def __infer(self, expression: Expr) -> ValueType:
+        # operands are inferred before their operator, left before right, so errors are in the order evaluation
+        # would reach them
+        results: List[ValueType] = []
+        # (node, operands inferred)
+        stack: List[Tuple[Expr, bool]] = [(expression, False)]
+
+        while stack:
+            node, ready = stack.pop()
+            node_type = type(node)
+
+            if node_type is exprs.Binary:
+                if ready:
+                    right = results.pop()
+                    results[-1] = self.__binary(node, results[-1], right)
+                else:
+                    stack.append((node, True))
+                    stack.append((node.right, False))
+                    stack.append((node.left, False))
+            elif node_type is exprs.Unary:
+                if ready:
+                    results[-1] = self.__unary(node, results[-1])
+                else:
+                    stack.append((node, True))
+                    stack.append((node.expression, False))
+            elif node_type is exprs.Grouping:
+                # evaluates to whatever its expression does
+                stack.append((node.expression, False))
+            elif node_type is exprs.Assign:
+                stack.append((node.value, False))
+            else:
+                results.append(node.accept(self))
+
+        return results.pop()
+
+    def __binary(self, node: exprs.Binary, left: ValueType, right: ValueType) -> ValueType:
+        node.numeric_operands = is_numeric(left) and is_numeric(right)
+
+        if node.operator.type == exprs.BinaryOperatorType.PLUS:
+            return self.__plus(node, left, right)
+
+        result = numeric_binary_results.get(node.operator.type)
+        if result is None:
+            raise Exception('Handler for {} was None'.format(node.operator))
+
+        left_valid = self.__expect_numeric(node.left, left)
+        right_valid = self.__expect_numeric(node.right, right)
+        return result if left_valid and right_valid else ValueType.ANY
+
+    def __unary(self, node: exprs.Unary, value: ValueType) -> ValueType:
+        node.numeric_operands = is_numeric(value)
+
+        if node.operator.type == exprs.UnaryOperatorType.NOT:
+            return ValueType.BOOLEAN
+        if node.operator.type == exprs.UnaryOperatorType.NEGATE:
+            return ValueType.NUMBER if self.__expect_numeric(node.expression, value) else ValueType.ANY
+
+        raise Exception('Handler for {} was None'.format(node.operator))
+
+    def __plus(self, node: exprs.Binary, left: ValueType, right: ValueType) -> ValueType:
+        # concatenates when either side is a string, otherwise adds
+        result = ValueType(0)
+        if (left | right) & ValueType.STRING:
+            result |= ValueType.STRING
+        if left & ValueType.NUMERIC and right & ValueType.NUMERIC and left != ValueType.STRING and right != ValueType.STRING:
+            result |= ValueType.NUMBER
+
+        if not result:
+            self.__errors.append(TypeException(node.span, 'Operands must be two numbers or a string'))
+            return ValueType.ANY
+        return result
+
+    def __expect_numeric(self, operand: Expr, value: ValueType) -> bool:
+        if value & ValueType.NUMERIC:
+            return True
+
+        self.__errors.append(TypeException(operand.span, 'Expected a number'))
+        return False
+
+
+class TypeException(Exception):
+    def __init__(self, span: Optional[SourceSpan], message: str) -> None:
+        self.__span = span
+        self.__message = message
+
+    @property
+    def span(self) -> Optional[SourceSpan]:
+        return self.__span
+
+    @property
+    def message(self) -> str:
+        return self.__message
+
+    def __str__(self) -> str:
+        output = '{} at {}'.format(self.__message, self.__span)
+        if self.__span is None:
+            return output
+
+        return '{}\n{}'.format(output, highlight(self.__span))
@@ -0,0 +1,167 @@
+# Counters for where the time goes when loading and running programs: wall time per phase, how many tokens and nodes
+# of each type the front end produced and how many of each operator were in the trees that evaluated successfully.
+# Instrumentation is off unless enable() is called or PLOX_INSTRUMENT is set, while it's off the only cost is a check
+# per loaded program.
+#
+# The counters are updated by repl.load and the programs it returns, so engines used directly aren't counted.
+import os
+import time
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional, Sized, TypeVar
+
+import parsing.expr as exprs
+from parsing.expr import Expr
+
+ENVIRONMENT_VARIABLE = 'PLOX_INSTRUMENT'
+
+
+class PhaseStats:
+    def __init__(self) -> None:
+        self.calls = 0
+        self.errors = 0
+        self.elapsed = 0.0
+
+    def __str__(self) -> str:
+        average = self.elapsed / self.calls if self.calls else 0.0
+        return '{} calls, {} errors, {:.3f}ms total, {:.3f}us average'.format(self.calls, self.errors, self.elapsed * 1e3,
+                                                                              average * 1e6)
+
+
+class Counters:
+    def __init__(self) -> None:
+        self.phases: Dict[str, PhaseStats] = {'lex': PhaseStats(), 'parse': PhaseStats(), 'evaluate': PhaseStats()}
+        self.tokens = 0
+        self.nodes: Counter = Counter()
+        self.binary_operators: Counter = Counter()
+        self.unary_operators: Counter = Counter()
+
+    def __str__(self) -> str:
+        lines = ['{:<8} {}'.format(phase, stats) for phase, stats in self.phases.items()]
+        lines.append('tokens   {}'.format(self.tokens))
+        lines.append('nodes    {}'.format(format_counts(self.nodes)))
+        lines.append('binary   {}'.format(format_counts(self.binary_operators)))
+        lines.append('unary    {}'.format(format_counts(self.unary_operators)))
+        return '\n'.join(lines)
+
+
+def format_counts(counts: Counter) -> str:
+    if not counts:
+        return '-'
+    return ', '.join('{} {}'.format(getattr(key, 'name', key), count) for key, count in counts.most_common())
+
+
+# None while instrumentation is off
+counters: Optional[Counters] = Counters() if os.environ.get(ENVIRONMENT_VARIABLE, '') not in ('', '0') else None
+
+
+def enable() -> None:
+    global counters
+    if counters is None:
+        counters = Counters()
+
+
+def disable() -> None:
+    global counters
+    counters = None
+
+
+def is_enabled() -> bool:
+    return counters is not None
+
+
+def reset() -> None:
+    global counters
+    if counters is not None:
+        counters = Counters()
+
+
+def count_operators(expression: Expr) -> List[Counter]:
+    # [node types, binary operators, unary operators] in the tree
+    nodes: Counter = Counter()
+    binary: Counter = Counter()
+    unary: Counter = Counter()
+    stack: List[Any] = [expression]
+
+    while stack:
+        node = stack.pop()
+        nodes[type(node).__name__] += 1
+
+        if isinstance(node, exprs.Binary):
+            binary[node.operator.type] += 1
+            stack.append(node.left)
+            stack.append(node.right)
+        elif isinstance(node, exprs.Unary):
+            unary[node.operator.type] += 1
+            stack.append(node.expression)
+        elif isinstance(node, exprs.Grouping):
+            stack.append(node.expression)
+        elif isinstance(node, exprs.Assign):
+            stack.append(node.value)
+
+    return [nodes, binary, unary]
+
+
+def record(phase: str, start: float, failed: bool = False) -> None:
+    if counters is None:
+        return
+
+    stats = counters.phases[phase]
+    stats.calls += 1
+    stats.elapsed += time.perf_counter() - start
+    if failed:
+        stats.errors += 1
+
+
+T = TypeVar('T', bound=Sized)
+
+
+def lex(run: Callable[[], T]) -> T:
+    start = time.perf_counter()
+    try:
+        tokens = run()
+    except Exception:
+        record('lex', start, True)
+        raise
+
+    record('lex', start)
+    if counters is not None:
+        counters.tokens += len(tokens)
+    return tokens
+
+
+def parse(run: Callable[[], Expr]) -> Expr:
+    start = time.perf_counter()
+    try:
+        expr = run()
+    except Exception:
+        record('parse', start, True)
+        raise
+
+    record('parse', start)
+    if counters is not None:
+        counters.nodes.update(count_operators(expr)[0])
+    return expr
+
+
+def instrument_program(expression: Expr, program: Callable[[], Any]) -> Callable[[], Any]:
+    # Adds the operators in the tree for every run that succeeds, a run that fails adds nothing. These are the operators
+    # a tree-walker dispatches, but not what every engine does: the shared engine evaluates identical subtrees once and
+    # the compiled engines have no dispatch left. Counting the tree up front instead of in the engines means every
+    # engine is counted the same way and the engines themselves don't change.
+    _, binary, unary = count_operators(expression)
+
+    def run() -> Any:
+        start = time.perf_counter()
+        try:
+            value = program()
+        except Exception:
+            record('evaluate', start, True)
+            raise
+
+        record('evaluate', start)
+        if counters is not None:
+            counters.binary_operators.update(binary)
+            counters.unary_operators.update(unary)
+        return value
+
+    return run
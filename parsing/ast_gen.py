@@ -1,6 +1,7 @@
-# this should be invoked directly
+# this should be invoked directly, with --read-only to generate nodes whose fields raise when they're assigned
+import argparse
 from os import path
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 import re
 
 EnumDef = List[str]
@@ -16,14 +17,75 @@ def to_title_case(name: str) -> str:
     return title_case.sub('_', name).lower()
 
 
-def generate_ast(base: str, imports: List[str], enums: EnumDict, types: Dict[str, List[Tuple[str, str]]]) -> List[str]:
-    result = ['# autogenerated by {}'.format(path.basename(__file__)), "import abc"]
+node_type = re.compile(r'^(?:Optional\[|List\[)?([A-Z]\w*)\]?$')
+
+
+def is_child(field: Tuple[str, str], enums: EnumDict) -> bool:
+    # fields which hold nodes, possibly optional or in a list, rather than values
+    match = node_type.match(field[1])
+    return match is not None and match.group(1) != 'Any' and match.group(1) not in enums
+
+
+def field_equal(field: Tuple[str, str], enums: EnumDict) -> Optional[str]:
+    # compares everything but the children themselves, which equal_trees compares
+    if is_child(field, enums):
+        if field[1].startswith('List['):
+            return 'len(self.{0}) == len(other.{0})'.format(field[0])
+        if field[1].startswith('Optional['):
+            return '(self.{0} is None) == (other.{0} is None)'.format(field[0])
+        return None
+    if field[1] == 'Any':
+        return 'same_value(self.{0}, other.{0})'.format(field[0])
+    return 'self.{0} == other.{0}'.format(field[0])
+
+
+def field_hash(field: Tuple[str, str]) -> str:
+    if field[1] == 'Any':
+        return 'value_key(self.{0})'.format(field[0])
+    if field[1].startswith('List['):
+        return 'tuple(self.{0})'.format(field[0])
+    return 'self.{0}'.format(field[0])
+
+
+def field_children(field: Tuple[str, str]) -> str:
+    if field[1].startswith('List['):
+        return '*self.{0}'.format(field[0])
+    return 'self.{0}'.format(field[0])
+
+
+def operator_field(fields: TypeDef, enums: EnumDict) -> Optional[Tuple[str, str]]:
+    for field in fields:
+        if field[1] in enums:
+            return field
+    return None
+
+
+def slots(names: List[str]) -> str:
+    quoted = ['\'{}\''.format(name) for name in names]
+    return '({},)'.format(quoted[0]) if len(quoted) == 1 else '({})'.format(', '.join(quoted))
+
+
+def generate_ast(base: str, imports: List[str], enums: EnumDict, types: Dict[str, List[Tuple[str, str]]],
+                 annotations: TypeDict, read_only: bool = False) -> List[str]:
+    # Nodes store their fields in __slots__ as plain attributes, so they have no __dict__ and reading a field doesn't
+    # call a property. Fields mustn't be reassigned once a node is built, its hash is cached and trees can share
+    # nodes. With `read_only` assigning them raises, at the cost of slower construction.
+    result = ['# autogenerated by {}'.format(path.basename(__file__)), "import abc", "import math"]
 
     if len(enums):
         result.append('from enum import auto, Enum')
-    result.append("from typing import Optional")
+
+    # names the caller imports from typing are merged into the one typing import
+    typing_names = {'Any', 'Callable', 'List', 'Optional'}
+    other_imports = []
+    for line in imports:
+        if line.startswith('from typing import '):
+            typing_names.update(name.strip() for name in line[len('from typing import '):].split(','))
+        else:
+            other_imports.append(line)
+    result.append('from typing import {}'.format(', '.join(sorted(typing_names))))
     result.append("from parsing.source import SourceSpan")
-    result.extend(imports)
+    result.extend(other_imports)
 
     def one_blank():
         result.extend([''])
@@ -31,29 +93,74 @@ def generate_ast(base: str, imports: List[str], enums: EnumDict, types: Dict[str
     def two_blank():
         result.extend(['', ''])
 
-    def prop(name: str, type: str):
-        result.append('    @property')
-        result.append('    def {}(self) -> {}:'.format(name, type))
-        result.append('        return self.__{}'.format(name))
+    def set_fields(names: List[str], values: List[str]):
+        if read_only:
+            result.append('        set_field = object.__setattr__')
+            for name, value in zip(names, values):
+                result.append('        set_field(self, \'{}\', {})'.format(name, value))
+        else:
+            for name, value in zip(names, values):
+                result.append('        self.{} = {}'.format(name, value))
 
-    def props(name: str, type: str):
-        result.append('    @property')
-        result.append('    def {}(self) -> {}:'.format(name, type))
-        result.append('        return self.__{}'.format(name))
+    def guard_fields(name: str, fields: List[str]):
+        if not read_only:
+            return
         one_blank()
-        result.append('    @{}.setter'.format(name))
-        result.append('    def {}(self, value: {}):'.format(name, type))
-        result.append('        self.__{} = value'.format(name))
+        result.append('    def __setattr__(self, name: str, value: object) -> None:')
+        result.append('        if name in {}:'.format(slots(fields)))
+        result.append('            raise AttributeError(\'{}.{{}} is read-only\'.format(name))'.format(name))
+        result.append('        object.__setattr__(self, name, value)')
+
+    two_blank()
+    result.append('def same_value(a: Any, b: Any) -> bool:')
+    result.append('    # 1, 1.0 and true are equal in python but not the same literal, and neither are 0.0 and -0.0')
+    result.append('    if type(a) is not type(b) or a != b:')
+    result.append('        return False')
+    result.append('    return type(a) is not float or math.copysign(1.0, a) == math.copysign(1.0, b)')
+
+    two_blank()
+    result.append('def value_key(value: Any) -> Any:')
+    result.append('    if type(value) is float:')
+    result.append('        return float, value, math.copysign(1.0, value)')
+    result.append('    return type(value), value')
+
+    two_blank()
+    result.append('def hash_tree(node: Any) -> None:')
+    result.append('    # hashes every child before its parent with an explicit stack, so deep trees don\'t hit the '
+                  'recursion limit')
+    result.append('    stack = [(node, False)]')
+    result.append('    while stack:')
+    result.append('        current, ready = stack.pop()')
+    result.append('        if ready:')
+    result.append('            current.hash_fields()')
+    result.append('        elif not current.is_hashed():')
+    result.append('            stack.append((current, True))')
+    result.append('            stack.extend((child, False) for child in current.children() if child is not None)')
+
+    two_blank()
+    result.append('def equal_trees(a: Any, b: Any) -> bool:')
+    result.append('    # compares a pair of nodes at a time with an explicit stack, so deep trees don\'t hit the '
+                  'recursion limit')
+    result.append('    stack = [(a, b)]')
+    result.append('    while stack:')
+    result.append('        a, b = stack.pop()')
+    result.append('        if a is b:')
+    result.append('            continue')
+    result.append('        if type(a) is not type(b) or hash(a) != hash(b) or not a.equal_fields(b):')
+    result.append('            return False')
+    result.append('        stack.extend(zip(a.children(), b.children()))')
+    result.append('    return True')
 
     two_blank()
     result.append('class {}(abc.ABC):'.format(base))
-    result.append('    __span: Optional[SourceSpan]')
+    result.append('    __slots__ = {}'.format(slots(['span'])))
+    one_blank()
+    result.append('    span: Optional[SourceSpan]')
+    result.append('    opcode: int')
     one_blank()
     result.append('    @abc.abstractmethod')
     result.append('    def accept(self, visitor: \'{}Visitor\'):'.format(base))
     result.append('        pass')
-    one_blank()
-    props('span', 'Optional[SourceSpan]')
 
     for name, items in enums.items():
         two_blank()
@@ -63,57 +170,178 @@ def generate_ast(base: str, imports: List[str], enums: EnumDict, types: Dict[str
 
         two_blank()
         result.append('class {}:'.format(name))
-        result.append('    def __init__(self, type: {}Type, span: SourceSpan) -> None:'.format(name))
-        result.append('        self.__type = type')
-        result.append('        self.__span = span')
+        result.append('    __slots__ = {}'.format(slots(['type', 'span'])))
+        one_blank()
+        result.append('    type: {}Type'.format(name))
+        result.append('    span: Optional[SourceSpan]')
         one_blank()
-        result.append('    @property')
-        result.append('    def type(self) -> {}Type:'.format(name))
-        result.append('        return self.__type')
-        prop('type', '{}Type'.format(name))
+        result.append('    def __init__(self, type: {}Type, span: Optional[SourceSpan]) -> None:'.format(name))
+        set_fields(['type', 'span'], ['type', 'span'])
+        guard_fields(name, ['type', 'span'])
         one_blank()
-        prop('span', 'Optional[SourceSpan]')
+        result.append('    def __eq__(self, other: object) -> bool:')
+        result.append('        return isinstance(other, {}) and self.type == other.type'.format(name))
+        one_blank()
+        result.append('    def __hash__(self) -> int:')
+        result.append('        return hash(self.type)')
+
+    # every node has an opcode, nodes with an operator have one for each operator, so a visitor can go straight from a
+    # node to the code for its operator with one lookup in a flat table. Every node keeps it in a slot: reading a slot
+    # is as fast as reading a class attribute, and a property computing it from the operator was 3-4x slower to read
+    opcodes: List[Tuple[str, str, str]] = []  # [(opcode, visit method, node's visit method)]
+    for name, fields in types.items():
+        operator = operator_field(fields, enums)
+        if operator is None:
+            visit = 'visit_{}'.format(to_title_case(name))
+            opcodes.append((to_title_case(name).upper(), visit, visit))
+            continue
+        for item in enums[operator[1]]:
+            opcodes.append(('{}_{}'.format(to_title_case(name).upper(), item),
+                            'visit_{}_{}'.format(to_title_case(name), item.lower()), 'visit_{}'.format(to_title_case(name))))
+
+    two_blank()
+    result.append('class {}Opcode:'.format(base))
+    for index, (opcode, _, _) in enumerate(opcodes):
+        result.append('    {} = {}'.format(opcode, index))
 
     for name, fields in types.items():
+        operator = operator_field(fields, enums)
+        if operator is None:
+            continue
         two_blank()
-        result.append('class {}({}):'.format(name, base))
+        result.append('{}_opcodes = {{'.format(to_title_case(name)))
+        for item in enums[operator[1]]:
+            result.append('    {}Type.{}: {}Opcode.{}_{},'.format(operator[1], item, base, to_title_case(name).upper(), item))
+        result.append('}')
 
-        init_params = ''.join(map(lambda x: ', {}: {}'.format(x[0], x[1]), fields))
-        result.append('    def __init__(self{}) -> None:'.format(init_params))
+    for name, fields in types.items():
+        field_names = [field[0] for field in fields]
+        annotation_fields = annotations.get(name, [])
+        operator = operator_field(fields, enums)
 
+        two_blank()
+        result.append('class {}({}):'.format(name, base))
+        annotation_names = [annotation[0] for annotation in annotation_fields]
+        result.append('    __slots__ = {}'.format(slots(field_names + annotation_names + ['opcode', '__hash'])))
+        one_blank()
         for field in fields:
-            result.append('        self.__{0} = {0}'.format(field[0]))
+            result.append('    {}: {}'.format(field[0], field[1]))
+        # annotations are filled in by later passes and aren't part of the node's structure
+        for annotation in annotation_fields:
+            result.append('    {}: {}'.format(annotation[0], annotation[1]))
+        one_blank()
+
+        init_params = ''.join(map(lambda x: ', {}: {}'.format(x[0], x[1]), fields))
+        result.append('    def __init__(self{}, span: Optional[SourceSpan] = None) -> None:'.format(init_params))
+        if operator is None:
+            opcode = '{}Opcode.{}'.format(base, to_title_case(name).upper())
+        else:
+            opcode = '{}_opcodes[{}.type]'.format(to_title_case(name), operator[0])
+        set_fields(field_names + ['span', 'opcode'], field_names + ['span', opcode])
+        for annotation in annotation_fields:
+            result.append('        self.{} = None'.format(annotation[0]))
+        result.append('        self.__hash: Optional[int] = None')
+        guard_fields(name, field_names + ['opcode'])
 
         one_blank()
-        result.append('    def accept(self, visitor: \'ExprVisitor\'):')
+        result.append('    def accept(self, visitor: \'{}Visitor\'):'.format(base))
         result.append('        return visitor.visit_{}(self)'.format(to_title_case(name)))
 
-        for field in fields:
-            one_blank()
-            prop(field[0], field[1])
+        # structural equality, spans are ignored so identical subtrees from different places compare equal
+        children = [field for field in fields if is_child(field, enums)]
+        one_blank()
+        result.append('    def __eq__(self, other: object) -> bool:')
+        result.append('        return self is other or isinstance(other, {}) and equal_trees(self, other)'.format(name))
+        one_blank()
+        result.append('    def __hash__(self) -> int:')
+        result.append('        # fields never change so the hash is only computed once, which keeps hashing a tree linear')
+        result.append('        if self.__hash is None:')
+        result.append('            hash_tree(self)')
+        result.append('        return self.__hash')
+        one_blank()
+        result.append('    def is_hashed(self) -> bool:')
+        result.append('        return self.__hash is not None')
+        one_blank()
+        result.append('    def hash_fields(self) -> None:')
+        result.append('        # the children have to be hashed already')
+        result.append('        self.__hash = hash(({}, {}))'.format(name, ', '.join(map(field_hash, fields))))
+        one_blank()
+        comparisons = [comparison for comparison in (field_equal(field, enums) for field in fields) if comparison is not None]
+        result.append('    def equal_fields(self, other: \'{}\') -> bool:'.format(name))
+        result.append('        # everything but the children themselves, which equal_trees compares')
+        result.append('        return {}'.format(' and '.join(comparisons) if comparisons else 'True'))
+        one_blank()
+        result.append('    def children(self) -> tuple:')
+        result.append('        return ({})'.format(''.join(field_children(field) + ', ' for field in children).rstrip(' ')))
+
+    two_blank()
+    result.append('def visit_method(cls: type, specific: str, general: str) -> Callable[[Any, Any], Any]:')
+    result.append('    # the operator\'s visit method, unless the node\'s visit method is overridden further down the '
+                  'hierarchy')
+    result.append('    for ancestor in cls.__mro__:')
+    result.append('        if specific in ancestor.__dict__:')
+    result.append('            break')
+    result.append('        if general in ancestor.__dict__:')
+    result.append('            return getattr(cls, general)')
+    result.append('    return getattr(cls, specific)')
 
+    table = '{}_table'.format(base.lower())
     two_blank()
     result.append('class {}Visitor:'.format(base))
-    for name, _ in types.items():
+    result.append('    # the visit functions of the class by opcode, built for each subclass so a node can be dispatched in '
+                  'one step')
+    result.append('    # with `self.{}[node.opcode](self, node)` as well as through accept()'.format(table))
+    result.append('    {}: List[Callable[[Any, Any], Any]]'.format(table))
+    one_blank()
+    result.append('    def __init_subclass__(cls, **kwargs: Any) -> None:')
+    result.append('        super().__init_subclass__(**kwargs)  # type: ignore')
+    result.append('        cls.{} = build_{}(cls)'.format(table, table))
+    for name, fields in types.items():
         one_blank()
         result.append('    def visit_{}(self, node: {}):'.format(to_title_case(name), name))
         result.append('        pass')
 
+        operator = operator_field(fields, enums)
+        if operator is None:
+            continue
+        for item in enums[operator[1]]:
+            one_blank()
+            result.append('    def visit_{}_{}(self, node: {}):'.format(to_title_case(name), item.lower(), name))
+            result.append('        return self.visit_{}(node)'.format(to_title_case(name)))
+
+    two_blank()
+    result.append('def build_{}(cls: type) -> List[Callable[[Any, Any], Any]]:'.format(table))
+    result.append('    return [')
+    for _, method, general in opcodes:
+        if method == general:
+            result.append('        cls.{},'.format(method))
+        else:
+            result.append('        visit_method(cls, \'{}\', \'{}\'),'.format(method, general))
+    result.append('    ]')
+
+    two_blank()
+    result.append('{0}Visitor.{1} = build_{1}({0}Visitor)'.format(base, table))
+
     # blank line at end of file
     result.append('')
     return result
 
 
-def define_ast(target: str, base: str, imports: List[str], enums: EnumDict, types: Dict[str, List[Tuple[str, str]]]):
-    ast = generate_ast(base, imports, enums, types)
+def define_ast(target: str, base: str, imports: List[str], enums: EnumDict, types: Dict[str, List[Tuple[str, str]]],
+               annotations: Optional[TypeDict] = None, read_only: bool = False):
+    ast = generate_ast(base, imports, enums, types, annotations or {}, read_only)
     with open(target, 'w') as f:
         f.write('\n'.join(ast))
 
 
 def main():
+    parser = argparse.ArgumentParser(description='Generates the AST node classes')
+    parser.add_argument('--read-only', action='store_true', help='raise when a node\'s fields are assigned after it\'s built')
+    read_only = parser.parse_args().read_only
+
     expr_base = "Expr"
     define_ast(path.join(output_dir, "expr.py"), expr_base, [
-        "from typing import Any",
+        "from typing import Any, Tuple",
     ], {
         "BinaryOperator": ["MINUS", "PLUS", "MULTIPLY", "DIVIDE", "NOT_EQUAL", "EQUAL", "GREATER", "GREATER_EQUAL", "LESS", "LESS_EQUAL"],
         "UnaryOperator": ["NEGATE", "NOT"],
@@ -122,7 +350,29 @@ def main():
         "Grouping": [("expression", expr_base)],
         "Literal": [("value", "Any")],
         "Unary": [("operator", "UnaryOperator"), ("expression", expr_base)],
-    })
+        "Variable": [("name", "str")],
+        "Assign": [("name", "str"), ("value", expr_base)],
+    }, {
+        # (left type, right type, operation) the operator is specialized for, see evaluation/adaptive.py
+        # whether every operand is proven to be a number so the operator doesn't need to check, see
+        # evaluation/type_checker.py
+        "Binary": [("feedback", "Optional[Tuple[type, type, Callable[[Any, Any], Any]]]"),
+                   ("numeric_operands", "Optional[bool]")],
+        "Unary": [("feedback", "Optional[Tuple[type, Callable[[Any], Any]]]"), ("numeric_operands", "Optional[bool]")],
+        # (scope depth, slot) of the declaration a name refers to, see evaluation/resolver.py
+        "Variable": [("binding", "Optional[Tuple[int, int]]")],
+        "Assign": [("binding", "Optional[Tuple[int, int]]")],
+    }, read_only)
+
+    stmt_base = "Stmt"
+    define_ast(path.join(output_dir, "stmt.py"), stmt_base, [
+        "from typing import List",
+        "from parsing.expr import Expr",
+    ], {}, {
+        "Block": [("statements", "List[{}]".format(stmt_base))],
+        "Expression": [("expression", expr_base)],
+        "Var": [("name", "str"), ("initializer", "Optional[{}]".format(expr_base))],
+    }, None, read_only)
 
 
 if __name__ == '__main__':
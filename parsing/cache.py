@@ -0,0 +1,131 @@
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Generic, Hashable, List, Optional, Set, Tuple, Type, TypeVar
+
+import parsing.expr as exprs
+from parsing.expr import Expr
+
+T = TypeVar('T')
+
+DEFAULT_MAX_ENTRIES = 1024
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+def tree_size(expression: Expr) -> int:
+    # approximate memory used by a tree, shared subtrees are only counted once
+    size = 0
+    seen: Set[int] = set()
+    stack: List[Any] = [expression]
+
+    while stack:
+        node = stack.pop()
+        if id(node) in seen:
+            continue
+        seen.add(id(node))
+
+        size += sys.getsizeof(node)
+        attributes = getattr(node, '__dict__', None)
+        if attributes is not None:
+            size += sys.getsizeof(attributes)
+
+        if isinstance(node, exprs.Binary):
+            stack.append(node.left)
+            stack.append(node.right)
+        elif isinstance(node, exprs.Grouping) or isinstance(node, exprs.Unary):
+            stack.append(node.expression)
+        elif isinstance(node, exprs.Literal):
+            size += sys.getsizeof(node.value)
+
+    return size
+
+
+class CacheStats:
+    def __init__(self, hits: int, misses: int, evictions: int, entries: int, size: int) -> None:
+        self.hits = hits
+        self.misses = misses
+        self.evictions = evictions
+        self.entries = entries
+        self.size = size
+
+    def __str__(self) -> str:
+        return '{} hits, {} misses, {} evictions, {} entries using ~{} bytes'.format(
+            self.hits, self.misses, self.evictions, self.entries, self.size)
+
+
+class LruCache(Generic[T]):
+    # Keeps the results of the most recently used keys, evicting the least recently used entries once there are more
+    # than max_entries or their weights add up to more than max_bytes. Errors listed in `errors` are cached as well
+    # and raised again on a hit, e.g. source that failed to lex fails the same way without being lexed again.
+    #
+    # The cache can be shared between threads. create() runs outside of the lock so two threads missing the same key
+    # may both create it, the last one to finish is kept.
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, max_bytes: Optional[int] = DEFAULT_MAX_BYTES,
+                 weigh: Callable[[Hashable, Any], int] = lambda key, value: sys.getsizeof(key) + sys.getsizeof(value),
+                 errors: Tuple[Type[Exception], ...] = ()) -> None:
+        self.__entries: 'OrderedDict[Hashable, Tuple[bool, Any, int]]' = OrderedDict()
+        self.__max_entries = max_entries
+        self.__max_bytes = max_bytes
+        self.__weigh = weigh
+        self.__errors = errors
+        self.__size = 0
+        self.__hits = 0
+        self.__misses = 0
+        self.__evictions = 0
+        self.__lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self.__entries
+
+    @property
+    def stats(self) -> CacheStats:
+        with self.__lock:
+            return CacheStats(self.__hits, self.__misses, self.__evictions, len(self.__entries), self.__size)
+
+    def get(self, key: Hashable, create: Callable[[], T]) -> T:
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is not None:
+                self.__hits += 1
+                self.__entries.move_to_end(key)
+            else:
+                self.__misses += 1
+
+        if entry is not None:
+            failed, value, _ = entry
+            if failed:
+                # drop the traceback of the previous raise so they don't pile up
+                raise value.with_traceback(None)
+            return value
+
+        try:
+            value = create()
+        except self.__errors as e:
+            self.__add(key, True, e, self.__weigh(key, e))
+            raise
+
+        self.__add(key, False, value, self.__weigh(key, value))
+        return value
+
+    def clear(self) -> None:
+        with self.__lock:
+            self.__entries.clear()
+            self.__size = 0
+
+    def __add(self, key: Hashable, failed: bool, value: Any, size: int) -> None:
+        with self.__lock:
+            replaced = self.__entries.pop(key, None)
+            if replaced is not None:
+                self.__size -= replaced[2]
+
+            self.__entries[key] = (failed, value, size)
+            self.__size += size
+
+            while self.__entries and (len(self.__entries) > self.__max_entries
+                                      or (self.__max_bytes is not None and self.__size > self.__max_bytes)):
+                _, (_, _, evicted_size) = self.__entries.popitem(last=False)
+                self.__size -= evicted_size
+                self.__evictions += 1
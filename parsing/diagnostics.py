@@ -0,0 +1,34 @@
+from typing import Optional
+
+from parsing.source import SourceSpan
+
+
+class Diagnostic:
+    # An error the lexer or parser recovered from. The highlighted source is only rendered when the diagnostic is
+    # displayed, validating a large file mostly produces diagnostics which are counted or filtered and never shown.
+    def __init__(self, span: SourceSpan, message: str, error: Exception) -> None:
+        self.__span = span
+        self.__message = message
+        self.__error = error
+        self.__text: Optional[str] = None
+
+    @property
+    def span(self) -> SourceSpan:
+        return self.__span
+
+    @property
+    def message(self) -> str:
+        return self.__message
+
+    @property
+    def error(self) -> Exception:
+        return self.__error
+
+    @property
+    def text(self) -> str:
+        if self.__text is None:
+            self.__text = str(self.__error)
+        return self.__text
+
+    def __str__(self) -> str:
+        return self.text
@@ -0,0 +1,96 @@
+import hashlib
+import os
+import struct
+import tempfile
+import zlib
+from typing import Callable, Optional
+
+from parsing.expr import Expr
+from parsing.serialize import dumps, FORMAT_VERSION, loads, SerializationException
+from parsing.source import Source
+
+MAGIC = b'PLOX'
+# magic, format version, sha256 of the source, crc32 of the payload
+header = struct.Struct('<4sH32sI')
+
+
+class DiskCache:
+    # Stores parsed trees in `directory`, one file per source text and set of options, named after a hash of both.
+    # Files are checked against the format version and the hash of the source before use and anything that doesn't
+    # match or can't be read is treated as a miss and written again, so a cache can always be deleted or shared.
+    def __init__(self, directory: str) -> None:
+        self.__directory = directory
+        self.__hits = 0
+        self.__misses = 0
+
+    @property
+    def directory(self) -> str:
+        return self.__directory
+
+    @property
+    def hits(self) -> int:
+        return self.__hits
+
+    @property
+    def misses(self) -> int:
+        return self.__misses
+
+    def path(self, text: str, options: str = '') -> str:
+        key = hashlib.sha256('{}\0{}'.format(options, text).encode('utf-8')).hexdigest()
+        return os.path.join(self.__directory, key[:2], key[2:] + '.ploxc')
+
+    def get(self, text: str, create: Callable[[], Expr], options: str = '') -> Expr:
+        # `create` has to parse `text`, `options` names anything else that changes the tree (e.g. optimizations)
+        path = self.path(text, options)
+        digest = hashlib.sha256(text.encode('utf-8')).digest()
+
+        expression = self.__read(path, digest, text)
+        if expression is not None:
+            self.__hits += 1
+            return expression
+
+        self.__misses += 1
+        expression = create()
+        self.__write(path, digest, expression)
+        return expression
+
+    @staticmethod
+    def __read(path: str, digest: bytes, text: str) -> Optional[Expr]:
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            return None
+
+        if len(data) < header.size:
+            return None
+        magic, version, source_digest, checksum = header.unpack_from(data)
+        payload = data[header.size:]
+        if magic != MAGIC or version != FORMAT_VERSION or source_digest != digest or checksum != zlib.crc32(payload):
+            return None
+
+        try:
+            return loads(payload, Source(text))
+        except SerializationException:
+            return None
+
+    @staticmethod
+    def __write(path: str, digest: bytes, expression: Expr) -> None:
+        payload = dumps(expression)
+        data = header.pack(MAGIC, FORMAT_VERSION, digest, zlib.crc32(payload)) + payload
+
+        # written to a temporary file first so readers never see part of a file
+        directory = os.path.dirname(path)
+        try:
+            os.makedirs(directory, exist_ok=True)
+            descriptor, temporary = tempfile.mkstemp(dir=directory, suffix='.tmp')
+            try:
+                with os.fdopen(descriptor, 'wb') as f:
+                    f.write(data)
+                os.replace(temporary, path)
+            except BaseException:
+                os.unlink(temporary)
+                raise
+        except OSError:
+            # the cache is only an optimization
+            pass
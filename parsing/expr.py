@@ -1,26 +1,59 @@
 # autogenerated by ast_gen.py
 import abc
+import math
 from enum import auto, Enum
-from typing import Optional
+from typing import Any, Callable, List, Optional, Tuple
 from parsing.source import SourceSpan
-from typing import Any
+
+
+def same_value(a: Any, b: Any) -> bool:
+    # 1, 1.0 and true are equal in python but not the same literal, and neither are 0.0 and -0.0
+    if type(a) is not type(b) or a != b:
+        return False
+    return type(a) is not float or math.copysign(1.0, a) == math.copysign(1.0, b)
+
+
+def value_key(value: Any) -> Any:
+    if type(value) is float:
+        return float, value, math.copysign(1.0, value)
+    return type(value), value
+
+
+def hash_tree(node: Any) -> None:
+    # hashes every child before its parent with an explicit stack, so deep trees don't hit the recursion limit
+    stack = [(node, False)]
+    while stack:
+        current, ready = stack.pop()
+        if ready:
+            current.hash_fields()
+        elif not current.is_hashed():
+            stack.append((current, True))
+            stack.extend((child, False) for child in current.children() if child is not None)
+
+
+def equal_trees(a: Any, b: Any) -> bool:
+    # compares a pair of nodes at a time with an explicit stack, so deep trees don't hit the recursion limit
+    stack = [(a, b)]
+    while stack:
+        a, b = stack.pop()
+        if a is b:
+            continue
+        if type(a) is not type(b) or hash(a) != hash(b) or not a.equal_fields(b):
+            return False
+        stack.extend(zip(a.children(), b.children()))
+    return True
 
 
 class Expr(abc.ABC):
-    __span: Optional[SourceSpan]
+    __slots__ = ('span',)
+
+    span: Optional[SourceSpan]
+    opcode: int
 
     @abc.abstractmethod
     def accept(self, visitor: 'ExprVisitor'):
         pass
 
-    @property
-    def span(self) -> Optional[SourceSpan]:
-        return self.__span
-
-    @span.setter
-    def span(self, value: Optional[SourceSpan]):
-        self.__span = value
-
 
 class BinaryOperatorType(Enum):
     MINUS = auto()
@@ -36,20 +69,20 @@ class BinaryOperatorType(Enum):
 
 
 class BinaryOperator:
-    def __init__(self, type: BinaryOperatorType, span: SourceSpan) -> None:
-        self.__type = type
-        self.__span = span
+    __slots__ = ('type', 'span')
 
-    @property
-    def type(self) -> BinaryOperatorType:
-        return self.__type
-    @property
-    def type(self) -> BinaryOperatorType:
-        return self.__type
+    type: BinaryOperatorType
+    span: Optional[SourceSpan]
 
-    @property
-    def span(self) -> Optional[SourceSpan]:
-        return self.__span
+    def __init__(self, type: BinaryOperatorType, span: Optional[SourceSpan]) -> None:
+        self.type = type
+        self.span = span
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, BinaryOperator) and self.type == other.type
+
+    def __hash__(self) -> int:
+        return hash(self.type)
 
 
 class UnaryOperatorType(Enum):
@@ -58,90 +91,361 @@ class UnaryOperatorType(Enum):
 
 
 class UnaryOperator:
-    def __init__(self, type: UnaryOperatorType, span: SourceSpan) -> None:
-        self.__type = type
-        self.__span = span
-
-    @property
-    def type(self) -> UnaryOperatorType:
-        return self.__type
-    @property
-    def type(self) -> UnaryOperatorType:
-        return self.__type
-
-    @property
-    def span(self) -> Optional[SourceSpan]:
-        return self.__span
+    __slots__ = ('type', 'span')
+
+    type: UnaryOperatorType
+    span: Optional[SourceSpan]
+
+    def __init__(self, type: UnaryOperatorType, span: Optional[SourceSpan]) -> None:
+        self.type = type
+        self.span = span
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, UnaryOperator) and self.type == other.type
+
+    def __hash__(self) -> int:
+        return hash(self.type)
+
+
+class ExprOpcode:
+    BINARY_MINUS = 0
+    BINARY_PLUS = 1
+    BINARY_MULTIPLY = 2
+    BINARY_DIVIDE = 3
+    BINARY_NOT_EQUAL = 4
+    BINARY_EQUAL = 5
+    BINARY_GREATER = 6
+    BINARY_GREATER_EQUAL = 7
+    BINARY_LESS = 8
+    BINARY_LESS_EQUAL = 9
+    GROUPING = 10
+    LITERAL = 11
+    UNARY_NEGATE = 12
+    UNARY_NOT = 13
+    VARIABLE = 14
+    ASSIGN = 15
+
+
+binary_opcodes = {
+    BinaryOperatorType.MINUS: ExprOpcode.BINARY_MINUS,
+    BinaryOperatorType.PLUS: ExprOpcode.BINARY_PLUS,
+    BinaryOperatorType.MULTIPLY: ExprOpcode.BINARY_MULTIPLY,
+    BinaryOperatorType.DIVIDE: ExprOpcode.BINARY_DIVIDE,
+    BinaryOperatorType.NOT_EQUAL: ExprOpcode.BINARY_NOT_EQUAL,
+    BinaryOperatorType.EQUAL: ExprOpcode.BINARY_EQUAL,
+    BinaryOperatorType.GREATER: ExprOpcode.BINARY_GREATER,
+    BinaryOperatorType.GREATER_EQUAL: ExprOpcode.BINARY_GREATER_EQUAL,
+    BinaryOperatorType.LESS: ExprOpcode.BINARY_LESS,
+    BinaryOperatorType.LESS_EQUAL: ExprOpcode.BINARY_LESS_EQUAL,
+}
+
+
+unary_opcodes = {
+    UnaryOperatorType.NEGATE: ExprOpcode.UNARY_NEGATE,
+    UnaryOperatorType.NOT: ExprOpcode.UNARY_NOT,
+}
 
 
 class Binary(Expr):
-    def __init__(self, left: Expr, operator: BinaryOperator, right: Expr) -> None:
-        self.__left = left
-        self.__operator = operator
-        self.__right = right
+    __slots__ = ('left', 'operator', 'right', 'feedback', 'numeric_operands', 'opcode', '__hash')
+
+    left: Expr
+    operator: BinaryOperator
+    right: Expr
+    feedback: Optional[Tuple[type, type, Callable[[Any, Any], Any]]]
+    numeric_operands: Optional[bool]
+
+    def __init__(self, left: Expr, operator: BinaryOperator, right: Expr, span: Optional[SourceSpan] = None) -> None:
+        self.left = left
+        self.operator = operator
+        self.right = right
+        self.span = span
+        self.opcode = binary_opcodes[operator.type]
+        self.feedback = None
+        self.numeric_operands = None
+        self.__hash: Optional[int] = None
 
     def accept(self, visitor: 'ExprVisitor'):
         return visitor.visit_binary(self)
 
-    @property
-    def left(self) -> Expr:
-        return self.__left
+    def __eq__(self, other: object) -> bool:
+        return self is other or isinstance(other, Binary) and equal_trees(self, other)
+
+    def __hash__(self) -> int:
+        # fields never change so the hash is only computed once, which keeps hashing a tree linear
+        if self.__hash is None:
+            hash_tree(self)
+        return self.__hash
 
-    @property
-    def operator(self) -> BinaryOperator:
-        return self.__operator
+    def is_hashed(self) -> bool:
+        return self.__hash is not None
 
-    @property
-    def right(self) -> Expr:
-        return self.__right
+    def hash_fields(self) -> None:
+        # the children have to be hashed already
+        self.__hash = hash((Binary, self.left, self.operator, self.right))
+
+    def equal_fields(self, other: 'Binary') -> bool:
+        # everything but the children themselves, which equal_trees compares
+        return self.operator == other.operator
+
+    def children(self) -> tuple:
+        return (self.left, self.right,)
 
 
 class Grouping(Expr):
-    def __init__(self, expression: Expr) -> None:
-        self.__expression = expression
+    __slots__ = ('expression', 'opcode', '__hash')
+
+    expression: Expr
+
+    def __init__(self, expression: Expr, span: Optional[SourceSpan] = None) -> None:
+        self.expression = expression
+        self.span = span
+        self.opcode = ExprOpcode.GROUPING
+        self.__hash: Optional[int] = None
 
     def accept(self, visitor: 'ExprVisitor'):
         return visitor.visit_grouping(self)
 
-    @property
-    def expression(self) -> Expr:
-        return self.__expression
+    def __eq__(self, other: object) -> bool:
+        return self is other or isinstance(other, Grouping) and equal_trees(self, other)
+
+    def __hash__(self) -> int:
+        # fields never change so the hash is only computed once, which keeps hashing a tree linear
+        if self.__hash is None:
+            hash_tree(self)
+        return self.__hash
+
+    def is_hashed(self) -> bool:
+        return self.__hash is not None
+
+    def hash_fields(self) -> None:
+        # the children have to be hashed already
+        self.__hash = hash((Grouping, self.expression))
+
+    def equal_fields(self, other: 'Grouping') -> bool:
+        # everything but the children themselves, which equal_trees compares
+        return True
+
+    def children(self) -> tuple:
+        return (self.expression,)
 
 
 class Literal(Expr):
-    def __init__(self, value: Any) -> None:
-        self.__value = value
+    __slots__ = ('value', 'opcode', '__hash')
+
+    value: Any
+
+    def __init__(self, value: Any, span: Optional[SourceSpan] = None) -> None:
+        self.value = value
+        self.span = span
+        self.opcode = ExprOpcode.LITERAL
+        self.__hash: Optional[int] = None
 
     def accept(self, visitor: 'ExprVisitor'):
         return visitor.visit_literal(self)
 
-    @property
-    def value(self) -> Any:
-        return self.__value
+    def __eq__(self, other: object) -> bool:
+        return self is other or isinstance(other, Literal) and equal_trees(self, other)
+
+    def __hash__(self) -> int:
+        # fields never change so the hash is only computed once, which keeps hashing a tree linear
+        if self.__hash is None:
+            hash_tree(self)
+        return self.__hash
+
+    def is_hashed(self) -> bool:
+        return self.__hash is not None
+
+    def hash_fields(self) -> None:
+        # the children have to be hashed already
+        self.__hash = hash((Literal, value_key(self.value)))
+
+    def equal_fields(self, other: 'Literal') -> bool:
+        # everything but the children themselves, which equal_trees compares
+        return same_value(self.value, other.value)
+
+    def children(self) -> tuple:
+        return ()
 
 
 class Unary(Expr):
-    def __init__(self, operator: UnaryOperator, expression: Expr) -> None:
-        self.__operator = operator
-        self.__expression = expression
+    __slots__ = ('operator', 'expression', 'feedback', 'numeric_operands', 'opcode', '__hash')
+
+    operator: UnaryOperator
+    expression: Expr
+    feedback: Optional[Tuple[type, Callable[[Any], Any]]]
+    numeric_operands: Optional[bool]
+
+    def __init__(self, operator: UnaryOperator, expression: Expr, span: Optional[SourceSpan] = None) -> None:
+        self.operator = operator
+        self.expression = expression
+        self.span = span
+        self.opcode = unary_opcodes[operator.type]
+        self.feedback = None
+        self.numeric_operands = None
+        self.__hash: Optional[int] = None
 
     def accept(self, visitor: 'ExprVisitor'):
         return visitor.visit_unary(self)
 
-    @property
-    def operator(self) -> UnaryOperator:
-        return self.__operator
+    def __eq__(self, other: object) -> bool:
+        return self is other or isinstance(other, Unary) and equal_trees(self, other)
+
+    def __hash__(self) -> int:
+        # fields never change so the hash is only computed once, which keeps hashing a tree linear
+        if self.__hash is None:
+            hash_tree(self)
+        return self.__hash
+
+    def is_hashed(self) -> bool:
+        return self.__hash is not None
+
+    def hash_fields(self) -> None:
+        # the children have to be hashed already
+        self.__hash = hash((Unary, self.operator, self.expression))
+
+    def equal_fields(self, other: 'Unary') -> bool:
+        # everything but the children themselves, which equal_trees compares
+        return self.operator == other.operator
 
-    @property
-    def expression(self) -> Expr:
-        return self.__expression
+    def children(self) -> tuple:
+        return (self.expression,)
+
+
+class Variable(Expr):
+    __slots__ = ('name', 'binding', 'opcode', '__hash')
+
+    name: str
+    binding: Optional[Tuple[int, int]]
+
+    def __init__(self, name: str, span: Optional[SourceSpan] = None) -> None:
+        self.name = name
+        self.span = span
+        self.opcode = ExprOpcode.VARIABLE
+        self.binding = None
+        self.__hash: Optional[int] = None
+
+    def accept(self, visitor: 'ExprVisitor'):
+        return visitor.visit_variable(self)
+
+    def __eq__(self, other: object) -> bool:
+        return self is other or isinstance(other, Variable) and equal_trees(self, other)
+
+    def __hash__(self) -> int:
+        # fields never change so the hash is only computed once, which keeps hashing a tree linear
+        if self.__hash is None:
+            hash_tree(self)
+        return self.__hash
+
+    def is_hashed(self) -> bool:
+        return self.__hash is not None
+
+    def hash_fields(self) -> None:
+        # the children have to be hashed already
+        self.__hash = hash((Variable, self.name))
+
+    def equal_fields(self, other: 'Variable') -> bool:
+        # everything but the children themselves, which equal_trees compares
+        return self.name == other.name
+
+    def children(self) -> tuple:
+        return ()
+
+
+class Assign(Expr):
+    __slots__ = ('name', 'value', 'binding', 'opcode', '__hash')
+
+    name: str
+    value: Expr
+    binding: Optional[Tuple[int, int]]
+
+    def __init__(self, name: str, value: Expr, span: Optional[SourceSpan] = None) -> None:
+        self.name = name
+        self.value = value
+        self.span = span
+        self.opcode = ExprOpcode.ASSIGN
+        self.binding = None
+        self.__hash: Optional[int] = None
+
+    def accept(self, visitor: 'ExprVisitor'):
+        return visitor.visit_assign(self)
+
+    def __eq__(self, other: object) -> bool:
+        return self is other or isinstance(other, Assign) and equal_trees(self, other)
+
+    def __hash__(self) -> int:
+        # fields never change so the hash is only computed once, which keeps hashing a tree linear
+        if self.__hash is None:
+            hash_tree(self)
+        return self.__hash
+
+    def is_hashed(self) -> bool:
+        return self.__hash is not None
+
+    def hash_fields(self) -> None:
+        # the children have to be hashed already
+        self.__hash = hash((Assign, self.name, self.value))
+
+    def equal_fields(self, other: 'Assign') -> bool:
+        # everything but the children themselves, which equal_trees compares
+        return self.name == other.name
+
+    def children(self) -> tuple:
+        return (self.value,)
+
+
+def visit_method(cls: type, specific: str, general: str) -> Callable[[Any, Any], Any]:
+    # the operator's visit method, unless the node's visit method is overridden further down the hierarchy
+    for ancestor in cls.__mro__:
+        if specific in ancestor.__dict__:
+            break
+        if general in ancestor.__dict__:
+            return getattr(cls, general)
+    return getattr(cls, specific)
 
 
 class ExprVisitor:
+    # the visit functions of the class by opcode, built for each subclass so a node can be dispatched in one step
+    # with `self.expr_table[node.opcode](self, node)` as well as through accept()
+    expr_table: List[Callable[[Any, Any], Any]]
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)  # type: ignore
+        cls.expr_table = build_expr_table(cls)
 
     def visit_binary(self, node: Binary):
         pass
 
+    def visit_binary_minus(self, node: Binary):
+        return self.visit_binary(node)
+
+    def visit_binary_plus(self, node: Binary):
+        return self.visit_binary(node)
+
+    def visit_binary_multiply(self, node: Binary):
+        return self.visit_binary(node)
+
+    def visit_binary_divide(self, node: Binary):
+        return self.visit_binary(node)
+
+    def visit_binary_not_equal(self, node: Binary):
+        return self.visit_binary(node)
+
+    def visit_binary_equal(self, node: Binary):
+        return self.visit_binary(node)
+
+    def visit_binary_greater(self, node: Binary):
+        return self.visit_binary(node)
+
+    def visit_binary_greater_equal(self, node: Binary):
+        return self.visit_binary(node)
+
+    def visit_binary_less(self, node: Binary):
+        return self.visit_binary(node)
+
+    def visit_binary_less_equal(self, node: Binary):
+        return self.visit_binary(node)
+
     def visit_grouping(self, node: Grouping):
         pass
 
@@ -150,3 +454,39 @@ class ExprVisitor:
 
     def visit_unary(self, node: Unary):
         pass
+
+    def visit_unary_negate(self, node: Unary):
+        return self.visit_unary(node)
+
+    def visit_unary_not(self, node: Unary):
+        return self.visit_unary(node)
+
+    def visit_variable(self, node: Variable):
+        pass
+
+    def visit_assign(self, node: Assign):
+        pass
+
+
+def build_expr_table(cls: type) -> List[Callable[[Any, Any], Any]]:
+    return [
+        visit_method(cls, 'visit_binary_minus', 'visit_binary'),
+        visit_method(cls, 'visit_binary_plus', 'visit_binary'),
+        visit_method(cls, 'visit_binary_multiply', 'visit_binary'),
+        visit_method(cls, 'visit_binary_divide', 'visit_binary'),
+        visit_method(cls, 'visit_binary_not_equal', 'visit_binary'),
+        visit_method(cls, 'visit_binary_equal', 'visit_binary'),
+        visit_method(cls, 'visit_binary_greater', 'visit_binary'),
+        visit_method(cls, 'visit_binary_greater_equal', 'visit_binary'),
+        visit_method(cls, 'visit_binary_less', 'visit_binary'),
+        visit_method(cls, 'visit_binary_less_equal', 'visit_binary'),
+        cls.visit_grouping,
+        cls.visit_literal,
+        visit_method(cls, 'visit_unary_negate', 'visit_unary'),
+        visit_method(cls, 'visit_unary_not', 'visit_unary'),
+        cls.visit_variable,
+        cls.visit_assign,
+    ]
+
+
+ExprVisitor.expr_table = build_expr_table(ExprVisitor)
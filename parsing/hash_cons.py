@@ -0,0 +1,129 @@
+from typing import Any, Dict, Hashable, List, Optional, Set, Tuple
+
+import parsing.expr as exprs
+from parsing.expr import Expr
+from parsing.source import SourceSpan
+
+
+class HashConsFactory:
+    # Builds nodes so that identical subtrees are the same object. A shared node keeps the span of the occurrence it
+    # was first built for, so only subtrees whose spans can't end up in an error are shared: ones which always evaluate
+    # to numbers or booleans and contain no variables. An operator only reports the span of an operand that isn't a
+    # number, and any error raised inside a shared subtree is raised the first time it's evaluated, which is at the
+    # first occurrence. Every other node is built for its own occurrence and keeps its own span.
+    #
+    # Children are interned before their parents, so nodes are looked up by the identity of their children and never
+    # compared or hashed as whole trees.
+    def __init__(self) -> None:
+        self.__nodes: Dict[Hashable, Expr] = {}
+        # the interned nodes by id, which are stable as the nodes are kept alive here
+        self.__ids: Dict[int, Expr] = {}
+        self.__shared = 0
+
+    def __len__(self) -> int:
+        return len(self.__nodes)
+
+    @property
+    def shared(self) -> int:
+        # how many nodes were replaced by one that already existed
+        return self.__shared
+
+    def binary(self, left: Expr, operator: exprs.BinaryOperator, right: Expr, span: Optional[SourceSpan]) -> Expr:
+        node = exprs.Binary(left, operator, right, span)
+        if operator.type == exprs.BinaryOperatorType.PLUS and not (self.is_interned(left) and self.is_interned(right)):
+            # concatenates when either side is a string
+            return node
+        return self.__intern((exprs.Binary, id(left), operator.type, id(right)), node)
+
+    def grouping(self, expression: Expr, span: Optional[SourceSpan]) -> Expr:
+        node = exprs.Grouping(expression, span)
+        if not self.is_interned(expression):
+            return node
+        return self.__intern((exprs.Grouping, id(expression)), node)
+
+    def literal(self, value: Any, span: Optional[SourceSpan]) -> Expr:
+        node = exprs.Literal(value, span)
+        if not isinstance(value, (int, float)):
+            # bools are ints
+            return node
+        return self.__intern((exprs.Literal, exprs.value_key(value)), node)
+
+    def variable(self, name: str, span: Optional[SourceSpan]) -> Expr:
+        return exprs.Variable(name, span)
+
+    def unary(self, operator: exprs.UnaryOperator, expression: Expr, span: Optional[SourceSpan]) -> Expr:
+        return self.__intern((exprs.Unary, operator.type, id(expression)), exprs.Unary(operator, expression, span))
+
+    def is_interned(self, node: Expr) -> bool:
+        # interned nodes always evaluate to numbers or booleans
+        return self.__ids.get(id(node)) is node
+
+    def __intern(self, key: Hashable, node: Expr) -> Expr:
+        existing = self.__nodes.get(key)
+        if existing is not None:
+            self.__shared += 1
+            return existing
+
+        self.__nodes[key] = node
+        self.__ids[id(node)] = node
+        return node
+
+
+def hash_cons(expression: Expr, factory: Optional[HashConsFactory] = None) -> Expr:
+    # rebuilds a tree from any of the parsers with shared subtrees, children are built before their parents with an
+    # explicit stack so deep trees are fine
+    if factory is None:
+        factory = HashConsFactory()
+
+    values: List[Expr] = []
+    # (node, children built)
+    stack: List[Tuple[Expr, bool]] = [(expression, False)]
+
+    while stack:
+        node, ready = stack.pop()
+
+        if isinstance(node, exprs.Literal):
+            values.append(factory.literal(node.value, node.span))
+        elif isinstance(node, exprs.Variable):
+            values.append(factory.variable(node.name, node.span))
+        elif not ready:
+            stack.append((node, True))
+            if isinstance(node, exprs.Binary):
+                stack.append((node.right, False))
+                stack.append((node.left, False))
+            elif isinstance(node, exprs.Grouping) or isinstance(node, exprs.Unary):
+                stack.append((node.expression, False))
+            else:
+                raise Exception('Unexpected node {}'.format(node))
+        elif isinstance(node, exprs.Binary):
+            right = values.pop()
+            values[-1] = factory.binary(values[-1], node.operator, right, node.span)
+        elif isinstance(node, exprs.Grouping):
+            values[-1] = factory.grouping(values[-1], node.span)
+        elif isinstance(node, exprs.Unary):
+            values[-1] = factory.unary(node.operator, values[-1], node.span)
+
+    return values.pop()
+
+
+def shared_nodes(expression: Expr) -> Set[int]:
+    # ids of the nodes which are reachable through more than one parent
+    seen: Set[int] = set()
+    shared: Set[int] = set()
+    stack: List[Expr] = [expression]
+
+    while stack:
+        node = stack.pop()
+        key = id(node)
+        if key in seen:
+            shared.add(key)
+            continue
+        seen.add(key)
+
+        if isinstance(node, exprs.Binary):
+            stack.append(node.left)
+            stack.append(node.right)
+        elif isinstance(node, exprs.Grouping) or isinstance(node, exprs.Unary):
+            stack.append(node.expression)
+
+    return shared
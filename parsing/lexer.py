@@ -1,6 +1,7 @@
 from typing import Callable, Dict, List, Optional, Union
 
-from parsing.source import SourcePosition, SourceSpan, highlight
+from parsing.diagnostics import Diagnostic
+from parsing.source import highlight, Source, SourceSpan
 from parsing.token import Token, TokenType
 
 
@@ -40,6 +41,9 @@ class Lexer:
     __token_start_switch: Dict[str, Callable[['Lexer'], Token]] = {
         '(': lambda self: self.__create_token(TokenType.LEFT_PAREN),
         ')': lambda self: self.__create_token(TokenType.RIGHT_PAREN),
+        '{': lambda self: self.__create_token(TokenType.LEFT_BRACE),
+        '}': lambda self: self.__create_token(TokenType.RIGHT_BRACE),
+        ';': lambda self: self.__create_token(TokenType.SEMICOLON),
         '-': lambda self: self.__create_token(TokenType.MINUS),
         '+': lambda self: self.__create_token(TokenType.PLUS),
         '/': lambda self: self.__handle_slash(),
@@ -58,25 +62,39 @@ class Lexer:
         'false': TokenType.FALSE,
         'or': TokenType.OR,
         'true': TokenType.TRUE,
+        'var': TokenType.VAR,
     }
 
-    def __init__(self, input: str):
-        self.__current = SourcePosition.initial(input)
-        self.__start = self.__current
+    # errors are raised unless `diagnostics` is given, then they're appended to it and lexing carries on after the
+    # invalid char or, for an unterminated string, at the end of the input
+    def __init__(self, input: str, diagnostics: Optional[List[Diagnostic]] = None):
+        self.__source = Source(input)
+        self.__text = input
+        self.__current = 0
+        self.__start = 0
         self.__eof_emitted = False
+        self.__diagnostics = diagnostics
 
     def next(self) -> Optional[Token]:
-        if self.is_at_end:
-            if self.__eof_emitted:
-                return None
-
-            self.__eof_emitted = True
-            span = SourceSpan.from_positions(self.__current, self.__current.next())
-            return Token(TokenType.EOF, span, None)
-
-        self.__skip_whitespace()
-        self.__start = self.__current
-        return self.__scan_token()
+        while True:
+            self.__skip_whitespace()
+
+            if self.is_at_end:
+                if self.__eof_emitted:
+                    return None
+
+                self.__eof_emitted = True
+                span = SourceSpan(self.__source, self.__current, self.__current + 1)
+                return Token(TokenType.EOF, span, None)
+
+            self.__start = self.__current
+            try:
+                return self.__scan_token()
+            except LexerException as e:
+                if self.__diagnostics is None:
+                    raise
+                # the invalid text has already been consumed
+                self.__diagnostics.append(Diagnostic(e.span, e.message, e))
 
     def __scan_token(self):
         c = self.__advance()
@@ -117,8 +135,7 @@ class Lexer:
         self.__advance()
 
         # trim the quotes
-        literal_span = SourceSpan.from_positions(literal_start, literal_end)
-        return self.__create_token(TokenType.STRING, literal_span.text())
+        return self.__create_token(TokenType.STRING, self.__text[literal_start:literal_end])
 
     def __handle_number(self):
         has_decimal = False
@@ -135,31 +152,27 @@ class Lexer:
             while is_digit(self.__peek()):
                 self.__advance()
 
-        literal_span = SourceSpan.from_positions(self.__start, self.__current)
-        literal = float(literal_span.text()) if has_decimal else int(literal_span.text())
+        literal_text = self.__text[self.__start:self.__current]
+        literal = float(literal_text) if has_decimal else int(literal_text)
         return self.__create_token(TokenType.NUMBER, literal)
 
     def __handle_identifier(self):
         while is_alphanumeric(self.__peek()):
             self.__advance()
 
-        identifier_span = SourceSpan.from_positions(self.__start, self.__current)
-        keyword = self.__keywords.get(identifier_span.text())
+        keyword = self.__keywords.get(self.__text[self.__start:self.__current])
         if keyword is not None:
             return self.__create_token(keyword)
 
         return self.__create_token(TokenType.IDENTIFIER)
 
     def __skip_whitespace(self):
-        while not self.is_at_end and is_whitespace(self.current) or is_newline(self.current):
+        while not self.is_at_end and (is_whitespace(self.current) or is_newline(self.current)):
             self.__advance()
 
     def __advance(self) -> str:
         c = self.current
-        if is_newline(c):
-            self.__current = self.__current.new_line()
-        else:
-            self.__current = self.__current.next()
+        self.__current += 1
         return c
 
     def __advance_if(self, expected: str) -> bool:
@@ -172,25 +185,25 @@ class Lexer:
         return True
 
     def __peek(self, offset: int = 0) -> str:
-        if self.__current.position.offset + offset >= len(self.__current.source):
+        if self.__current + offset >= len(self.__text):
             return '\0'
-        return self.__current.source[self.__current.position.offset + offset]
+        return self.__text[self.__current + offset]
 
     def __create_token(self, token_type: TokenType, value: Optional[Union[str, float, bool]] = None) -> Token:
-        span = SourceSpan.from_positions(self.__start, self.__current)
+        span = SourceSpan(self.__source, self.__start, self.__current)
         return Token(token_type, span, value)
 
     def __error(self, exception_cls, message):
-        span = SourceSpan.from_positions(self.__start, self.__current)
+        span = SourceSpan(self.__source, self.__start, self.__current)
         return exception_cls(message, span)
 
     @property
     def current(self):
-        return self.__current.source[self.__current.position.offset]
+        return self.__text[self.__current]
 
     @property
     def is_at_end(self) -> bool:
-        return self.__current.is_at_end
+        return self.__current >= len(self.__text)
 
 
 class LexerException(Exception):
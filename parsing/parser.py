@@ -1,9 +1,13 @@
-from typing import List
+from typing import List, Optional, Tuple, Union
 
 import parsing.expr as exprs
+import parsing.stmt as stmts
+from parsing.diagnostics import Diagnostic
 from parsing.expr import Expr
 from parsing.source import SourceSpan, highlight
+from parsing.stmt import Stmt
 from parsing.token import Token, TokenType
+from parsing.token_buffer import TokenBuffer, TokenList
 
 
 token_type_to_binary_operator = {
@@ -34,20 +38,142 @@ def token_to_unary_operator(token: Token) -> exprs.UnaryOperator:
     return exprs.UnaryOperator(type, token.span)
 
 
+# tokens which can only start a statement, or end the block a statement is in
+synchronization_tokens = {TokenType.VAR, TokenType.LEFT_BRACE, TokenType.RIGHT_BRACE, TokenType.EOF}
+
+
 class Parser:
-    def __init__(self, tokens: List[Token]):
-        self.__tokens = tokens
+    # Errors are raised unless `diagnostics` is given, then parse() appends each one to it, skips to the start of the
+    # next statement and carries on. The statements which parsed are returned, along with blocks which were still open
+    # at the end of the input.
+    def __init__(self, tokens: Union[List[Token], TokenBuffer], diagnostics: Optional[List[Diagnostic]] = None):
+        self.__tokens = tokens if isinstance(tokens, TokenBuffer) else TokenList(tokens)
+        self.__length = len(tokens)
         self.__current = 0
+        self.__diagnostics = diagnostics
+
+    # statements
+    def parse(self) -> List[Stmt]:
+        # blocks are kept on an explicit stack of the ones still open rather than parsed by recursion, so however deeply
+        # they're nested doesn't grow python's stack
+        statements: List[Stmt] = []
+        # (index of the '{', statements of the enclosing block)
+        open_blocks: List[Tuple[int, List[Stmt]]] = []
+
+        while True:
+            if self.is_at_end or self.__check(TokenType.EOF):
+                if open_blocks:
+                    statements = self.__close_unterminated_blocks(statements, open_blocks)
+                return statements
+
+            if open_blocks and self.__match(TokenType.RIGHT_BRACE):
+                start, enclosing = open_blocks.pop()
+                enclosing.append(self.__create_block(start, statements))
+                statements = enclosing
+            elif self.__match(TokenType.LEFT_BRACE):
+                open_blocks.append((self.__current - 1, statements))
+                statements = []
+            else:
+                self.__declaration(statements)
+
+    def __close_unterminated_blocks(self, statements: List[Stmt], open_blocks: List[Tuple[int, List[Stmt]]]) -> List[Stmt]:
+        if self.__diagnostics is None:
+            raise UnexpectedTokenError(TokenType.RIGHT_BRACE, self.__peek(), 'Expected \'}\' after block')
+
+        # the input ended inside blocks, keep what they had
+        while open_blocks:
+            e = UnexpectedTokenError(TokenType.RIGHT_BRACE, self.__peek(), 'Expected \'}\' after block')
+            self.__diagnostics.append(Diagnostic(e.token.span, e.message, e))
+            start, enclosing = open_blocks.pop()
+            enclosing.append(self.__create_block(start, statements))
+            statements = enclosing
+        return statements
+
+    def __create_block(self, start: int, statements: List[Stmt]) -> Stmt:
+        stmt = stmts.Block(statements)
+        stmt.span = self.__tokens.span_between(start, self.__current - 1)
+        return stmt
+
+    def __declaration(self, statements: List[Stmt]):
+        if self.__diagnostics is None:
+            statements.append(self.__declaration_or_error())
+            return
+
+        start = self.__current
+        try:
+            statements.append(self.__declaration_or_error())
+        except ParserException as e:
+            self.__diagnostics.append(Diagnostic(e.token.span, e.message, e))
+            self.__synchronize(start)
+
+    def __synchronize(self, start: int):
+        # a statement which failed on its first token skips just that token, others skip to the next statement
+        if self.__current == start:
+            self.__advance()
+            return
+
+        while not self.is_at_end:
+            if self.__tokens.type(self.__current - 1) == TokenType.SEMICOLON:
+                return
+            if self.__tokens.type(self.__current) in synchronization_tokens:
+                return
+            self.__advance()
+
+    def __declaration_or_error(self) -> Stmt:
+        if self.__match(TokenType.VAR):
+            return self.__var_declaration()
+
+        # blocks are handled by parse()
+        return self.__expression_statement()
+
+    def __var_declaration(self) -> Stmt:
+        start = self.__current - 1
+        self.__consume(TokenType.IDENTIFIER, 'Expected variable name')
+        name = self.__tokens.span(self.__current - 1).text()
+
+        initializer = None
+        if self.__match(TokenType.EQUAL):
+            initializer = self.__assignment()
+
+        self.__consume(TokenType.SEMICOLON, 'Expected \';\' after variable declaration')
+        stmt = stmts.Var(name, initializer)
+        stmt.span = self.__tokens.span_between(start, self.__current - 1)
+        return stmt
+
+    def __expression_statement(self) -> Stmt:
+        expr = self.__assignment()
+        self.__consume(TokenType.SEMICOLON, 'Expected \';\' after expression')
+
+        stmt = stmts.Expression(expr)
+        stmt.span = SourceSpan.from_spans(expr.span, self.__tokens.span(self.__current - 1))
+        return stmt
 
     # expressions
     def expression(self) -> Expr:
         return self.__equality()
 
+    def __assignment(self) -> Expr:
+        # only allowed at the top of statements, so the other parsers and engines never see assignments
+        expr = self.__equality()
+
+        if self.__match(TokenType.EQUAL):
+            equals = self.__tokens[self.__current - 1]
+            value = self.__assignment()
+
+            if not isinstance(expr, exprs.Variable):
+                raise ParserException(equals, 'Invalid assignment target')
+
+            new_expr = exprs.Assign(expr.name, value)
+            new_expr.span = SourceSpan.from_spans(expr.span, value.span)
+            return new_expr
+
+        return expr
+
     def __equality(self) -> Expr:
         expr = self.__comparison()
 
         while self.__match(TokenType.BANG_EQUAL, TokenType.EQUAL_EQUAL):
-            operator = token_to_binary_operator(self.__previous())
+            operator = self.__binary_operator()
             right = self.__comparison()
             new_expr = exprs.Binary(expr, operator, right)
             new_expr.span = SourceSpan.from_spans(expr.span, right.span)
@@ -59,7 +185,7 @@ class Parser:
         expr = self.__addition()
 
         while self.__match(TokenType.GREATER, TokenType.GREATER_EQUAL, TokenType.LESS, TokenType.LESS_EQUAL):
-            operator = token_to_binary_operator(self.__previous())
+            operator = self.__binary_operator()
             right = self.__addition()
             new_expr = exprs.Binary(expr, operator, right)
             new_expr.span = SourceSpan.from_spans(expr.span, right.span)
@@ -71,7 +197,7 @@ class Parser:
         expr = self.__multiplication()
 
         while self.__match(TokenType.PLUS, TokenType.MINUS):
-            operator = token_to_binary_operator(self.__previous())
+            operator = self.__binary_operator()
             right = self.__multiplication()
             new_expr = exprs.Binary(expr, operator, right)
             new_expr.span = SourceSpan.from_spans(expr.span, right.span)
@@ -83,7 +209,7 @@ class Parser:
         expr = self.__unary()
 
         while self.__match(TokenType.SLASH, TokenType.STAR):
-            operator = token_to_binary_operator(self.__previous())
+            operator = self.__binary_operator()
             right = self.__unary()
             new_expr = exprs.Binary(expr, operator, right)
             new_expr.span = SourceSpan.from_spans(expr.span, right.span)
@@ -93,7 +219,7 @@ class Parser:
 
     def __unary(self) -> Expr:
         if self.__match(TokenType.BANG, TokenType.MINUS):
-            operator = token_to_unary_operator(self.__previous())
+            operator = self.__unary_operator()
             inner_expr = self.__unary()
             expr = exprs.Unary(operator, inner_expr)
             expr.span = SourceSpan.from_spans(operator.span, inner_expr.span)
@@ -104,7 +230,7 @@ class Parser:
     def __primary(self) -> Expr:
         def literal(value) -> Expr:
             expr = exprs.Literal(value)
-            expr.span = self.__previous().span
+            expr.span = self.__tokens.span(self.__current - 1)
             return expr
 
         if self.__match(TokenType.FALSE):
@@ -113,18 +239,34 @@ class Parser:
             return literal(True)
 
         if self.__match(TokenType.NUMBER, TokenType.STRING):
-            return literal(self.__previous().literal)
+            return literal(self.__tokens.literal(self.__current - 1))
+
+        if self.__match(TokenType.IDENTIFIER):
+            span = self.__tokens.span(self.__current - 1)
+            expr = exprs.Variable(span.text())
+            expr.span = span
+            return expr
 
         if self.__match(TokenType.LEFT_PAREN):
-            start = self.__previous()
+            start = self.__current - 1
             expr = exprs.Grouping(self.expression())
-            end = self.__consume(TokenType.RIGHT_PAREN, 'Expected \')\' after expression')
-            expr.span = SourceSpan.from_spans(start.span, end.span)
+            self.__consume(TokenType.RIGHT_PAREN, 'Expected \')\' after expression')
+            expr.span = self.__tokens.span_between(start, self.__current - 1)
             return expr
 
         raise ParserException(self.__peek(), 'Expected expression')
 
     # helpers
+    def __binary_operator(self) -> exprs.BinaryOperator:
+        index = self.__current - 1
+        type = token_type_to_binary_operator[self.__tokens.type(index)]
+        return exprs.BinaryOperator(type, self.__tokens.span(index))
+
+    def __unary_operator(self) -> exprs.UnaryOperator:
+        index = self.__current - 1
+        type = token_type_to_unary_operator[self.__tokens.type(index)]
+        return exprs.UnaryOperator(type, self.__tokens.span(index))
+
     def __match(self, *args: TokenType) -> bool:
         for token_type in args:
             if self.__check(token_type):
@@ -137,29 +279,25 @@ class Parser:
         if self.is_at_end:
             return False
 
-        return self.__peek().type == token_type
+        return self.__tokens.type(self.__current) == token_type
 
-    def __consume(self, token_type: TokenType, error_message: str) -> Token:
+    def __consume(self, token_type: TokenType, error_message: str):
         if self.__check(token_type):
-            return self.__advance()
+            self.__advance()
+            return
 
         raise UnexpectedTokenError(token_type, self.__peek(), error_message)
 
-    def __advance(self) -> Token:
+    def __advance(self):
         if not self.is_at_end:
             self.__current += 1
 
-        return self.__previous()
-
     def __peek(self) -> Token:
         return self.__tokens[self.__current]
 
-    def __previous(self) -> Token:
-        return self.__tokens[self.__current - 1]
-
     @property
     def is_at_end(self) -> bool:
-        return self.__current >= len(self.__tokens)
+        return self.__current >= self.__length
 
 
 class ParserException(Exception):
@@ -171,8 +309,12 @@ class ParserException(Exception):
     def token(self) -> Token:
         return self.__token
 
+    @property
+    def message(self) -> str:
+        return self.__message
+
     def __str__(self) -> str:
-        return '{} ({} at {})\n{}'.format(self.__message, self.__token.type, self.token.span, highlight(self.token.span))
+        return '{} ({} at {})\n{}'.format(self.message, self.token.type, self.token.span, highlight(self.token.span))
 
 
 class UnexpectedTokenError(ParserException):
@@ -181,4 +323,4 @@ class UnexpectedTokenError(ParserException):
         self.__expected_type = expected_type
 
     def __str__(self) -> str:
-        return '{} (expected {} but got {} at {})\n{}'.format(self.__message, self.__expected_type, self.token.type, self.token.span, highlight(self.token.span))
+        return '{} (expected {} but got {} at {})\n{}'.format(self.message, self.__expected_type, self.token.type, self.token.span, highlight(self.token.span))
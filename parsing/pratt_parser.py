@@ -0,0 +1,118 @@
+from enum import IntEnum
+from typing import Callable, Dict, List, Tuple, Union
+
+import parsing.expr as exprs
+from parsing.expr import Expr
+from parsing.parser import ParserException, UnexpectedTokenError
+from parsing.source import SourceSpan
+from parsing.token import Literal, Token, TokenType
+from parsing.token_buffer import TokenBuffer, TokenList
+
+
+class Precedence(IntEnum):
+    NONE = 0
+    EQUALITY = 1
+    COMPARISON = 2
+    TERM = 3
+    FACTOR = 4
+    UNARY = 5
+
+
+# every binary operator is left associative, so its right operand is parsed one level above its own precedence
+infix_operators: Dict[TokenType, Tuple[Precedence, exprs.BinaryOperatorType]] = {
+    TokenType.BANG_EQUAL: (Precedence.EQUALITY, exprs.BinaryOperatorType.NOT_EQUAL),
+    TokenType.EQUAL_EQUAL: (Precedence.EQUALITY, exprs.BinaryOperatorType.EQUAL),
+    TokenType.GREATER: (Precedence.COMPARISON, exprs.BinaryOperatorType.GREATER),
+    TokenType.GREATER_EQUAL: (Precedence.COMPARISON, exprs.BinaryOperatorType.GREATER_EQUAL),
+    TokenType.LESS: (Precedence.COMPARISON, exprs.BinaryOperatorType.LESS),
+    TokenType.LESS_EQUAL: (Precedence.COMPARISON, exprs.BinaryOperatorType.LESS_EQUAL),
+    TokenType.PLUS: (Precedence.TERM, exprs.BinaryOperatorType.PLUS),
+    TokenType.MINUS: (Precedence.TERM, exprs.BinaryOperatorType.MINUS),
+    TokenType.SLASH: (Precedence.FACTOR, exprs.BinaryOperatorType.DIVIDE),
+    TokenType.STAR: (Precedence.FACTOR, exprs.BinaryOperatorType.MULTIPLY),
+}
+
+prefix_operators: Dict[TokenType, exprs.UnaryOperatorType] = {
+    TokenType.BANG: exprs.UnaryOperatorType.NOT,
+    TokenType.MINUS: exprs.UnaryOperatorType.NEGATE,
+}
+
+
+class PrattParser:
+    # produces the same trees and errors as Parser but each operand only costs one call per operator it is part of
+    __prefix_switch: Dict[TokenType, Callable[['PrattParser'], Expr]] = {
+        TokenType.FALSE: lambda self: self.__literal(False),
+        TokenType.TRUE: lambda self: self.__literal(True),
+        TokenType.NUMBER: lambda self: self.__literal(self.__tokens.literal(self.__current - 1)),
+        TokenType.STRING: lambda self: self.__literal(self.__tokens.literal(self.__current - 1)),
+        TokenType.IDENTIFIER: lambda self: self.__variable(),
+        TokenType.LEFT_PAREN: lambda self: self.__grouping(),
+        TokenType.BANG: lambda self: self.__unary(),
+        TokenType.MINUS: lambda self: self.__unary(),
+    }
+
+    def __init__(self, tokens: Union[List[Token], TokenBuffer]):
+        self.__tokens = tokens if isinstance(tokens, TokenBuffer) else TokenList(tokens)
+        self.__length = len(tokens)
+        self.__current = 0
+
+    # expressions
+    def expression(self) -> Expr:
+        return self.__parse(Precedence.EQUALITY)
+
+    def __parse(self, precedence: Precedence) -> Expr:
+        expr = self.__prefix()
+
+        while self.__current < self.__length:
+            infix = infix_operators.get(self.__tokens.type(self.__current))
+            if infix is None or infix[0] < precedence:
+                break
+
+            operator = exprs.BinaryOperator(infix[1], self.__tokens.span(self.__current))
+            self.__current += 1
+
+            right = self.__parse(infix[0] + 1)
+            new_expr = exprs.Binary(expr, operator, right)
+            new_expr.span = SourceSpan.from_spans(expr.span, right.span)
+            expr = new_expr
+
+        return expr
+
+    def __prefix(self) -> Expr:
+        handler = self.__prefix_switch.get(self.__tokens.type(self.__current)) if self.__current < self.__length else None
+        if handler is None:
+            raise ParserException(self.__tokens[self.__current], 'Expected expression')
+
+        self.__current += 1
+        return handler(self)
+
+    def __literal(self, value: Literal) -> Expr:
+        expr = exprs.Literal(value)
+        expr.span = self.__tokens.span(self.__current - 1)
+        return expr
+
+    def __variable(self) -> Expr:
+        span = self.__tokens.span(self.__current - 1)
+        expr = exprs.Variable(span.text())
+        expr.span = span
+        return expr
+
+    def __grouping(self) -> Expr:
+        start = self.__current - 1
+        expr = exprs.Grouping(self.__parse(Precedence.EQUALITY))
+
+        if self.__current >= self.__length or self.__tokens.type(self.__current) != TokenType.RIGHT_PAREN:
+            raise UnexpectedTokenError(TokenType.RIGHT_PAREN, self.__tokens[self.__current], 'Expected \')\' after expression')
+        self.__current += 1
+
+        expr.span = self.__tokens.span_between(start, self.__current - 1)
+        return expr
+
+    def __unary(self) -> Expr:
+        index = self.__current - 1
+        operator = exprs.UnaryOperator(prefix_operators[self.__tokens.type(index)], self.__tokens.span(index))
+
+        inner_expr = self.__prefix()
+        expr = exprs.Unary(operator, inner_expr)
+        expr.span = SourceSpan.from_spans(operator.span, inner_expr.span)
+        return expr
@@ -0,0 +1,134 @@
+import re
+from typing import Dict, Iterator, List, Match, Optional
+
+from parsing.diagnostics import Diagnostic
+from parsing.lexer import InvalidLexerCharException, LexerException, UnterminatedStringException
+from parsing.source import Source, SourceSpan
+from parsing.token import Literal, Token, TokenType
+from parsing.token_buffer import TokenBuffer
+
+# a single alternation that classifies every character of the input, `invalid` must stay last as it is the catch-all
+token_pattern = re.compile(r'''
+    (?P<whitespace>[ \t\r\n]+)
+  | (?P<comment>//[^\n]*)
+  | (?P<number>[0-9]+(?:\.[0-9]+)?)
+  | (?P<identifier>[A-Za-z_][A-Za-z0-9_]*)
+  | (?P<string>"[^"]*")
+  | (?P<unterminated_string>")
+  | (?P<operator>[!=<>]=?|[(){};\-+/*])
+  | (?P<invalid>.)
+''', re.VERBOSE | re.DOTALL)
+
+operators: Dict[str, TokenType] = {
+    '(': TokenType.LEFT_PAREN,
+    ')': TokenType.RIGHT_PAREN,
+    '{': TokenType.LEFT_BRACE,
+    '}': TokenType.RIGHT_BRACE,
+    ';': TokenType.SEMICOLON,
+    '-': TokenType.MINUS,
+    '+': TokenType.PLUS,
+    '/': TokenType.SLASH,
+    '*': TokenType.STAR,
+
+    '!': TokenType.BANG,
+    '!=': TokenType.BANG_EQUAL,
+    '=': TokenType.EQUAL,
+    '==': TokenType.EQUAL_EQUAL,
+    '<': TokenType.LESS,
+    '<=': TokenType.LESS_EQUAL,
+    '>': TokenType.GREATER,
+    '>=': TokenType.GREATER_EQUAL,
+}
+
+keywords: Dict[str, TokenType] = {
+    'and': TokenType.AND,
+    'false': TokenType.FALSE,
+    'or': TokenType.OR,
+    'true': TokenType.TRUE,
+    'var': TokenType.VAR,
+}
+
+
+def get_token_buffer(input: str, diagnostics: Optional[List[Diagnostic]] = None) -> TokenBuffer:
+    # same scan as RegexLexer but appends straight into the buffer without creating Token or SourceSpan objects. Like
+    # Lexer, errors are appended to `diagnostics` when it's given and lexing carries on after them
+    source = Source(input)
+    buffer = TokenBuffer(source)
+    append = buffer.append
+
+    for match in token_pattern.finditer(input):
+        kind = match.lastgroup
+
+        if kind == 'whitespace' or kind == 'comment':
+            continue
+        elif kind == 'operator':
+            append(operators[match.group()], match.start(), match.end())
+        elif kind == 'number':
+            text = match.group()
+            append(TokenType.NUMBER, match.start(), match.end(), float(text) if '.' in text else int(text))
+        elif kind == 'identifier':
+            append(keywords.get(match.group(), TokenType.IDENTIFIER), match.start(), match.end())
+        elif kind == 'string':
+            append(TokenType.STRING, match.start(), match.end(), match.group()[1:-1])
+        elif kind == 'unterminated_string':
+            span = SourceSpan(source, match.start(), len(input))
+            error: LexerException = UnterminatedStringException('Unterminated string', span)
+            if diagnostics is None:
+                raise error
+            # the rest of the input is inside the string
+            diagnostics.append(Diagnostic(error.span, error.message, error))
+            break
+        else:
+            span = SourceSpan(source, match.start(), match.end())
+            error = InvalidLexerCharException('Invalid char \'{}\''.format(match.group()), span)
+            if diagnostics is None:
+                raise error
+            diagnostics.append(Diagnostic(error.span, error.message, error))
+
+    append(TokenType.EOF, len(input), len(input) + 1)
+    return buffer
+
+
+class RegexLexer:
+    # drop-in replacement for Lexer which classifies each token with one regex match instead of stepping per character
+    def __init__(self, input: str):
+        self.__source = Source(input)
+        self.__matches: Iterator[Match[str]] = token_pattern.finditer(input)
+        self.__eof_emitted = False
+
+    def next(self) -> Optional[Token]:
+        for match in self.__matches:
+            kind = match.lastgroup
+            start = match.start()
+            end = match.end()
+
+            if kind == 'whitespace' or kind == 'comment':
+                continue
+            elif kind == 'operator':
+                return self.__create_token(operators[match.group()], start, end)
+            elif kind == 'number':
+                text = match.group()
+                literal = float(text) if '.' in text else int(text)
+                return self.__create_token(TokenType.NUMBER, start, end, literal)
+            elif kind == 'identifier':
+                token_type = keywords.get(match.group(), TokenType.IDENTIFIER)
+                return self.__create_token(token_type, start, end)
+            elif kind == 'string':
+                return self.__create_token(TokenType.STRING, start, end, match.group()[1:-1])
+            elif kind == 'unterminated_string':
+                span = SourceSpan(self.__source, start, len(self.__source.text))
+                raise UnterminatedStringException('Unterminated string', span)
+            else:
+                span = SourceSpan(self.__source, start, end)
+                raise InvalidLexerCharException('Invalid char \'{}\''.format(match.group()), span)
+
+        if self.__eof_emitted:
+            return None
+
+        self.__eof_emitted = True
+        end = len(self.__source.text)
+        return self.__create_token(TokenType.EOF, end, end + 1)
+
+    def __create_token(self, token_type: TokenType, start: int, end: int, value: Optional[Literal] = None) -> Token:
+        span = SourceSpan(self.__source, start, end)
+        return Token(token_type, span, value)
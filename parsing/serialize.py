@@ -0,0 +1,118 @@
+import marshal
+from typing import Any, List, Tuple
+
+import parsing.expr as exprs
+from parsing.expr import Expr
+from parsing.source import Source, SourceSpan
+
+# bump whenever the nodes or the layout below change, older data is then rejected
+FORMAT_VERSION = 2
+
+LITERAL = 0
+BINARY = 1
+GROUPING = 2
+UNARY = 3
+VARIABLE = 4
+
+
+class SerializationException(Exception):
+    pass
+
+
+def dumps(expression: Expr) -> bytes:
+    # Writes the tree in post order as one flat tuple of ints and literal values, spans are kept as offsets into
+    # the source which isn't stored. Each node is:
+    #   LITERAL value start end
+    #   BINARY operator operator_start operator_end start end
+    #   GROUPING start end
+    #   UNARY operator operator_start operator_end start end
+    #   VARIABLE name start end
+    output: List[Any] = []
+    # (node, children written)
+    stack: List[Tuple[Expr, bool]] = [(expression, False)]
+
+    while stack:
+        node, ready = stack.pop()
+        span = node.span
+
+        if isinstance(node, exprs.Literal):
+            output.extend((LITERAL, node.value, span.start, span.end))
+        elif isinstance(node, exprs.Variable):
+            output.extend((VARIABLE, node.name, span.start, span.end))
+        elif not ready:
+            stack.append((node, True))
+            if isinstance(node, exprs.Binary):
+                stack.append((node.right, False))
+                stack.append((node.left, False))
+            elif isinstance(node, exprs.Grouping) or isinstance(node, exprs.Unary):
+                stack.append((node.expression, False))
+            else:
+                raise SerializationException('Unexpected node {}'.format(node))
+        elif isinstance(node, exprs.Binary):
+            output.extend((BINARY, node.operator.type.value, node.operator.span.start, node.operator.span.end,
+                           span.start, span.end))
+        elif isinstance(node, exprs.Grouping):
+            output.extend((GROUPING, span.start, span.end))
+        elif isinstance(node, exprs.Unary):
+            output.extend((UNARY, node.operator.type.value, node.operator.span.start, node.operator.span.end,
+                           span.start, span.end))
+
+    return marshal.dumps(tuple(output))
+
+
+def loads(data: bytes, source: Source) -> Expr:
+    # rebuilds a tree written by dumps(), spans point into `source` which has to be the text the tree was parsed from
+    try:
+        items = marshal.loads(data)
+    except (EOFError, ValueError, TypeError) as e:
+        raise SerializationException('Corrupt data: {}'.format(e))
+    if not isinstance(items, tuple):
+        raise SerializationException('Corrupt data')
+
+    values: List[Expr] = []
+    length = len(items)
+    i = 0
+
+    try:
+        while i < length:
+            tag = items[i]
+
+            if tag == LITERAL:
+                node: Expr = exprs.Literal(items[i + 1])
+                node.span = SourceSpan(source, items[i + 2], items[i + 3])
+                values.append(node)
+                i += 4
+            elif tag == VARIABLE:
+                node = exprs.Variable(items[i + 1])
+                node.span = SourceSpan(source, items[i + 2], items[i + 3])
+                values.append(node)
+                i += 4
+            elif tag == BINARY:
+                right = values.pop()
+                operator = exprs.BinaryOperator(exprs.BinaryOperatorType(items[i + 1]),
+                                                SourceSpan(source, items[i + 2], items[i + 3]))
+                node = exprs.Binary(values[-1], operator, right)
+                node.span = SourceSpan(source, items[i + 4], items[i + 5])
+                values[-1] = node
+                i += 6
+            elif tag == GROUPING:
+                node = exprs.Grouping(values[-1])
+                node.span = SourceSpan(source, items[i + 1], items[i + 2])
+                values[-1] = node
+                i += 3
+            elif tag == UNARY:
+                operator = exprs.UnaryOperator(exprs.UnaryOperatorType(items[i + 1]),
+                                               SourceSpan(source, items[i + 2], items[i + 3]))
+                node = exprs.Unary(operator, values[-1])
+                node.span = SourceSpan(source, items[i + 4], items[i + 5])
+                values[-1] = node
+                i += 6
+            else:
+                raise SerializationException('Unknown node tag {}'.format(tag))
+    except (IndexError, ValueError) as e:
+        raise SerializationException('Corrupt data: {}'.format(e))
+
+    if len(values) != 1:
+        raise SerializationException('Corrupt data: expected a single expression')
+
+    return values[0]
@@ -1,19 +1,13 @@
+from bisect import bisect_right
+from typing import List, Optional
+
+
 class Position:
     def __init__(self, offset: int, line: int, line_offset: int) -> None:
         self.__offset = offset
         self.__line = line
         self.__line_offset = line_offset
 
-    @staticmethod
-    def initial() -> 'Position':
-        return Position(0, 1, 1)
-
-    def next(self) -> 'Position':
-        return Position(self.offset + 1, self.line, self.line_offset + 1)
-
-    def new_line(self) -> 'Position':
-        return Position(self.offset + 1, self.line + 1, 1)
-
     @property
     def offset(self) -> int:
         return self.__offset
@@ -30,93 +24,198 @@ class Position:
         return "line {} offset {}".format(self.line, self.line_offset)
 
 
-class SourcePosition:
-    def __init__(self, source: str, position: Position) -> None:
-        self.__source = source
-        self.__position = position
+class Source:
+    # a stream is split into fragments, `offset`, `line` and `column` locate the fragment within the stream. A fragment
+    # which starts part way through a line keeps `prefix`, the end of that line before it, for highlighting
+    def __init__(self, text: str, offset: int = 0, line: int = 1, origin: Optional[object] = None, column: int = 1,
+                 prefix: str = '') -> None:
+        self.__text = text
+        self.__offset = offset
+        self.__line = line
+        self.__origin = origin
+        self.__column = column
+        self.__prefix = prefix
+        self.__line_starts: Optional[List[int]] = None
+        self.__next: Optional['Source'] = None
+        self.__last_fragment: Optional['Source'] = None
 
-    @staticmethod
-    def initial(source: str) -> 'SourcePosition':
-        return SourcePosition(source, Position.initial())
+    @property
+    def text(self) -> str:
+        return self.__text
+
+    @property
+    def offset(self) -> int:
+        return self.__offset
 
-    def next(self) -> 'SourcePosition':
-        return SourcePosition(self.source, self.position.next())
+    @property
+    def end_offset(self) -> int:
+        return self.__offset + len(self.__text)
 
-    def new_line(self) -> 'SourcePosition':
-        return SourcePosition(self.source, self.position.new_line())
+    @property
+    def line(self) -> int:
+        return self.__line
 
     @property
-    def source(self) -> str:
-        return self.__source
+    def column(self) -> int:
+        return self.__column
 
     @property
-    def position(self) -> Position:
-        return self.__position
+    def origin(self) -> object:
+        return self if self.__origin is None else self.__origin
 
     @property
-    def is_at_end(self) -> bool:
-        return self.position.offset >= len(self.source)
+    def next(self) -> Optional['Source']:
+        return self.__next
+
+    @next.setter
+    def next(self, value: Optional['Source']):
+        self.__next = value
+
+    @property
+    def line_starts(self) -> List[int]:
+        # only built the first time a line number is needed, i.e. when a span is displayed
+        if self.__line_starts is None:
+            offset = self.__offset
+            line_starts = [offset]
+            find = self.__text.find
+
+            index = find('\n')
+            while index != -1:
+                line_starts.append(offset + index + 1)
+                index = find('\n', index + 1)
+
+            self.__line_starts = line_starts
+
+        return self.__line_starts
+
+    def position(self, offset: int) -> Position:
+        line_starts = self.line_starts
+        index = bisect_right(line_starts, offset)
+        line_offset = offset - line_starts[index - 1] + 1
+        if index == 1:
+            line_offset += self.__column - 1
+        return Position(offset, self.__line + index - 1, line_offset)
+
+    def line_text(self, line: int) -> str:
+        line_starts = self.line_starts
+        index = line - self.__line
+        start = line_starts[index] - self.__offset
+        if index + 1 < len(line_starts):
+            return (self.__prefix if index == 0 else '') + self.__text[start:line_starts[index + 1] - 1 - self.__offset]
+
+        # the last line can carry on into the following fragments
+        parts = [self.__prefix if index == 0 else '', self.__text[start:]]
+        fragment = (self.__last_fragment or self).next
+        while fragment is not None:
+            end = fragment.text.find('\n')
+            if end != -1:
+                parts.append(fragment.text[:end])
+                break
+            parts.append(fragment.text)
+            fragment = fragment.next
+        return ''.join(parts)
+
+    def line_column(self, line: int) -> int:
+        # column of the first character line_text returns, the start of a very long line might not have been kept
+        if line != self.__line:
+            return 1
+        return self.__column - len(self.__prefix)
+
+    def substring(self, start: int, end: int) -> str:
+        return self.__text[start - self.__offset:end - self.__offset]
+
+    def join(self, other: 'Source') -> 'Source':
+        # fragments of the same stream are linked in order so the text between them can be recovered
+        if other.origin is not self.origin or other.offset < self.offset:
+            raise Exception('Sources don\'t match')
+        if other.end_offset <= self.end_offset:
+            return self
+
+        parts = [self.__text]
+        end = self.end_offset
+        fragment = self.__last_fragment or self
+        while end < other.end_offset:
+            fragment = fragment.next
+            if fragment is None:
+                raise Exception('Sources don\'t match')
+
+            parts.append(fragment.text[end - fragment.offset:])
+            end = fragment.end_offset
+
+        joined = Source(''.join(parts), self.__offset, self.__line, self.origin, self.__column, self.__prefix)
+        joined.__last_fragment = fragment
+        return joined
 
 
 class SourceSpan:
-    def __init__(self, source: str, start: Position, end: Position) -> None:
+    # every token and node has one, slots keep them to a single small allocation each
+    __slots__ = ('__source', '__start', '__end')
+
+    def __init__(self, source: Source, start: int, end: int) -> None:
         self.__source = source
         self.__start = start
         self.__end = end
 
-    @staticmethod
-    def from_positions(start: SourcePosition, end: SourcePosition) -> 'SourceSpan':
-        if start.source != end.source:
-            raise Exception('Sources don\'t match')
-
-        return SourceSpan(start.source, start.position, end.position)
-
     @staticmethod
     def from_spans(start: 'SourceSpan', end: 'SourceSpan'):
-        if start.source != end.source:
-            raise Exception('Sources don\'t match')
+        source = start.source
+        if source is not end.source:
+            source = source.join(end.source)
 
-        return SourceSpan(start.source, start.start, end.end)
+        return SourceSpan(source, start.start, end.end)
 
     def text(self):
-        return self.source[self.start.offset:self.end.offset]
+        return self.source.substring(self.start, self.end)
 
     @property
-    def source(self) -> str:
+    def source(self) -> Source:
         return self.__source
 
     @property
-    def start(self) -> Position:
+    def start(self) -> int:
         return self.__start
 
     @property
-    def end(self) -> Position:
+    def end(self) -> int:
         return self.__end
 
+    @property
+    def start_position(self) -> Position:
+        return self.source.position(self.start)
+
+    @property
+    def end_position(self) -> Position:
+        return self.source.position(self.end)
+
     def __str__(self) -> str:
-        if self.start.line == self.end.line:
-            if self.start.line_offset + 1 == self.end.line_offset:
-                return '{}'.format(self.start)
-            return '{}-{}'.format(self.start, self.end.line_offset)
+        start = self.start_position
+        end = self.end_position
 
-        return '{} - {}'.format(self.start, self.end)
+        if start.line == end.line:
+            if start.line_offset + 1 == end.line_offset:
+                return '{}'.format(start)
+            return '{}-{}'.format(start, end.line_offset)
+
+        return '{} - {}'.format(start, end)
 
 
 def highlight(span: SourceSpan) -> str:
-    lines = span.source.split('\n')[span.start.line - 1:span.end.line]
+    start = span.start_position
+    end = span.end_position
 
     output = []
-    for i, line in enumerate(lines):
-        line_number = i + span.start.line
-
-        if line_number == span.start.line:
-            highlight = ' ' * (span.start.line_offset - 1)
-            if line_number == span.end.line:
-                highlight += '~' * (span.end.line_offset - span.start.line_offset)
+    for line_number in range(start.line, end.line + 1):
+        line = span.source.line_text(line_number)
+        first = span.source.line_column(line_number)
+
+        if line_number == start.line:
+            highlight = ' ' * (start.line_offset - first)
+            if line_number == end.line:
+                highlight += '~' * (end.line_offset - start.line_offset)
             else:
-                highlight += '~' * (len(line) - span.start.line_offset + 1)
-        elif line_number == span.end.line:
-            highlight = '~' * (span.end.line_offset - 1)
+                highlight += '~' * (len(line) - start.line_offset + first)
+        elif line_number == end.line:
+            highlight = '~' * (end.line_offset - first)
         else:
             highlight = '~' * len(line)
 
@@ -0,0 +1,130 @@
+from typing import List, Union
+
+import parsing.expr as exprs
+from parsing.expr import Expr
+from parsing.parser import ParserException, UnexpectedTokenError
+from parsing.pratt_parser import infix_operators, prefix_operators
+from parsing.source import SourceSpan
+from parsing.token import Token, TokenType
+from parsing.token_buffer import TokenBuffer, TokenList
+
+literal_tokens = {
+    TokenType.FALSE: False,
+    TokenType.TRUE: True,
+}
+
+
+class UnaryFrame:
+    def __init__(self, operator: exprs.UnaryOperator) -> None:
+        self.operator = operator
+
+
+class GroupingFrame:
+    # `start` is the index of the '('
+    def __init__(self, start: int) -> None:
+        self.start = start
+
+
+class BinaryFrame:
+    def __init__(self, precedence: int, left: Expr, operator: exprs.BinaryOperator) -> None:
+        self.precedence = precedence
+        self.left = left
+        self.operator = operator
+
+
+Frame = Union[UnaryFrame, GroupingFrame, BinaryFrame]
+
+
+class StackParser:
+    # Parses with an explicit stack of pending operators and groupings so nesting depth is not limited by Python's
+    # recursion limit. Produces the same trees and errors as Parser.
+    def __init__(self, tokens: Union[List[Token], TokenBuffer]):
+        self.__tokens = tokens if isinstance(tokens, TokenBuffer) else TokenList(tokens)
+        self.__length = len(tokens)
+        self.__current = 0
+
+    def expression(self) -> Expr:
+        stack: List[Frame] = []
+
+        while True:
+            expr = self.__operand(stack)
+
+            while True:
+                while stack and isinstance(stack[-1], UnaryFrame):
+                    operator = stack.pop().operator
+                    new_expr = exprs.Unary(operator, expr)
+                    new_expr.span = SourceSpan.from_spans(operator.span, expr.span)
+                    expr = new_expr
+
+                infix = infix_operators.get(self.__peek_type())
+                if infix is not None:
+                    expr = self.__reduce(stack, expr, infix[0])
+
+                    stack.append(BinaryFrame(infix[0], expr,
+                                             exprs.BinaryOperator(infix[1], self.__tokens.span(self.__current))))
+                    self.__current += 1
+                    break
+
+                expr = self.__reduce(stack, expr, 0)
+                if not stack:
+                    return expr
+
+                # only a grouping can be left on top of the stack
+                start = stack.pop().start
+                if self.__peek_type() != TokenType.RIGHT_PAREN:
+                    raise UnexpectedTokenError(TokenType.RIGHT_PAREN, self.__tokens[self.__current],
+                                               'Expected \')\' after expression')
+                self.__current += 1
+
+                expr = exprs.Grouping(expr)
+                expr.span = self.__tokens.span_between(start, self.__current - 1)
+
+    def __operand(self, stack: List[Frame]) -> Expr:
+        # pushes any prefix operators and open parentheses, then returns the literal that follows them
+        while True:
+            token_type = self.__peek_type()
+
+            unary = prefix_operators.get(token_type)
+            if unary is not None:
+                stack.append(UnaryFrame(exprs.UnaryOperator(unary, self.__tokens.span(self.__current))))
+            elif token_type == TokenType.LEFT_PAREN:
+                stack.append(GroupingFrame(self.__current))
+            elif token_type == TokenType.NUMBER or token_type == TokenType.STRING or token_type in literal_tokens:
+                if token_type in literal_tokens:
+                    value = literal_tokens[token_type]
+                else:
+                    value = self.__tokens.literal(self.__current)
+                expr = exprs.Literal(value)
+                expr.span = self.__tokens.span(self.__current)
+                self.__current += 1
+                return expr
+            elif token_type == TokenType.IDENTIFIER:
+                span = self.__tokens.span(self.__current)
+                expr = exprs.Variable(span.text())
+                expr.span = span
+                self.__current += 1
+                return expr
+            else:
+                raise ParserException(self.__tokens[self.__current], 'Expected expression')
+
+            self.__current += 1
+
+    @staticmethod
+    def __reduce(stack: List[Frame], right: Expr, precedence: int) -> Expr:
+        # combines pending binary operators that bind at least as tightly as `precedence`, i.e. left associatively
+        while stack:
+            frame = stack[-1]
+            if not isinstance(frame, BinaryFrame) or frame.precedence < precedence:
+                break
+
+            stack.pop()
+            new_expr = exprs.Binary(frame.left, frame.operator, right)
+            new_expr.span = SourceSpan.from_spans(frame.left.span, right.span)
+            right = new_expr
+
+        return right
+
+    def __peek_type(self):
+        if self.__current >= self.__length:
+            return None
+        return self.__tokens.type(self.__current)
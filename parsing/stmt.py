@@ -0,0 +1,217 @@
+# autogenerated by ast_gen.py
+import abc
+import math
+from typing import Any, Callable, List, Optional
+from parsing.source import SourceSpan
+from parsing.expr import Expr
+
+
+def same_value(a: Any, b: Any) -> bool:
+    # 1, 1.0 and true are equal in python but not the same literal, and neither are 0.0 and -0.0
+    if type(a) is not type(b) or a != b:
+        return False
+    return type(a) is not float or math.copysign(1.0, a) == math.copysign(1.0, b)
+
+
+def value_key(value: Any) -> Any:
+    if type(value) is float:
+        return float, value, math.copysign(1.0, value)
+    return type(value), value
+
+
+def hash_tree(node: Any) -> None:
+    # hashes every child before its parent with an explicit stack, so deep trees don't hit the recursion limit
+    stack = [(node, False)]
+    while stack:
+        current, ready = stack.pop()
+        if ready:
+            current.hash_fields()
+        elif not current.is_hashed():
+            stack.append((current, True))
+            stack.extend((child, False) for child in current.children() if child is not None)
+
+
+def equal_trees(a: Any, b: Any) -> bool:
+    # compares a pair of nodes at a time with an explicit stack, so deep trees don't hit the recursion limit
+    stack = [(a, b)]
+    while stack:
+        a, b = stack.pop()
+        if a is b:
+            continue
+        if type(a) is not type(b) or hash(a) != hash(b) or not a.equal_fields(b):
+            return False
+        stack.extend(zip(a.children(), b.children()))
+    return True
+
+
+class Stmt(abc.ABC):
+    __slots__ = ('span',)
+
+    span: Optional[SourceSpan]
+    opcode: int
+
+    @abc.abstractmethod
+    def accept(self, visitor: 'StmtVisitor'):
+        pass
+
+
+class StmtOpcode:
+    BLOCK = 0
+    EXPRESSION = 1
+    VAR = 2
+
+
+class Block(Stmt):
+    __slots__ = ('statements', 'opcode', '__hash')
+
+    statements: List[Stmt]
+
+    def __init__(self, statements: List[Stmt], span: Optional[SourceSpan] = None) -> None:
+        self.statements = statements
+        self.span = span
+        self.opcode = StmtOpcode.BLOCK
+        self.__hash: Optional[int] = None
+
+    def accept(self, visitor: 'StmtVisitor'):
+        return visitor.visit_block(self)
+
+    def __eq__(self, other: object) -> bool:
+        return self is other or isinstance(other, Block) and equal_trees(self, other)
+
+    def __hash__(self) -> int:
+        # fields never change so the hash is only computed once, which keeps hashing a tree linear
+        if self.__hash is None:
+            hash_tree(self)
+        return self.__hash
+
+    def is_hashed(self) -> bool:
+        return self.__hash is not None
+
+    def hash_fields(self) -> None:
+        # the children have to be hashed already
+        self.__hash = hash((Block, tuple(self.statements)))
+
+    def equal_fields(self, other: 'Block') -> bool:
+        # everything but the children themselves, which equal_trees compares
+        return len(self.statements) == len(other.statements)
+
+    def children(self) -> tuple:
+        return (*self.statements,)
+
+
+class Expression(Stmt):
+    __slots__ = ('expression', 'opcode', '__hash')
+
+    expression: Expr
+
+    def __init__(self, expression: Expr, span: Optional[SourceSpan] = None) -> None:
+        self.expression = expression
+        self.span = span
+        self.opcode = StmtOpcode.EXPRESSION
+        self.__hash: Optional[int] = None
+
+    def accept(self, visitor: 'StmtVisitor'):
+        return visitor.visit_expression(self)
+
+    def __eq__(self, other: object) -> bool:
+        return self is other or isinstance(other, Expression) and equal_trees(self, other)
+
+    def __hash__(self) -> int:
+        # fields never change so the hash is only computed once, which keeps hashing a tree linear
+        if self.__hash is None:
+            hash_tree(self)
+        return self.__hash
+
+    def is_hashed(self) -> bool:
+        return self.__hash is not None
+
+    def hash_fields(self) -> None:
+        # the children have to be hashed already
+        self.__hash = hash((Expression, self.expression))
+
+    def equal_fields(self, other: 'Expression') -> bool:
+        # everything but the children themselves, which equal_trees compares
+        return True
+
+    def children(self) -> tuple:
+        return (self.expression,)
+
+
+class Var(Stmt):
+    __slots__ = ('name', 'initializer', 'opcode', '__hash')
+
+    name: str
+    initializer: Optional[Expr]
+
+    def __init__(self, name: str, initializer: Optional[Expr], span: Optional[SourceSpan] = None) -> None:
+        self.name = name
+        self.initializer = initializer
+        self.span = span
+        self.opcode = StmtOpcode.VAR
+        self.__hash: Optional[int] = None
+
+    def accept(self, visitor: 'StmtVisitor'):
+        return visitor.visit_var(self)
+
+    def __eq__(self, other: object) -> bool:
+        return self is other or isinstance(other, Var) and equal_trees(self, other)
+
+    def __hash__(self) -> int:
+        # fields never change so the hash is only computed once, which keeps hashing a tree linear
+        if self.__hash is None:
+            hash_tree(self)
+        return self.__hash
+
+    def is_hashed(self) -> bool:
+        return self.__hash is not None
+
+    def hash_fields(self) -> None:
+        # the children have to be hashed already
+        self.__hash = hash((Var, self.name, self.initializer))
+
+    def equal_fields(self, other: 'Var') -> bool:
+        # everything but the children themselves, which equal_trees compares
+        return self.name == other.name and (self.initializer is None) == (other.initializer is None)
+
+    def children(self) -> tuple:
+        return (self.initializer,)
+
+
+def visit_method(cls: type, specific: str, general: str) -> Callable[[Any, Any], Any]:
+    # the operator's visit method, unless the node's visit method is overridden further down the hierarchy
+    for ancestor in cls.__mro__:
+        if specific in ancestor.__dict__:
+            break
+        if general in ancestor.__dict__:
+            return getattr(cls, general)
+    return getattr(cls, specific)
+
+
+class StmtVisitor:
+    # the visit functions of the class by opcode, built for each subclass so a node can be dispatched in one step
+    # with `self.stmt_table[node.opcode](self, node)` as well as through accept()
+    stmt_table: List[Callable[[Any, Any], Any]]
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)  # type: ignore
+        cls.stmt_table = build_stmt_table(cls)
+
+    def visit_block(self, node: Block):
+        pass
+
+    def visit_expression(self, node: Expression):
+        pass
+
+    def visit_var(self, node: Var):
+        pass
+
+
+def build_stmt_table(cls: type) -> List[Callable[[Any, Any], Any]]:
+    return [
+        cls.visit_block,
+        cls.visit_expression,
+        cls.visit_var,
+    ]
+
+
+StmtVisitor.stmt_table = build_stmt_table(StmtVisitor)
@@ -0,0 +1,145 @@
+from typing import Iterator, List, Optional, TextIO, Tuple
+
+from parsing.lexer import InvalidLexerCharException, UnterminatedStringException
+from parsing.regex_lexer import keywords, operators, token_pattern
+from parsing.source import Source, SourceSpan
+from parsing.token import Literal, Token, TokenType
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+# how much of a line is kept for highlighting tokens in fragments which start part way through it
+MAX_LINE_PREFIX = 1024
+
+# (type, start, end, literal) with offsets relative to the start of the buffer
+PendingToken = Tuple[TokenType, int, int, Optional[Literal]]
+
+
+class StreamLexer:
+    # Lexes a text stream one chunk at a time. Every token which is complete is yielded as soon as its chunk has been
+    # scanned, only the unfinished lexeme at the end of the chunk is kept for the next one, so memory stays bounded
+    # however long the input or its lines are. The text scanned from each chunk becomes a Source fragment that the
+    # spans of its tokens refer to.
+    def __init__(self, stream: TextIO, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        self.__stream = stream
+        self.__chunk_size = chunk_size
+        self.__origin = object()
+        self.__tokens = self.__scan()
+
+    def next(self) -> Optional[Token]:
+        return next(self.__tokens, None)
+
+    def __iter__(self) -> Iterator[Token]:
+        return self.__tokens
+
+    def __scan(self) -> Iterator[Token]:
+        # the unscanned text, i.e. the unfinished lexeme and the latest chunk, and where it is in the stream
+        buffer = ''
+        buffer_offset = 0
+        buffer_line = 1
+        buffer_column = 1
+        # the end of the line before the buffer
+        prefix = ''
+        previous: Optional[Source] = None
+        read_size = self.__chunk_size
+        at_end = False
+
+        while True:
+            if not at_end:
+                chunk = self.__stream.read(read_size)
+                if chunk:
+                    buffer = buffer + chunk if buffer else chunk
+                else:
+                    at_end = True
+
+            pending, position, error = self.__scan_buffer(buffer, at_end)
+
+            if error is not None:
+                # read up to the end of the offending line so it can be highlighted
+                parts = [buffer]
+                line_end = buffer.find('\n', error[3] - 1)
+                while line_end == -1 and not at_end:
+                    chunk = self.__stream.read(self.__chunk_size)
+                    if not chunk:
+                        at_end = True
+                        break
+                    newline = chunk.find('\n')
+                    if newline != -1:
+                        line_end = sum(len(part) for part in parts) + newline
+                    parts.append(chunk)
+                buffer = ''.join(parts)
+                cut = len(buffer) if line_end == -1 else line_end + 1
+            elif at_end:
+                cut = len(buffer)
+            else:
+                cut = position
+                if cut == 0:
+                    # nothing in the buffer is complete yet, e.g. a long string. Reading twice as much each time keeps
+                    # rescanning it linear overall
+                    read_size *= 2
+                    continue
+
+            read_size = self.__chunk_size
+            text = buffer[:cut]
+            source = Source(text, buffer_offset, buffer_line, self.__origin, buffer_column, prefix)
+            if previous is not None:
+                previous.next = source
+            previous = source
+
+            for token_type, start, end, literal in pending:
+                yield Token(token_type, SourceSpan(source, buffer_offset + start, buffer_offset + end), literal)
+
+            if error is not None:
+                exception_cls, message, start, end = error
+                raise exception_cls(message, SourceSpan(source, buffer_offset + start, buffer_offset + end))
+
+            if at_end:
+                eof = buffer_offset + len(buffer)
+                yield Token(TokenType.EOF, SourceSpan(source, eof, eof + 1), None)
+                return
+
+            last_newline = text.rfind('\n')
+            if last_newline == -1:
+                buffer_column += cut
+                prefix = (prefix + text[-MAX_LINE_PREFIX:])[-MAX_LINE_PREFIX:]
+            else:
+                buffer_line += text.count('\n')
+                buffer_column = cut - last_newline
+                prefix = text[last_newline + 1:][-MAX_LINE_PREFIX:]
+            buffer_offset += cut
+            buffer = buffer[cut:]
+
+    @staticmethod
+    def __scan_buffer(buffer: str, at_end: bool) -> Tuple[List[PendingToken], int, Optional[Tuple[type, str, int, int]]]:
+        # (complete tokens, where the unfinished lexeme starts, error) of the buffer
+        pending: List[PendingToken] = []
+        append = pending.append
+        position = 0
+        length = len(buffer)
+
+        while position < length:
+            match = token_pattern.match(buffer, position)
+            kind = match.lastgroup
+            end = match.end()
+
+            # a token touching the end of the buffer might continue in the next chunk, "1." also needs to see
+            # one character past the dot to know if it is a decimal
+            if not at_end and (end + 1 >= length or kind == 'unterminated_string'):
+                break
+
+            if kind == 'operator':
+                append((operators[match.group()], position, end, None))
+            elif kind == 'number':
+                text = match.group()
+                append((TokenType.NUMBER, position, end, float(text) if '.' in text else int(text)))
+            elif kind == 'identifier':
+                append((keywords.get(match.group(), TokenType.IDENTIFIER), position, end, None))
+            elif kind == 'string':
+                append((TokenType.STRING, position, end, match.group()[1:-1]))
+            elif kind == 'unterminated_string':
+                return pending, position, (UnterminatedStringException, 'Unterminated string', position, length)
+            elif kind == 'invalid':
+                message = 'Invalid char \'{}\''.format(match.group())
+                return pending, position, (InvalidLexerCharException, message, position, end)
+
+            position = end
+
+        return pending, position, None
@@ -10,6 +10,9 @@ class TokenType(Enum):
     # single char
     LEFT_PAREN = auto()
     RIGHT_PAREN = auto()
+    LEFT_BRACE = auto()
+    RIGHT_BRACE = auto()
+    SEMICOLON = auto()
     MINUS = auto()
     PLUS = auto()
     SLASH = auto()
@@ -35,6 +38,7 @@ class TokenType(Enum):
     FALSE = auto()
     OR = auto()
     TRUE = auto()
+    VAR = auto()
 
 
 Literal = Union[str, float, bool]
@@ -59,6 +63,6 @@ class Token:
         return self.__literal
 
     def __str__(self) -> str:
-        return '{} {} {}'.format(self.type, self.span.start, self.literal)
+        return '{} {} {}'.format(self.type, self.span.start_position, self.literal)
 
 
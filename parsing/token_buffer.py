@@ -0,0 +1,91 @@
+from array import array
+from typing import List, Optional, Sequence
+
+from parsing.source import Source, SourceSpan
+from parsing.token import Literal, Token, TokenType
+
+token_types: List[Optional[TokenType]] = [None] * (max(map(lambda x: x.value, TokenType)) + 1)
+for token_type in TokenType:
+    token_types[token_type.value] = token_type
+
+
+class TokenBuffer:
+    # Stores tokens column-wise in arrays instead of as Token objects, tokens are only materialized on request.
+    # All tokens have to come from the same source.
+    def __init__(self, source: Source) -> None:
+        self.__source = source
+        self.__types = array('B')
+        self.__starts = array('q')
+        self.__ends = array('q')
+        self.__literals = array('q')
+        self.__literal_values: List[Literal] = []
+
+    @staticmethod
+    def from_tokens(tokens: Sequence[Token], source: Optional[Source] = None) -> 'TokenBuffer':
+        # `source` is only needed when there may be no tokens to take it from
+        if source is None:
+            source = tokens[0].span.source if len(tokens) else Source('')
+
+        buffer = TokenBuffer(source)
+        for token in tokens:
+            buffer.append(token.type, token.span.start, token.span.end, token.literal)
+        return buffer
+
+    def append(self, token_type: TokenType, start: int, end: int, literal: Optional[Literal] = None):
+        self.__types.append(token_type.value)
+        self.__starts.append(start)
+        self.__ends.append(end)
+
+        if literal is None:
+            self.__literals.append(-1)
+        else:
+            self.__literals.append(len(self.__literal_values))
+            self.__literal_values.append(literal)
+
+    @property
+    def source(self) -> Source:
+        return self.__source
+
+    def type(self, index: int) -> TokenType:
+        return token_types[self.__types[index]]
+
+    def span(self, index: int) -> SourceSpan:
+        return SourceSpan(self.__source, self.__starts[index], self.__ends[index])
+
+    def span_between(self, first: int, last: int) -> SourceSpan:
+        # from the start of token `first` to the end of token `last`, without creating either token's span
+        return SourceSpan(self.__source, self.__starts[first], self.__ends[last])
+
+    def literal(self, index: int) -> Optional[Literal]:
+        literal = self.__literals[index]
+        return None if literal < 0 else self.__literal_values[literal]
+
+    def __getitem__(self, index: int) -> Token:
+        return Token(self.type(index), self.span(index), self.literal(index))
+
+    def __len__(self) -> int:
+        return len(self.__types)
+
+
+class TokenList:
+    # exposes a list of Token objects through the same interface as TokenBuffer
+    def __init__(self, tokens: List[Token]) -> None:
+        self.__tokens = tokens
+
+    def type(self, index: int) -> TokenType:
+        return self.__tokens[index].type
+
+    def span(self, index: int) -> SourceSpan:
+        return self.__tokens[index].span
+
+    def span_between(self, first: int, last: int) -> SourceSpan:
+        return SourceSpan.from_spans(self.__tokens[first].span, self.__tokens[last].span)
+
+    def literal(self, index: int) -> Optional[Literal]:
+        return self.__tokens[index].literal
+
+    def __getitem__(self, index: int) -> Token:
+        return self.__tokens[index]
+
+    def __len__(self) -> int:
+        return len(self.__tokens)
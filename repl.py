@@ -1,31 +1,299 @@
-from typing import List
+import argparse
+import sys
+import time
+from typing import Any, Callable, Dict, Hashable, Iterable, Iterator, List, Optional, TextIO, Tuple, Union
 
+import instrumentation
+import parsing.stmt as stmts
+from evaluation.adaptive import AdaptiveEvaluator
+from evaluation.closure import ClosureCompiler
 from evaluation.expr import ExprEvaluator, RuntimeException
+from evaluation.interpreter import Interpreter
+from evaluation.optimizer import Optimizer
+from evaluation.python_compiler import PythonCompiler
+from evaluation.resolver import Resolver, ResolverException
+from evaluation.shared_evaluator import SharedEvaluator
+from evaluation.stack_evaluator import StackEvaluator
+from evaluation.type_checker import TypeChecker, TypeException
+from parsing.cache import LruCache, tree_size
+from parsing.diagnostics import Diagnostic
+from parsing.disk_cache import DiskCache
 from parsing.expr import Expr
+from parsing.hash_cons import hash_cons, shared_nodes
 from parsing.lexer import get_all_tokens, Lexer, LexerException
 from parsing.parser import Parser, ParserException
+from parsing.pratt_parser import PrattParser
+from parsing.regex_lexer import get_token_buffer
+from parsing.stack_parser import StackParser
+from parsing.stmt import Stmt
 from parsing.token import Token
+from parsing.token_buffer import TokenBuffer
+from vm.compiler import Compiler
+from vm.vm import VM
 
+Tokens = Union[List[Token], TokenBuffer]
 
-def tokenize(input: str) -> List[Token]:
-    lexer = Lexer(input)
-    return get_all_tokens(lexer)
+# the regex engine scans straight into a TokenBuffer, which the parsers read without Token objects ever being created
+# and both append their errors to the diagnostics when given some rather than raising them
+lexer_engines: Dict[str, Callable[[str, Optional[List[Diagnostic]]], Tokens]] = {
+    'char': lambda input, diagnostics=None: get_all_tokens(Lexer(input, diagnostics)),
+    'regex': get_token_buffer,
+}
+parser_engines: Dict[str, Callable[[Tokens], Union[Parser, PrattParser, StackParser]]] = {
+    'recursive': Parser,
+    'pratt': PrattParser,
+    'stack': StackParser,
+}
+evaluator_engines: Dict[str, Callable[[], Union[ExprEvaluator, ClosureCompiler, PythonCompiler, VM]]] = {
+    'recursive': ExprEvaluator,
+    'stack': StackEvaluator,
+    'closure': ClosureCompiler,
+    'vm': VM,
+    'python': PythonCompiler,
+    'shared': SharedEvaluator,
+    'adaptive': AdaptiveEvaluator,
+}
 
 
-def parse(tokens: List[Token]) -> Expr:
-    parser = Parser(tokens)
+def tokenize(input: str, engine: str = 'char', diagnostics: Optional[List[Diagnostic]] = None) -> Tokens:
+    return lexer_engines[engine](input, diagnostics)
+
+
+def parse(tokens: Tokens, engine: str = 'recursive') -> Expr:
+    parser = parser_engines[engine](tokens)
     return parser.expression()
 
 
-def main():
-    eval = ExprEvaluator()
+def prepare(expr: Expr, engine: str = 'recursive') -> Callable[[], Any]:
+    # does everything that only depends on the tree up front, the result can be called any number of times
+    if engine == 'closure' or engine == 'python':
+        return evaluator_engines[engine]().compile(expr)
+    if engine == 'vm':
+        chunk = Compiler().compile(expr)
+        return lambda: VM().run(chunk)
+
+    if engine == 'shared':
+        # SharedEvaluator only saves work on a tree whose identical subtrees are the same node
+        shared_expr = hash_cons(expr)
+        shared = shared_nodes(shared_expr)
+        create_shared = evaluator_engines[engine]
+        return lambda: create_shared(shared=shared).evaluate(shared_expr)
+
+    # tree-walkers keep state while evaluating, a new one per call lets a cached program run on several threads at once
+    create_evaluator = evaluator_engines[engine]
+    return lambda: create_evaluator().evaluate(expr)
+
+
+def weigh_program(key: Hashable, program: Union[Tuple[Expr, Callable[[], Any]], Exception]) -> int:
+    size = sys.getsizeof(key[0])
+    if isinstance(program, tuple):
+        size += tree_size(program[0])
+    return size
+
+
+# programs by program_key, inputs that failed to lex, parse or type check fail again straight away
+program_cache: LruCache[Tuple[Expr, Callable[[], Any]]] = LruCache(weigh=weigh_program,
+                                                                   errors=(LexerException, ParserException, TypeException))
+
+
+def load(input: str, lexer: str = 'char', parser: str = 'recursive', evaluator: str = 'recursive', optimize: bool = False,
+         cache: Optional[LruCache[Tuple[Expr, Callable[[], Any]]]] = program_cache, disk_cache: Optional[DiskCache] = None,
+         check: bool = False) -> Callable[[], Any]:
+    # with `check` the tree is type checked before it's prepared, which raises the first operand that can never be what
+    # its operator needs, evaluation would fail there unless an operand before it fails first. Checking also lets the
+    # engines skip checking operands that are proven to be numbers
+    instrumented = instrumentation.is_enabled()
+
+    def create_tree() -> Expr:
+        if instrumented:
+            tokens = instrumentation.lex(lambda: tokenize(input, lexer))
+            expr = instrumentation.parse(lambda: parse(tokens, parser))
+        else:
+            expr = parse(tokenize(input, lexer), parser)
+        if optimize:
+            expr = Optimizer().optimize(expr)
+        return expr
+
+    def create() -> Tuple[Expr, Callable[[], Any]]:
+        # every lexer and parser produce the same tree so only the optimizations change what's stored on disk
+        expr = create_tree() if disk_cache is None else disk_cache.get(input, create_tree, 'optimize' if optimize else '')
+        if check:
+            # the annotations aren't stored on disk so trees from the disk cache are checked again
+            errors = TypeChecker().check(expr)
+            if errors:
+                raise errors[0]
+        program = prepare(expr, evaluator)
+        return expr, instrumentation.instrument_program(expr, program) if instrumented else program
+
+    if cache is None:
+        return create()[1]
+
+    return cache.get(program_key(input, lexer, parser, evaluator, optimize, check), create)[1]
+
+
+def program_key(input: str, lexer: str = 'char', parser: str = 'recursive', evaluator: str = 'recursive',
+                optimize: bool = False, check: bool = False) -> Hashable:
+    # programs loaded while instrumentation was off aren't counted so they can't be reused while it's on
+    return input, lexer, parser, evaluator, optimize, check, instrumentation.is_enabled()
+
+
+def load_program(input: str, lexer: str = 'char') -> List[Stmt]:
+    # statements are only parsed by the recursive descent parser and run by the Interpreter, which needs their
+    # variables resolved
+    statements = Parser(tokenize(input, lexer)).parse()
+    Resolver().resolve(statements)
+    return statements
+
+
+def run_program(statements: List[Stmt], variables: Dict[str, Any]) -> Any:
+    # the program's top level declarations are copied into `variables`, so later programs given the same variables
+    # can use them by name, e.g. the lines entered at the prompt
+    interpreter = Interpreter(variables)
+    try:
+        return interpreter.execute(statements)
+    finally:
+        names = [statement.name for statement in statements if isinstance(statement, stmts.Var)]
+        variables.update(zip(names, interpreter.globals))
+
+
+# (line number, value, error) for one line of input
+Outcome = Tuple[int, Any, Optional[Exception]]
+
+# how many results are joined into a single write
+WRITE_BATCH_SIZE = 1024
+
+
+class RunSummary:
+    def __init__(self) -> None:
+        self.evaluated = 0
+        self.errors = 0
+        self.elapsed = 0.0
+
+    def __str__(self) -> str:
+        return '{} expressions, {} errors in {:.3f}s'.format(self.evaluated, self.errors, self.elapsed)
+
+
+def read_expressions(lines: Iterable[str]) -> Iterator[Tuple[int, str]]:
+    for number, line in enumerate(lines, 1):
+        line = line.strip()
+        if line:
+            yield number, line
+
+
+def evaluate_expressions(expressions: Iterable[Tuple[int, str]], lexer: str = 'char', parser: str = 'recursive',
+                         evaluator: str = 'recursive', optimize: bool = False,
+                         cache: Optional[LruCache[Tuple[Expr, Callable[[], Any]]]] = None,
+                         check: bool = False) -> Iterator[Outcome]:
+    for number, input in expressions:
+        try:
+            yield number, load(input, lexer, parser, evaluator, optimize, cache, check=check)(), None
+        except Exception as e:
+            # e.g. division by zero, one bad line shouldn't stop the rest
+            yield number, None, e
+
 
+def format_outcome(outcome: Outcome) -> str:
+    number, value, error = outcome
+    if error is None:
+        return str(value)
+    if isinstance(error, (LexerException, ParserException, RuntimeException, TypeException)):
+        return 'line {}: {}'.format(number, error)
+    return 'line {}: {}: {}'.format(number, type(error).__name__, error)
+
+
+def run(lines: Iterable[str], output: TextIO, lexer: str = 'char', parser: str = 'recursive', evaluator: str = 'recursive',
+        optimize: bool = False, cache: Optional[LruCache[Tuple[Expr, Callable[[], Any]]]] = None,
+        check: bool = False) -> RunSummary:
+    # Evaluates one expression per line and writes one result per line, errors are prefixed with the line they came
+    # from. Every stage is a generator so only WRITE_BATCH_SIZE results are held at once however long the input is.
+    # Nothing is cached unless a cache is passed, a long file of distinct lines would only evict program_cache's
+    # entries for the prompt and the server.
+    summary = RunSummary()
+    start = time.perf_counter()
+
+    pending: List[str] = []
+    for outcome in evaluate_expressions(read_expressions(lines), lexer, parser, evaluator, optimize, cache, check):
+        summary.evaluated += 1
+        if outcome[2] is not None:
+            summary.errors += 1
+
+        pending.append(format_outcome(outcome))
+        if len(pending) >= WRITE_BATCH_SIZE:
+            output.write('\n'.join(pending) + '\n')
+            pending = []
+
+    if pending:
+        output.write('\n'.join(pending) + '\n')
+    output.flush()
+
+    summary.elapsed = time.perf_counter() - start
+    return summary
+
+
+def validate_expressions(lines: Iterable[str], lexer: str = 'char',
+                         parser: str = 'recursive') -> Iterator[Tuple[int, Diagnostic]]:
+    # Every lexer error and the first parser error of each line, without evaluating anything. Lines are independent so
+    # a bad one doesn't stop the ones after it, but a parser can't carry on inside a broken expression as nothing marks
+    # where the rest of it starts.
+    for number, input in read_expressions(lines):
+        diagnostics: List[Diagnostic] = []
+        tokens = tokenize(input, lexer, diagnostics)
+        try:
+            parse(tokens, parser)
+        except ParserException as e:
+            diagnostics.append(Diagnostic(e.token.span, e.message, e))
+
+        for diagnostic in diagnostics:
+            yield number, diagnostic
+
+
+def validate_program(input: str, lexer: str = 'char') -> List[Diagnostic]:
+    # every lexer and parser error in the program, the parser skips to the next statement after each one
+    diagnostics: List[Diagnostic] = []
+    Parser(tokenize(input, lexer, diagnostics), diagnostics).parse()
+    # the lexer has finished before the parser starts
+    diagnostics.sort(key=lambda diagnostic: diagnostic.span.start)
+    return diagnostics
+
+
+def validate(lines: Iterable[str], output: TextIO, lexer: str = 'char', parser: str = 'recursive',
+             statements: bool = False) -> int:
+    # writes every error found in one pass and returns how many there were, with `statements` the lines are one program
+    if statements:
+        messages = (str(diagnostic) for diagnostic in validate_program(''.join(lines), lexer))
+    else:
+        diagnostics = validate_expressions(lines, lexer, parser)
+        messages = ('line {}: {}'.format(number, diagnostic) for number, diagnostic in diagnostics)
+
+    errors = 0
+    for message in messages:
+        errors += 1
+        output.write(message + '\n')
+    output.flush()
+    return errors
+
+
+def main(lexer: str = 'char', parser: str = 'recursive', evaluator: str = 'recursive', optimize: bool = False,
+         check: bool = False, statements: bool = False):
+    # with `statements` each line is a program whose top level variables are kept for the lines after it
+    variables: Dict[str, Any] = {}
     while True:
         command = input("> ")
+        if command == '.cache':
+            print(program_cache.stats)
+            continue
+        if command == '.stats':
+            if instrumentation.is_enabled():
+                print(instrumentation.counters)
+            else:
+                print('Instrumentation is off, start with --instrument or {} set'.format(instrumentation.ENVIRONMENT_VARIABLE))
+            continue
+
         try:
-            tokens = tokenize(command)
-            expr = parse(tokens)
-            result = eval.evaluate(expr)
+            if statements:
+                result = run_program(load_program(command, lexer), variables)
+            else:
+                result = load(command, lexer, parser, evaluator, optimize, check=check)()
             print(result)
         except LexerException as e:
             print(e)
@@ -33,7 +301,86 @@ def main():
             print(e)
         except RuntimeException as e:
             print(e)
+        except TypeException as e:
+            print(e)
+        except ResolverException as e:
+            print(e)
+
+
+def parse_arguments(arguments: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='Evaluates lox expressions, one per line')
+    parser.add_argument('file', nargs='?',
+                        help='file to evaluate, \'-\' for stdin. Starts a prompt when omitted and stdin is a terminal')
+    parser.add_argument('--lexer', choices=lexer_engines.keys(), default='char')
+    parser.add_argument('--parser', choices=parser_engines.keys(), default='recursive')
+    parser.add_argument('--evaluator', choices=evaluator_engines.keys(), default='recursive')
+    parser.add_argument('--optimize', action='store_true', help='fold constants before evaluating')
+    parser.add_argument('--check', action='store_true',
+                        help='type check each expression and report the first operand which can never be what its operator '
+                             'needs instead of evaluating it')
+    parser.add_argument('--instrument', action='store_true',
+                        help='count time, tokens, nodes and operators per phase, also enabled by {}'.format(
+                            instrumentation.ENVIRONMENT_VARIABLE))
+    parser.add_argument('--statements', action='store_true',
+                        help='run var declarations, blocks and assignments ending in \';\' instead of one expression per '
+                             'line. A file is one program, at the prompt each line is one and top level variables are kept')
+    parser.add_argument('--validate', action='store_true',
+                        help='report every lexer and parser error in the input in one pass instead of evaluating it')
+
+    args = parser.parse_args(arguments)
+    if args.statements and (args.parser != 'recursive' or args.evaluator != 'recursive' or args.optimize or args.check):
+        parser.error('--statements only runs with the recursive parser and evaluator, without --optimize or --check')
+    return args
+
+
+def run_statements(input: str, output: TextIO, lexer: str = 'char') -> bool:
+    # runs the whole input as one program and writes the value of its last expression statement, or its error
+    try:
+        output.write('{}\n'.format(run_program(load_program(input, lexer), {})))
+        return True
+    except (LexerException, ParserException, ResolverException, RuntimeException) as e:
+        output.write('{}\n'.format(e))
+        return False
+
+
+def run_file(arguments: argparse.Namespace) -> int:
+    if arguments.validate:
+        if arguments.file == '-':
+            errors = validate(sys.stdin, sys.stdout, arguments.lexer, arguments.parser, arguments.statements)
+        else:
+            with open(arguments.file) as lines:
+                errors = validate(lines, sys.stdout, arguments.lexer, arguments.parser, arguments.statements)
+        print('{} errors'.format(errors), file=sys.stderr)
+        return 1 if errors else 0
+
+    if arguments.statements:
+        if arguments.file == '-':
+            succeeded = run_statements(sys.stdin.read(), sys.stdout, arguments.lexer)
+        else:
+            with open(arguments.file) as lines:
+                succeeded = run_statements(lines.read(), sys.stdout, arguments.lexer)
+        return 0 if succeeded else 1
+
+    options = (arguments.lexer, arguments.parser, arguments.evaluator, arguments.optimize)
+    if arguments.file == '-':
+        summary = run(sys.stdin, sys.stdout, *options, check=arguments.check)
+    else:
+        with open(arguments.file) as lines:
+            summary = run(lines, sys.stdout, *options, check=arguments.check)
+
+    print(summary, file=sys.stderr)
+    if instrumentation.is_enabled():
+        print(instrumentation.counters, file=sys.stderr)
+    return 1 if summary.errors else 0
 
 
 if __name__ == '__main__':
-    main()
+    args = parse_arguments()
+    if args.instrument:
+        instrumentation.enable()
+    if args.file is None and sys.stdin.isatty() and not args.validate:
+        main(args.lexer, args.parser, args.evaluator, args.optimize, args.check, args.statements)
+    else:
+        if args.file is None:
+            args.file = '-'
+        sys.exit(run_file(args))
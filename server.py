@@ -0,0 +1,170 @@
+import argparse
+import asyncio
+import json
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from evaluation.expr import RuntimeException
+from parsing.cache import LruCache
+from parsing.expr import Expr
+from parsing.lexer import LexerException
+from parsing.parser import ParserException
+from repl import evaluator_engines, lexer_engines, load, parser_engines, program_cache, program_key
+
+DEFAULT_MAX_CONNECTIONS = 256
+DEFAULT_TIMEOUT = 5.0
+DEFAULT_IDLE_TIMEOUT = 300.0
+DEFAULT_MAX_LINE = 64 * 1024
+# a cached program for a shorter input runs in well under a millisecond with every engine, less than handing it to
+# the executor. Lexing, parsing and compiling one can take tens of milliseconds, e.g. the python engine compiling 250
+# nested negations, so inputs that aren't cached yet are always offloaded
+OFFLOAD_THRESHOLD = 256
+
+Response = Dict[str, Any]
+
+
+def encode(response: Response) -> bytes:
+    try:
+        return json.dumps(response, allow_nan=False).encode('utf-8') + b'\n'
+    except ValueError as e:
+        # infinity and nan aren't JSON, and since python 3.11 ints over 4300 digits can't be converted to strings
+        return encode({'error': '{}: {}'.format(type(e).__name__, e)})
+
+
+class EvaluationServer:
+    # Evaluates newline delimited expressions sent over TCP or unix sockets, answering each line with one line of
+    # JSON, either {"value": ...} or {"error": "..."}, in the order the lines were sent. Errors are formatted the same
+    # way as in the repl, their highlighted source makes them span several lines so they can't be sent as plain text.
+    #
+    # Each connection handles one line at a time and waits for its response to be sent before reading the next, so a
+    # client that doesn't read its responses stops being read from rather than growing the buffers. Long inputs and
+    # inputs that aren't cached yet are evaluated on the executor, a thread can't be interrupted so one that times out
+    # keeps running in the background but the client gets an error straight away.
+    def __init__(self, lexer: str = 'regex', parser: str = 'pratt', evaluator: str = 'closure', optimize: bool = False,
+                 max_connections: int = DEFAULT_MAX_CONNECTIONS, timeout: float = DEFAULT_TIMEOUT,
+                 idle_timeout: float = DEFAULT_IDLE_TIMEOUT, max_line: int = DEFAULT_MAX_LINE,
+                 cache: Optional[LruCache[Tuple[Expr, Callable[[], Any]]]] = program_cache,
+                 executor: Optional[Executor] = None) -> None:
+        self.__lexer = lexer
+        self.__parser = parser
+        self.__evaluator = evaluator
+        self.__optimize = optimize
+        self.__max_connections = max_connections
+        self.__timeout = timeout
+        self.__idle_timeout = idle_timeout
+        self.__max_line = max_line
+        self.__cache = cache
+        self.__executor = executor if executor is not None else ThreadPoolExecutor(thread_name_prefix='plox')
+        self.__connections = 0
+
+    @property
+    def connections(self) -> int:
+        return self.__connections
+
+    async def start_tcp(self, host: str = '127.0.0.1', port: int = 0) -> asyncio.AbstractServer:
+        return await asyncio.start_server(self.__handle, host, port, limit=self.__max_line)
+
+    async def start_unix(self, path: str) -> asyncio.AbstractServer:
+        return await asyncio.start_unix_server(self.__handle, path, limit=self.__max_line)
+
+    async def evaluate(self, input: str) -> Response:
+        if len(input) < OFFLOAD_THRESHOLD and self.__is_cached(input):
+            return self.__evaluate(input)
+
+        loop = asyncio.get_running_loop()
+        try:
+            return await asyncio.wait_for(loop.run_in_executor(self.__executor, self.__evaluate, input), self.__timeout)
+        except asyncio.TimeoutError:
+            return {'error': 'Timed out after {}s'.format(self.__timeout)}
+
+    def __is_cached(self, input: str) -> bool:
+        # cached errors are raised straight away so they count too
+        key = program_key(input, self.__lexer, self.__parser, self.__evaluator, self.__optimize)
+        return self.__cache is not None and key in self.__cache
+
+    def __evaluate(self, input: str) -> Response:
+        try:
+            return {'value': load(input, self.__lexer, self.__parser, self.__evaluator, self.__optimize, self.__cache)()}
+        except (LexerException, ParserException, RuntimeException) as e:
+            return {'error': str(e)}
+        except Exception as e:
+            # e.g. division by zero
+            return {'error': '{}: {}'.format(type(e).__name__, e)}
+
+    async def __handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        if self.__connections >= self.__max_connections:
+            await self.__close(writer, {'error': 'Too many connections'})
+            return
+
+        self.__connections += 1
+        try:
+            await self.__serve(reader, writer)
+        except ConnectionError:
+            pass
+        finally:
+            self.__connections -= 1
+
+    async def __serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        while True:
+            try:
+                line = await asyncio.wait_for(reader.readline(), self.__idle_timeout)
+            except asyncio.TimeoutError:
+                await self.__close(writer, {'error': 'Idle for more than {}s'.format(self.__idle_timeout)})
+                return
+            except ValueError:
+                # the rest of the line is still to come, there's no way to find where the next one starts
+                await self.__close(writer, {'error': 'Line is longer than {} bytes'.format(self.__max_line)})
+                return
+
+            if not line:
+                await self.__close(writer)
+                return
+
+            input = line.decode('utf-8', errors='replace').strip()
+            if not input:
+                continue
+
+            writer.write(encode(await self.evaluate(input)))
+            await writer.drain()
+
+    async def __close(self, writer: asyncio.StreamWriter, response: Optional[Response] = None):
+        try:
+            if response is not None:
+                writer.write(encode(response))
+                await writer.drain()
+            writer.close()
+            await writer.wait_closed()
+        except ConnectionError:
+            pass
+
+
+def parse_arguments(arguments: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='Evaluates lox expressions sent one per line over a socket')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=7878)
+    parser.add_argument('--unix', help='listen on a unix socket at this path instead of TCP')
+    parser.add_argument('--lexer', choices=lexer_engines.keys(), default='regex')
+    parser.add_argument('--parser', choices=parser_engines.keys(), default='pratt')
+    parser.add_argument('--evaluator', choices=evaluator_engines.keys(), default='closure')
+    parser.add_argument('--optimize', action='store_true', help='fold constants before evaluating')
+    parser.add_argument('--max-connections', type=int, default=DEFAULT_MAX_CONNECTIONS)
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT, help='seconds each expression may take')
+    parser.add_argument('--idle-timeout', type=float, default=DEFAULT_IDLE_TIMEOUT,
+                        help='seconds a connection may wait between lines')
+    return parser.parse_args(arguments)
+
+
+async def serve(arguments: argparse.Namespace):
+    server = EvaluationServer(arguments.lexer, arguments.parser, arguments.evaluator, arguments.optimize,
+                              arguments.max_connections, arguments.timeout, arguments.idle_timeout)
+    if arguments.unix is not None:
+        listener = await server.start_unix(arguments.unix)
+    else:
+        listener = await server.start_tcp(arguments.host, arguments.port)
+
+    async with listener:
+        await listener.serve_forever()
+
+
+if __name__ == '__main__':
+    asyncio.run(serve(parse_arguments()))
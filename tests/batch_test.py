@@ -0,0 +1,74 @@
+import inspect
+import io
+
+import pytest
+
+import repl
+from batch import evaluate_batch, parse_arguments, run
+from repl import load
+
+
+class TestEvaluateBatch:
+    @pytest.mark.parametrize('workers', [1, 2])
+    def test_preserves_order(self, workers: int):
+        inputs = ['{} * 2'.format(i) for i in range(50)]
+
+        results = list(evaluate_batch(inputs, workers=workers, chunk_size=7))
+
+        assert results == [(i * 2, None) for i in range(50)]
+
+    @pytest.mark.parametrize('workers', [1, 2])
+    def test_errors_dont_abort(self, workers: int):
+        inputs = ['1 + 2', '1 + $', '1 +', '-"a"', '1 / 0', 'a', '"a" + 1']
+
+        results = list(evaluate_batch(inputs, workers=workers, chunk_size=2))
+
+        assert results[0] == (3, None)
+        assert results[1][0] is None and results[1][1].startswith('Invalid char')
+        assert results[2][0] is None and results[2][1] is not None
+        assert results[3][0] is None and results[3][1] is not None
+        assert results[4][0] is None and results[4][1].startswith('ZeroDivisionError')
+        assert results[5][0] is None and 'Undefined variable \'a\'' in results[5][1]
+        assert results[6] == ('a1', None)
+
+    @pytest.mark.parametrize('evaluator', ['recursive', 'closure', 'vm', 'python'])
+    def test_matches_load(self, evaluator: str):
+        inputs = ['1 + 2 * 3', '(1 - 4) / 2', '!(1 >= 2)', '"a" + "b"']
+
+        results = list(evaluate_batch(inputs, workers=1, evaluator=evaluator, optimize=True, cache=True))
+
+        assert results == [(load(input, evaluator=evaluator, cache=None)(), None) for input in inputs]
+
+    def test_check(self):
+        results = list(evaluate_batch(['1 + 2', 'a * -"b"'], workers=1, check=True))
+
+        assert results[0] == (3, None)
+        assert results[1][0] is None and results[1][1].startswith('Expected a number')
+
+    def test_stops_early(self):
+        inputs = ('{}'.format(i) for i in range(10000))
+
+        results = evaluate_batch(inputs, workers=2, chunk_size=10)
+
+        assert next(results) == (0, None)
+        results.close()
+
+    def test_run(self):
+        output = io.StringIO()
+
+        errors = run(['1 + 2', '', '1 +', '"a" + 1'], output, workers=1)
+
+        lines = output.getvalue().splitlines()
+        assert errors == 1
+        assert lines[0] == '3'
+        assert lines[1].startswith('line 3: Expected expression')
+        assert lines[-1] == 'a1'
+
+    def test_defaults_match_repl(self):
+        defaults = inspect.signature(evaluate_batch).parameters
+        repl_defaults = inspect.signature(repl.run).parameters
+
+        for option in ['lexer', 'parser', 'evaluator']:
+            assert defaults[option].default == repl_defaults[option].default
+        assert parse_arguments([]).lexer == repl.parse_arguments([]).lexer
+        assert parse_arguments([]).parser == repl.parse_arguments([]).parser
@@ -0,0 +1,38 @@
+import json
+
+import pytest
+
+from benchmarks.suite import compare, main, run_suite
+
+
+class TestSuite:
+    def test_run(self, tmp_path):
+        output = tmp_path / 'results.json'
+
+        assert main(['mixed', '--repeats', '1', '--scale', '0.1', '--output', str(output)]) == 0
+
+        results = json.loads(output.read_text())
+        phases = results['workloads']['mixed']['phases']
+        assert set(phases) == {'lex', 'parse', 'evaluate'}
+        assert phases['parse']['peak_bytes'] > 0
+        assert phases['parse']['retained_blocks'] > 0
+
+    def test_compare(self):
+        baseline = run_suite(['mixed'], repeats=1, scale=0.1)
+        current = json.loads(json.dumps(baseline))
+        current['workloads']['mixed']['phases']['lex']['best'] *= 2
+        current['workloads']['mixed']['phases']['parse']['peak_bytes'] += 1 << 20
+
+        regressions = compare(baseline, current)
+
+        assert len(regressions) == 2
+        assert regressions[0].startswith('mixed lex: best went from ')
+        assert regressions[1].startswith('mixed parse: peak_bytes went from ')
+        assert compare(baseline, baseline) == []
+
+    def test_compare_different_engines(self):
+        baseline = run_suite(['mixed'], repeats=1, scale=0.1)
+        current = run_suite(['mixed'], evaluator='vm', repeats=1, scale=0.1)
+
+        with pytest.raises(ValueError):
+            compare(baseline, current)
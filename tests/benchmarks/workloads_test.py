@@ -0,0 +1,18 @@
+import pytest
+
+from benchmarks.workloads import default_sizes, generate, workloads
+from repl import load
+
+
+class TestWorkloads:
+    @pytest.mark.parametrize('name', workloads.keys())
+    def test_deterministic(self, name: str):
+        assert generate(name, 20, seed=1) == generate(name, 20, seed=1)
+        assert generate(name, 20, seed=1) != generate(name, 20, seed=2)
+
+    @pytest.mark.parametrize('name', workloads.keys())
+    @pytest.mark.parametrize('evaluator', ['recursive', 'vm'])
+    def test_evaluates(self, name: str, evaluator: str):
+        source = generate(name, default_sizes[name])
+
+        assert load(source, evaluator=evaluator, cache=None)() is not None
@@ -0,0 +1,114 @@
+import itertools
+from typing import Any
+
+import pytest
+
+import parsing.expr as exprs
+from evaluation.adaptive import AdaptiveEvaluator, GENERIC_BINARY
+from evaluation.expr import ExprEvaluator, RuntimeException
+from evaluation.type_checker import TypeChecker
+from parsing.expr import Expr
+
+
+def parse_expr(input: str) -> Expr:
+    from parsing.lexer import get_all_tokens, Lexer
+    from parsing.parser import Parser
+
+    lexer = Lexer(input)
+    tokens = get_all_tokens(lexer)
+
+    parser = Parser(tokens)
+    return parser.expression()
+
+
+def outcome(evaluator: ExprEvaluator, expr: Expr) -> Any:
+    try:
+        value = evaluator.evaluate(expr)
+        return type(value), value
+    except (RuntimeException, ArithmeticError, TypeError) as e:
+        return type(e), str(e)
+
+
+class TestAdaptiveEvaluator:
+    def test_quickens(self):
+        expr = parse_expr('a - b')
+
+        assert AdaptiveEvaluator({'a': 3, 'b': 1}).evaluate(expr) == 2
+        assert expr.feedback is not None
+        assert expr.feedback[:2] == (int, int)
+        assert AdaptiveEvaluator({'a': 5, 'b': 1}).evaluate(expr) == 4
+
+    def test_despecializes(self):
+        expr = parse_expr('a + b')
+
+        assert AdaptiveEvaluator({'a': 1, 'b': 2}).evaluate(expr) == 3
+        assert AdaptiveEvaluator({'a': 'x', 'b': 2}).evaluate(expr) == 'x2'
+        assert expr.feedback is GENERIC_BINARY
+        assert AdaptiveEvaluator({'a': 1, 'b': 2}).evaluate(expr) == 3
+
+    def test_booleans_are_not_ints(self):
+        expr = parse_expr('a + b')
+
+        AdaptiveEvaluator({'a': 1, 'b': 2}).evaluate(expr)
+
+        assert AdaptiveEvaluator({'a': True, 'b': True}).evaluate(expr) == 2
+
+    @pytest.mark.parametrize('input, variables, error', [
+        ('a / b', {'a': 1, 'b': 0}, ZeroDivisionError),
+        ('a - b', {'a': 'x', 'b': 'y'}, RuntimeException),
+        ('a + b', {'a': None, 'b': 1}, TypeError),
+        ('-a', {'a': 'x'}, RuntimeException),
+    ])
+    def test_errors_after_quickening(self, input: str, variables: dict, error: type):
+        expr = parse_expr(input)
+        AdaptiveEvaluator({'a': 4, 'b': 2}).evaluate(expr)
+
+        with pytest.raises(error) as adaptive:
+            AdaptiveEvaluator(variables).evaluate(expr)
+        with pytest.raises(error) as expected:
+            ExprEvaluator(variables).evaluate(parse_expr(input))
+
+        assert str(adaptive.value) == str(expected.value)
+
+    @pytest.mark.parametrize('input', [
+        'a + b * a', 'a - b / b', '-a + -b', 'a < b', 'a >= b', '!(a == b)', 'a + "s" + b', '(a != b) + a',
+    ])
+    def test_matches_expr_evaluator(self, input: str):
+        values = [0, 2, -1.5, True, 'str', None]
+        expr = parse_expr(input)
+
+        for a, b in itertools.product(values, repeat=2):
+            variables = {'a': a, 'b': b}
+            assert outcome(AdaptiveEvaluator(variables), expr) == outcome(ExprEvaluator(variables), expr)
+
+    def test_unary_negate(self):
+        expr = parse_expr('-a')
+        AdaptiveEvaluator({'a': 1.5}).evaluate(expr)
+
+        assert expr.feedback[0] is float
+        assert AdaptiveEvaluator({'a': 2.5}).evaluate(expr) == -2.5
+        assert AdaptiveEvaluator({'a': 2}).evaluate(expr) == -2
+        assert isinstance(expr.expression, exprs.Variable)
+
+    @pytest.mark.parametrize('input', ['(1 + 2) * -3 - 4 / 2', '-(1.5 - true) >= 2', '1 + 2 == 3', '!(-1 < 2) + 1'])
+    def test_skips_feedback_for_checked_operands(self, input: str):
+        expr = parse_expr(input)
+        assert TypeChecker().check(expr) == []
+
+        assert AdaptiveEvaluator().evaluate(expr) == ExprEvaluator().evaluate(parse_expr(input))
+        assert AdaptiveEvaluator().evaluate(expr) == ExprEvaluator().evaluate(parse_expr(input))
+        assert expr.numeric_operands
+        if isinstance(expr, exprs.Binary):
+            assert expr.feedback[:2] == (None, None)
+        else:
+            assert expr.feedback is None
+
+    def test_checked_after_despecializing(self):
+        expr = parse_expr('(1 - 2) + true')
+        AdaptiveEvaluator().evaluate(expr)
+        assert expr.feedback is GENERIC_BINARY
+
+        TypeChecker().check(expr)
+
+        assert AdaptiveEvaluator().evaluate(expr) == 0
+        assert expr.feedback[:2] == (None, None)
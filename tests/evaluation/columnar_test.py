@@ -0,0 +1,139 @@
+from typing import Any, Dict
+
+import pytest
+
+from evaluation.expr import ExprEvaluator, RuntimeException
+from parsing.expr import Expr
+
+np = pytest.importorskip('numpy')
+
+from evaluation.columnar import ColumnarEvaluator  # noqa: E402
+
+
+def parse_expr(input: str) -> Expr:
+    from parsing.lexer import get_all_tokens, Lexer
+    from parsing.parser import Parser
+
+    lexer = Lexer(input)
+    tokens = get_all_tokens(lexer)
+
+    parser = Parser(tokens)
+    return parser.expression()
+
+
+def columns() -> Dict[str, Any]:
+    return {
+        'i': np.array([1, -2, 0, 7]),
+        'f': np.array([0.5, 2.0, -1.5, 0.0]),
+        'b': np.array([True, False, True, False]),
+        'u': np.array([0, 1, 2, 3], dtype=np.uint8),
+        's': np.array(['a', '', 'bc', 'd']),
+        'o': np.array([1, None, 'x', 2.5], dtype=object),
+    }
+
+
+def evaluate_row(expr: Expr, row: int) -> Any:
+    variables = {name: column.tolist()[row] for name, column in columns().items()}
+    try:
+        return ExprEvaluator(variables).evaluate(expr)
+    except (RuntimeException, ArithmeticError, TypeError) as e:
+        return str(e)
+
+
+class TestColumnarEvaluator:
+    @pytest.mark.parametrize('input', [
+        'i * 2 + f',
+        'i / (f + 1)',
+        'b + b * 2',
+        '-u - 1',
+        '-b',
+        'i > f == !b',
+        'i <= 1 != f < 0',
+        '!i',
+        '!s',
+        's + "x" + s',
+        's + i',
+        'f + "x"',
+        'o + 1',
+        '!o',
+        '"a" + 1',
+        '1 - 2 * 3',
+    ])
+    def test_matches_rows(self, input: str):
+        expr = parse_expr(input)
+
+        result = ColumnarEvaluator(columns()).evaluate_rows(expr)
+
+        for row in range(4):
+            expected = evaluate_row(expr, row)
+            value = result.values[row]
+            if result.failed[row]:
+                actual = str(result.errors[row])
+            else:
+                actual = value.item() if isinstance(value, np.generic) else value
+            assert actual == expected
+            assert type(actual) is type(expected) or isinstance(expected, float)
+
+    @pytest.mark.parametrize('input', [
+        'i - s',
+        '1 / i',
+        '1 / f',
+        'o - 1',
+        '-s',
+        '(1 / u) - s',
+        'i + missing',
+    ])
+    def test_errors_match_rows(self, input: str):
+        expr = parse_expr(input)
+
+        result = ColumnarEvaluator(columns()).evaluate_rows(expr)
+
+        for row in range(4):
+            expected = evaluate_row(expr, row)
+            if result.failed[row]:
+                assert str(result.errors[row]) == expected
+            else:
+                assert not isinstance(expected, str)
+
+    @pytest.mark.parametrize('input', [
+        'i * 4',
+        'i + i',
+        '0 - i',
+        '-i',
+        'i - 1 + 1',
+        'i / 3',
+        'i > 4611686018427387904.0',
+        'u + u',
+        '100000000000000000000 * i',
+    ])
+    def test_large_ints_match_python(self, input: str):
+        big = {
+            'i': np.array([2 ** 62, -2 ** 63, 3, 2 ** 63 - 1, 2 ** 53 + 1]),
+            'u': np.array([2 ** 64 - 1, 0, 1, 2 ** 63, 5], dtype=np.uint64),
+        }
+        expr = parse_expr(input)
+
+        values = ColumnarEvaluator(big).evaluate(expr).tolist()
+
+        rows = [{name: column.tolist()[row] for name, column in big.items()} for row in range(5)]
+        assert values == [ExprEvaluator(variables).evaluate(expr) for variables in rows]
+
+    def test_evaluate_raises_first_row_error(self):
+        expr = parse_expr('10 / i')
+
+        with pytest.raises(ZeroDivisionError):
+            ColumnarEvaluator(columns()).evaluate(expr)
+
+    def test_evaluate(self):
+        result = ColumnarEvaluator({'x': np.arange(5)}).evaluate(parse_expr('x * x > 3'))
+
+        assert result.tolist() == [False, False, True, True, True]
+
+    def test_scalars_are_broadcast(self):
+        result = ColumnarEvaluator({'x': 2, 'y': np.arange(3)}, length=3).evaluate(parse_expr('x + 1'))
+
+        assert result.tolist() == [3, 3, 3]
+
+    def test_columns_must_have_the_same_length(self):
+        with pytest.raises(ValueError):
+            ColumnarEvaluator({'x': np.arange(2), 'y': np.arange(3)})
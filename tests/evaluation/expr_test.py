@@ -17,11 +17,11 @@ def parse_expr(input: str) -> Expr:
     return parser.expression()
 
 
-def eval_expr(input: str) -> Any:
+def eval_expr(input: str, **variables: Any) -> Any:
     from evaluation.expr import ExprEvaluator
 
     expr = parse_expr(input)
-    eval = ExprEvaluator()
+    eval = ExprEvaluator(variables)
 
     return eval.evaluate(expr)
 
@@ -60,3 +60,14 @@ class TestExprEvaluator:
         result = eval_expr('"a" + 1')
 
         assert result == 'a1'
+
+    def test_variables(self):
+        result = eval_expr('a * b', a=2, b=3)
+
+        assert result == 6
+
+    def test_undefined_variable_should_throw(self):
+        with pytest.raises(RuntimeException) as e:
+            eval_expr('1 + a')
+
+        assert str(e.value) == 'Undefined variable \'a\' at line 1 offset 5\n1. 1 + a\n       ~'
@@ -0,0 +1,72 @@
+from typing import Any, List
+
+import pytest
+
+from evaluation.expr import RuntimeException
+from evaluation.interpreter import Interpreter
+from evaluation.resolver import Resolver
+from parsing.expr import Assign, Binary, BinaryOperator, BinaryOperatorType, Literal, Variable
+from parsing.stmt import Block, Expression, Stmt
+
+
+def parse_program(input: str) -> List[Stmt]:
+    from parsing.lexer import get_all_tokens, Lexer
+    from parsing.parser import Parser
+
+    lexer = Lexer(input)
+    tokens = get_all_tokens(lexer)
+
+    parser = Parser(tokens)
+    program = parser.parse()
+    Resolver().resolve(program)
+    return program
+
+
+def run(input: str, **variables: Any) -> Any:
+    return Interpreter(variables).execute(parse_program(input))
+
+
+class TestInterpreter:
+    def test_var(self):
+        assert run('var a = 1; var b = a + 2; b * 2;') == 6
+
+    def test_uninitialized_var_is_nil(self):
+        assert run('var a; a;') is None
+
+    def test_blocks(self):
+        assert run('var a = 1; { var a = 2; { var b = a; a = b + 1; } a; }') == 3
+
+    def test_block_scope_ends(self):
+        assert run('var a = 1; { var a = 2; } a;') == 1
+
+    def test_assignment_is_an_expression(self):
+        assert run('var a; var b; a = b = 3; a + b;') == 6
+
+    def test_unbound_variables(self):
+        variables = {'x': 2}
+        program = parse_program('x = x * 10; x + 1;')
+
+        assert Interpreter(variables).execute(program) == 21
+        assert variables == {'x': 20}
+
+    def test_undefined_variable(self):
+        with pytest.raises(RuntimeException) as e:
+            run('var a = 1;\nb = a;')
+
+        assert str(e.value) == 'Undefined variable \'b\' at line 2 offset 1-6\n2. b = a;\n   ~~~~~'
+
+    def test_deep_nesting(self):
+        depth = 2000
+        program = parse_program('var a = 0;')
+        # built by hand as the parser is recursive
+        variable = Variable('a')
+        variable.binding = (0, 0)
+        one = Literal(1)
+        increment = Assign('a', Binary(variable, BinaryOperator(BinaryOperatorType.PLUS, None), one))
+        increment.binding = (0, 0)
+        statement: Stmt = Expression(increment)
+        for _ in range(depth):
+            statement = Block([statement, Expression(increment)])
+        program.append(statement)
+
+        assert Interpreter().execute(program) == depth + 1
@@ -0,0 +1,117 @@
+import pytest
+
+import parsing.expr as exprs
+from evaluation.expr import ExprEvaluator, RuntimeException
+from evaluation.optimizer import Optimizer
+from parsing.expr import Expr
+
+
+def parse_expr(input: str) -> Expr:
+    from parsing.lexer import get_all_tokens, Lexer
+    from parsing.parser import Parser
+
+    lexer = Lexer(input)
+    tokens = get_all_tokens(lexer)
+
+    parser = Parser(tokens)
+    return parser.expression()
+
+
+def parse_deep_expr(input: str) -> Expr:
+    from parsing.lexer import get_all_tokens, Lexer
+    from parsing.stack_parser import StackParser
+
+    lexer = Lexer(input)
+    tokens = get_all_tokens(lexer)
+
+    parser = StackParser(tokens)
+    return parser.expression()
+
+
+def error(expr: Expr) -> str:
+    with pytest.raises(RuntimeException) as e:
+        ExprEvaluator().evaluate(expr)
+    return str(e.value)
+
+
+class TestOptimizer:
+    def test_folds_constants(self):
+        optimizer = Optimizer()
+
+        expr = optimizer.optimize(parse_expr('(1 + 2) * -3 == -9'))
+
+        assert isinstance(expr, exprs.Literal)
+        assert expr.value is True
+        assert str(expr.span) == 'line 1 offset 1-19'
+        assert optimizer.eliminated == 9
+
+    def test_strips_groupings(self):
+        expr = Optimizer().optimize(parse_expr('((1 - "a"))'))
+
+        assert isinstance(expr, exprs.Binary)
+        assert str(expr.span) == 'line 1 offset 1-12'
+
+    def test_keeps_errors_at_the_same_span(self):
+        expr = parse_expr('(1 + 2) - (-"a" + 1)')
+
+        optimized = Optimizer().optimize(expr)
+
+        assert error(optimized) == error(expr)
+
+    def test_keeps_grouping_span_for_operand_errors(self):
+        expr = parse_expr('("a" + 1) * 2')
+
+        optimized = Optimizer().optimize(expr)
+
+        assert error(optimized) == error(expr)
+
+    def test_deep_trees(self):
+        optimizer = Optimizer()
+
+        folded = optimizer.optimize(parse_deep_expr('(' * 5000 + '1' + ' + 1' * 5000 + ')' * 5000))
+        kept = optimizer.optimize(parse_deep_expr('a' + ' - 1' * 5000))
+
+        assert isinstance(folded, exprs.Literal)
+        assert folded.value == 5001
+        assert isinstance(kept, exprs.Binary)
+        assert optimizer.eliminated == 15000
+
+    def test_does_not_fold_division_by_zero(self):
+        expr = Optimizer().optimize(parse_expr('1 / 0'))
+
+        assert isinstance(expr, exprs.Binary)
+
+    @pytest.mark.parametrize('input', [
+        '(1 - "a") * 1',
+        '1 * (1 - "a")',
+        '(1 - "a") - 0',
+        '--(1 - "a")',
+    ])
+    def test_identities(self, input: str):
+        expr = parse_expr(input)
+
+        optimized = Optimizer().optimize(expr)
+
+        assert isinstance(optimized, exprs.Binary)
+        assert optimized.operator.type == exprs.BinaryOperatorType.MINUS
+        assert error(optimized) == error(expr)
+
+    @pytest.mark.parametrize('input', [
+        '(true - 0) * 1',
+        '("a" + 1) * 1',
+        '1 - 0.0 * "a"',
+    ])
+    def test_identities_do_not_change_results(self, input: str):
+        expr = parse_expr(input)
+
+        optimized = Optimizer().optimize(expr)
+
+        try:
+            expected = repr(ExprEvaluator().evaluate(expr))
+        except RuntimeException as e:
+            expected = str(e)
+        try:
+            actual = repr(ExprEvaluator().evaluate(optimized))
+        except RuntimeException as e:
+            actual = str(e)
+        assert actual == expected
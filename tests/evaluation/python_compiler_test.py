@@ -0,0 +1,97 @@
+import pytest
+
+from evaluation.python_compiler import PythonCompiler
+from evaluation.expr import ExprEvaluator, RuntimeException
+from parsing.expr import Expr
+
+
+def parse_expr(input: str) -> Expr:
+    from parsing.lexer import get_all_tokens, Lexer
+    from parsing.parser import Parser
+
+    lexer = Lexer(input)
+    tokens = get_all_tokens(lexer)
+
+    parser = Parser(tokens)
+    return parser.expression()
+
+
+class TestPythonCompiler:
+    @pytest.mark.parametrize('input', [
+        '123',
+        '(123)',
+        '-123',
+        '1 + 2 * 3 - 4 / 8',
+        '"a" + "b"',
+        '"a" + 1.5',
+        '1.5 + "a"',
+        'true + 1',
+        '!true == !!0',
+        '!"a"',
+        '-(1 - 2) * 3 < 9',
+        '1 > 1',
+        '1 >= 2',
+        '2 <= 2',
+        '1 != 2',
+    ])
+    def test_matches_evaluator(self, input: str):
+        expr = parse_expr(input)
+
+        result = PythonCompiler().compile(expr)()
+
+        assert result == ExprEvaluator().evaluate(expr)
+        assert type(result) is type(ExprEvaluator().evaluate(expr))
+
+    @pytest.mark.parametrize('input', [
+        '1 - "a"',
+        '"a" * 2',
+        '-"a" + 1',
+        '(1 + 2) * (3 - "x")',
+    ])
+    def test_errors_match_evaluator(self, input: str):
+        expr = parse_expr(input)
+        compiled = PythonCompiler().compile(expr)
+
+        with pytest.raises(RuntimeException) as expected:
+            ExprEvaluator().evaluate(expr)
+        with pytest.raises(RuntimeException) as actual:
+            compiled()
+
+        assert str(actual.value) == str(expected.value)
+
+    def test_compiled_expression_can_be_called_repeatedly(self):
+        compiled = PythonCompiler().compile(parse_expr('1 + 2'))
+
+        assert [compiled(), compiled()] == [3, 3]
+
+    def test_right_operand_is_evaluated_before_left_is_checked(self):
+        expr = parse_expr('"a" - -"b"')
+
+        with pytest.raises(RuntimeException) as e:
+            PythonCompiler().compile(expr)()
+
+        assert str(e.value).startswith('Expected a number at line 1 offset 8-11')
+
+    def test_compiles_to_a_code_object(self):
+        compiled = PythonCompiler().compile(parse_expr('1 + 2'))
+
+        assert compiled.__code__.co_filename == '<lox>'
+
+    def test_variables(self):
+        variables = {'a': 1, 'b': 'x'}
+        expr = parse_expr('a + b')
+        compiled = PythonCompiler(variables).compile(expr)
+
+        assert compiled() == '1x'
+        variables['a'] = 2
+        assert compiled() == '2x'
+
+    def test_undefined_variable(self):
+        expr = parse_expr('1 + (2 * c)')
+
+        with pytest.raises(RuntimeException) as expected:
+            ExprEvaluator().evaluate(expr)
+        with pytest.raises(RuntimeException) as actual:
+            PythonCompiler().compile(expr)()
+
+        assert str(actual.value) == str(expected.value)
@@ -0,0 +1,91 @@
+from typing import List
+
+import pytest
+
+import parsing.expr as exprs
+import parsing.stmt as stmts
+from evaluation.resolver import Resolver, ResolverException
+from parsing.stmt import Stmt
+
+
+def parse_program(input: str) -> List[Stmt]:
+    from parsing.lexer import get_all_tokens, Lexer
+    from parsing.parser import Parser
+
+    lexer = Lexer(input)
+    tokens = get_all_tokens(lexer)
+
+    parser = Parser(tokens)
+    return parser.parse()
+
+
+def resolve(input: str) -> List[Stmt]:
+    program = parse_program(input)
+    Resolver().resolve(program)
+    return program
+
+
+def expression(statement: Stmt) -> exprs.Expr:
+    assert isinstance(statement, stmts.Expression)
+    return statement.expression
+
+
+class TestResolver:
+    def test_binds_depth_and_slot(self):
+        program = resolve('var a; var b; { var c; { b; c; a; } }')
+
+        outer = program[2]
+        assert isinstance(outer, stmts.Block)
+        inner = outer.statements[1]
+        assert isinstance(inner, stmts.Block)
+        assert [expression(statement).binding for statement in inner.statements] == [(0, 1), (1, 0), (0, 0)]
+
+    def test_shadowing(self):
+        program = resolve('var a; { a; var a; a; }')
+
+        block = program[1]
+        assert isinstance(block, stmts.Block)
+        assert expression(block.statements[0]).binding == (0, 0)
+        assert expression(block.statements[2]).binding == (1, 0)
+
+    def test_assignment(self):
+        program = resolve('var a; { var b; a = b; }')
+
+        block = program[1]
+        assert isinstance(block, stmts.Block)
+        assign = expression(block.statements[1])
+        assert isinstance(assign, exprs.Assign)
+        assert assign.binding == (0, 0)
+        assert isinstance(assign.value, exprs.Variable)
+        assert assign.value.binding == (1, 0)
+
+    def test_deeply_nested_blocks(self):
+        program = resolve('var a; ' + '{ var b; ' * 5000 + 'a; b;' + '}' * 5000)
+
+        block = program[1]
+        for _ in range(4999):
+            assert isinstance(block, stmts.Block)
+            block = block.statements[1]
+        assert isinstance(block, stmts.Block)
+        assert [expression(statement).binding for statement in block.statements[1:]] == [(0, 0), (5000, 0)]
+
+    def test_unbound(self):
+        program = resolve('a + 1;')
+
+        expr = expression(program[0])
+        assert isinstance(expr, exprs.Binary) and isinstance(expr.left, exprs.Variable)
+        assert expr.left.binding is None
+
+    def test_own_initializer(self):
+        with pytest.raises(ResolverException) as e:
+            resolve('{ var a = a + 1; }')
+
+        assert str(e.value) == ('Can\'t read \'a\' in its own initializer at line 1 offset 11\n'
+                                '1. { var a = a + 1; }\n'
+                                '             ~')
+
+    def test_redeclaration(self):
+        with pytest.raises(ResolverException) as e:
+            resolve('var a; var a;')
+
+        assert e.value.message == 'Already a variable called \'a\' in this scope'
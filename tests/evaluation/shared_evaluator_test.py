@@ -0,0 +1,77 @@
+from typing import Any
+
+import pytest
+
+import parsing.expr as exprs
+from evaluation.expr import ExprEvaluator, RuntimeException
+from evaluation.shared_evaluator import SharedEvaluator
+from parsing.expr import Expr
+from parsing.hash_cons import hash_cons
+
+
+def parse_expr(input: str) -> Expr:
+    from parsing.lexer import get_all_tokens, Lexer
+    from parsing.parser import Parser
+
+    lexer = Lexer(input)
+    tokens = get_all_tokens(lexer)
+
+    parser = Parser(tokens)
+    return parser.expression()
+
+
+class CountingEvaluator(SharedEvaluator):
+    def __init__(self) -> None:
+        super().__init__()
+        self.binaries = 0
+
+    def apply_binary(self, node: exprs.Binary, left: Any, right: Any) -> Any:
+        self.binaries += 1
+        return super().apply_binary(node, left, right)
+
+
+class TestSharedEvaluator:
+    @pytest.mark.parametrize('input', [
+        '123',
+        '(1 + 2) * (1 + 2)',
+        '"a" + 1 + ("a" + 1)',
+        '-(1 - 2) * 3 < -(1 - 2) * 3',
+        '!true == !!true',
+    ])
+    def test_matches_evaluator(self, input: str):
+        expr = parse_expr(input)
+
+        assert SharedEvaluator().evaluate(hash_cons(expr)) == ExprEvaluator().evaluate(expr)
+
+    def test_computes_shared_subtrees_once(self):
+        expr = hash_cons(parse_expr('((1 + 2) * (1 + 2)) - ((1 + 2) * (1 + 2))'))
+        evaluator = CountingEvaluator()
+
+        assert evaluator.evaluate(expr) == 0
+        assert evaluator.binaries == 3
+
+        assert evaluator.evaluate(expr) == 0
+        assert evaluator.binaries == 6
+
+    def test_errors(self):
+        expr = hash_cons(parse_expr('1 + (2 - "a") * (2 - "a")'))
+
+        with pytest.raises(RuntimeException) as e:
+            SharedEvaluator().evaluate(expr)
+
+        assert str(e.value) == 'Expected a number at line 1 offset 10-13\n1. 1 + (2 - "a") * (2 - "a")\n            ~~~'
+
+    @pytest.mark.parametrize('input', [
+        '"a" <= !0.0 * "a"',
+        '(1 - 2) * "a" + ((1 - 2) - "a")',
+        '-a + -a',
+        '("a" + 1) - ("a" + 1)',
+        '!true * (2 + 2) - (2 + 2) * "b"',
+    ])
+    def test_errors_point_at_their_occurrence(self, input: str):
+        with pytest.raises(RuntimeException) as expected:
+            ExprEvaluator().evaluate(parse_expr(input))
+        with pytest.raises(RuntimeException) as e:
+            SharedEvaluator().evaluate(hash_cons(parse_expr(input)))
+
+        assert str(e.value) == str(expected.value)
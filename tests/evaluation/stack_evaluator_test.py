@@ -0,0 +1,60 @@
+from typing import Any
+
+import pytest
+
+from evaluation.expr import ExprEvaluator, RuntimeException
+from evaluation.stack_evaluator import StackEvaluator
+from parsing.expr import Expr
+
+
+def parse_expr(input: str) -> Expr:
+    from parsing.regex_lexer import get_token_buffer
+    from parsing.stack_parser import StackParser
+
+    return StackParser(get_token_buffer(input)).expression()
+
+
+def eval_expr(input: str) -> Any:
+    return StackEvaluator().evaluate(parse_expr(input))
+
+
+class TestStackEvaluator:
+    @pytest.mark.parametrize('input', [
+        '123',
+        '(123)',
+        '-123',
+        '1 + 2 * 3 - 4 / 8',
+        '"a" + "b"',
+        '"a" + 1.5',
+        '!true == !!0',
+        '-(1 - 2) * 3 < 9',
+    ])
+    def test_matches_evaluator(self, input: str):
+        expr = parse_expr(input)
+
+        assert StackEvaluator().evaluate(expr) == ExprEvaluator().evaluate(expr)
+
+    @pytest.mark.parametrize('input', [
+        '1 - "a"',
+        '-"a" + 1',
+        '(1 + 2) * (3 - "x")',
+    ])
+    def test_errors_match_evaluator(self, input: str):
+        expr = parse_expr(input)
+
+        with pytest.raises(RuntimeException) as expected:
+            ExprEvaluator().evaluate(expr)
+        with pytest.raises(RuntimeException) as actual:
+            StackEvaluator().evaluate(expr)
+
+        assert str(actual.value) == str(expected.value)
+
+    def test_long_chain(self):
+        result = eval_expr(' + '.join(['1'] * 5000))
+
+        assert result == 5000
+
+    def test_deep_nesting(self):
+        result = eval_expr('(' * 5000 + '-1' + ')' * 5000)
+
+        assert result == -1
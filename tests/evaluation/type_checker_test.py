@@ -0,0 +1,134 @@
+import itertools
+from typing import Any
+
+import pytest
+
+import parsing.expr as exprs
+from evaluation.closure import ClosureCompiler
+from evaluation.expr import ExprEvaluator, RuntimeException
+from evaluation.type_checker import TypeChecker, ValueType
+from parsing.expr import Expr
+from parsing.source import Source, SourceSpan
+
+
+def parse_expr(input: str) -> Expr:
+    from parsing.lexer import get_all_tokens, Lexer
+    from parsing.parser import Parser
+
+    lexer = Lexer(input)
+    tokens = get_all_tokens(lexer)
+
+    parser = Parser(tokens)
+    return parser.expression()
+
+
+def parse_deep_expr(input: str) -> Expr:
+    from parsing.lexer import get_all_tokens, Lexer
+    from parsing.stack_parser import StackParser
+
+    lexer = Lexer(input)
+    tokens = get_all_tokens(lexer)
+
+    parser = StackParser(tokens)
+    return parser.expression()
+
+
+def outcome(evaluate, expr: Expr) -> Any:
+    try:
+        value = evaluate(expr)
+        return type(value), value
+    except (RuntimeException, ArithmeticError, TypeError) as e:
+        return type(e), str(e)
+
+
+class TestTypeChecker:
+    @pytest.mark.parametrize('input, expected', [
+        ('1', ValueType.NUMBER),
+        ('1.5', ValueType.NUMBER),
+        ('"a"', ValueType.STRING),
+        ('true', ValueType.BOOLEAN),
+        ('a', ValueType.ANY),
+        ('1 + 2', ValueType.NUMBER),
+        ('1 + "a"', ValueType.STRING),
+        ('true + true', ValueType.NUMBER),
+        ('a + 1', ValueType.NUMBER | ValueType.STRING),
+        ('a - 1', ValueType.NUMBER),
+        ('-a', ValueType.NUMBER),
+        ('!a', ValueType.BOOLEAN),
+        ('1 < a', ValueType.BOOLEAN),
+        ('(1 == 2)', ValueType.BOOLEAN),
+    ])
+    def test_infers(self, input: str, expected: ValueType):
+        assert TypeChecker().infer(parse_expr(input)) == expected
+
+    def test_annotates_numeric_operands(self):
+        expr = parse_expr('-(1 + 2) * a')
+        TypeChecker().check(expr)
+
+        assert isinstance(expr, exprs.Binary)
+        assert expr.numeric_operands is False
+        assert isinstance(expr.left, exprs.Unary)
+        assert expr.left.numeric_operands is True
+        grouping = expr.left.expression
+        assert isinstance(grouping, exprs.Grouping)
+        assert isinstance(grouping.expression, exprs.Binary)
+        assert grouping.expression.numeric_operands is True
+
+    @pytest.mark.parametrize('input, span', [
+        ('1 - "a"', (4, 7)),
+        ('-"a"', (1, 4)),
+        ('"a" < 2', (0, 3)),
+        ('(1 + "b") * 2', (0, 9)),
+    ])
+    def test_reports_certain_errors(self, input: str, span: tuple):
+        errors = TypeChecker().check(parse_expr(input))
+
+        assert [(error.message, error.span.start, error.span.end) for error in errors] == [('Expected a number', *span)]
+
+    def test_reports_every_error(self):
+        errors = TypeChecker().check(parse_expr('-"a" + ("b" * 2)'))
+
+        assert [error.message for error in errors] == ['Expected a number', 'Expected a number']
+
+    def test_nil_can_not_be_added(self):
+        source = Source('nil + 1')
+        nil = exprs.Literal(None, SourceSpan(source, 0, 3))
+        one = exprs.Literal(1, SourceSpan(source, 6, 7))
+        plus = exprs.BinaryOperator(exprs.BinaryOperatorType.PLUS, SourceSpan(source, 4, 5))
+        expr = exprs.Binary(nil, plus, one, SourceSpan(source, 0, 7))
+
+        errors = TypeChecker().check(expr)
+
+        assert [error.message for error in errors] == ['Operands must be two numbers or a string']
+
+    def test_deep_trees(self):
+        deep = parse_deep_expr('(' * 5000 + '-1' + ' - "a"' * 5000 + ')' * 5000)
+
+        errors = TypeChecker().check(deep)
+
+        assert len(errors) == 5000
+        assert [error.span.start for error in errors[:2]] == [5005, 5011]
+
+        negated = parse_deep_expr('-' * 5000 + '1')
+
+        assert TypeChecker().check(negated) == []
+        assert isinstance(negated, exprs.Unary)
+        assert negated.numeric_operands is True
+
+    @pytest.mark.parametrize('input', ['a + b', 'a - b', '-a', '"x" + a', 'a < b', '!a'])
+    def test_no_errors_for_unknowns(self, input: str):
+        assert TypeChecker().check(parse_expr(input)) == []
+
+    @pytest.mark.parametrize('input', [
+        '(1 + 2) * -3 - a', '-(a - 1) + (2 >= b)', '"s" + (1 + a) + -b', '!(a == b) + (1 / 2)', '(a + b) * (a - b)',
+    ])
+    def test_engines_match_unchecked(self, input: str):
+        values = [0, 2, -1.5, True, 'str']
+        checked = parse_expr(input)
+        assert TypeChecker().check(checked) == []
+
+        for a, b in itertools.product(values, repeat=2):
+            variables = {'a': a, 'b': b}
+            expected = outcome(ExprEvaluator(variables).evaluate, parse_expr(input))
+            assert outcome(ExprEvaluator(variables).evaluate, checked) == expected
+            assert outcome(ClosureCompiler(variables).evaluate, checked) == expected
@@ -0,0 +1,84 @@
+import pytest
+
+import instrumentation
+import parsing.expr as exprs
+from evaluation.expr import RuntimeException
+from parsing.cache import LruCache
+from parsing.lexer import LexerException
+from parsing.parser import ParserException
+from repl import load
+
+
+@pytest.fixture
+def counters():
+    instrumentation.enable()
+    instrumentation.reset()
+    yield
+    instrumentation.disable()
+
+
+def new_cache() -> LruCache:
+    return LruCache(errors=(LexerException, ParserException))
+
+
+class TestInstrumentation:
+    def test_disabled_by_default(self):
+        assert not instrumentation.is_enabled()
+
+        program = load('1 + 2', cache=None)
+
+        assert program() == 3
+        assert instrumentation.counters is None
+
+    @pytest.mark.parametrize('evaluator', ['recursive', 'closure', 'vm', 'python', 'shared', 'adaptive'])
+    def test_counts(self, counters, evaluator: str):
+        program = load('-(1 + 2) * 3 + 4', evaluator=evaluator, cache=new_cache())
+        program()
+        program()
+
+        stats = instrumentation.counters
+        assert stats.phases['lex'].calls == 1
+        assert stats.phases['parse'].calls == 1
+        assert stats.phases['evaluate'].calls == 2
+        assert stats.tokens == 11
+        assert stats.nodes == {'Binary': 3, 'Literal': 4, 'Unary': 1, 'Grouping': 1}
+        assert stats.binary_operators == {exprs.BinaryOperatorType.PLUS: 4, exprs.BinaryOperatorType.MULTIPLY: 2}
+        assert stats.unary_operators == {exprs.UnaryOperatorType.NEGATE: 2}
+
+    def test_counts_shared_subtrees_each_time(self, counters):
+        load('(1 + 2) * (1 + 2)', evaluator='shared', cache=None)()
+
+        binary = instrumentation.counters.binary_operators
+        assert binary == {exprs.BinaryOperatorType.PLUS: 2, exprs.BinaryOperatorType.MULTIPLY: 1}
+
+    def test_errors(self, counters):
+        with pytest.raises(ParserException):
+            load('1 +', cache=None)
+        with pytest.raises(RuntimeException):
+            load('-"a"', cache=None)()
+
+        stats = instrumentation.counters
+        assert stats.phases['parse'].errors == 1
+        assert stats.phases['evaluate'].errors == 1
+        assert stats.unary_operators == {}
+
+    def test_programs_loaded_while_disabled_are_not_reused(self):
+        cache = new_cache()
+        load('1 + 2', cache=cache)
+
+        instrumentation.enable()
+        try:
+            load('1 + 2', cache=cache)()
+            assert instrumentation.counters.phases['evaluate'].calls == 1
+        finally:
+            instrumentation.disable()
+
+        assert cache.stats.misses == 2
+
+    def test_str(self, counters):
+        load('!true', cache=None)()
+
+        text = str(instrumentation.counters)
+
+        assert 'evaluate 1 calls, 0 errors' in text
+        assert 'unary    NOT 1' in text
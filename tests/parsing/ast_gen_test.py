@@ -0,0 +1,103 @@
+import types
+
+import pytest
+
+import parsing.expr as exprs
+from parsing.ast_gen import generate_ast
+
+
+def generate_module(read_only: bool) -> types.ModuleType:
+    source = generate_ast('Node', ['from typing import Any'], {'Operator': ['PLUS']}, {
+        'Pair': [('left', 'Node'), ('operator', 'Operator'), ('right', 'Node')],
+        'Leaf': [('value', 'Any')],
+    }, {
+        'Leaf': [('note', 'Optional[str]')],
+    }, read_only)
+
+    module = types.ModuleType('generated')
+    exec('\n'.join(source), module.__dict__)
+    return module
+
+
+class TestGeneratedNodes:
+    def test_one_typing_import(self):
+        source = generate_ast('Node', ['from typing import Tuple, Any', 'import os'], {}, {'Leaf': [('value', 'Any')]}, {})
+
+        assert [line for line in source if 'typing' in line] == ['from typing import Any, Callable, List, Optional, Tuple']
+        assert 'import os' in source
+
+    def test_slots(self):
+        node = exprs.Binary(exprs.Literal(1), exprs.BinaryOperator(exprs.BinaryOperatorType.PLUS, None), exprs.Literal(2))
+
+        assert not hasattr(node, '__dict__')
+        assert node.span is None
+        with pytest.raises(AttributeError):
+            node.extra = 1
+
+    def test_span_argument(self):
+        first = exprs.Literal(1, span=None)
+        second = exprs.Literal(1)
+        second.span = object()
+
+        assert first == second
+
+    @pytest.mark.parametrize('read_only', [False, True])
+    def test_generated(self, read_only: bool):
+        module = generate_module(read_only)
+        operator = module.Operator(module.OperatorType.PLUS, None)
+
+        node = module.Pair(module.Leaf(1), operator, module.Leaf(2))
+        node.span = 'span'
+        node.left.note = 'annotated'
+
+        assert node == module.Pair(module.Leaf(1), operator, module.Leaf(2))
+        assert node != module.Pair(module.Leaf(1.0), operator, module.Leaf(2))
+        assert node.span == 'span'
+        assert node.left.note == 'annotated'
+
+    def test_read_only(self):
+        module = generate_module(True)
+        node = module.Leaf(1)
+
+        with pytest.raises(AttributeError, match='Leaf.value is read-only'):
+            node.value = 2
+        with pytest.raises(AttributeError, match='Operator.type is read-only'):
+            module.Operator(module.OperatorType.PLUS, None).type = module.OperatorType.PLUS
+
+
+class TestDispatch:
+    def test_opcodes(self):
+        plus = exprs.Binary(exprs.Literal(1), exprs.BinaryOperator(exprs.BinaryOperatorType.PLUS, None), exprs.Literal(2))
+        negate = exprs.Unary(exprs.UnaryOperator(exprs.UnaryOperatorType.NEGATE, None), exprs.Literal(1))
+
+        assert plus.opcode == exprs.ExprOpcode.BINARY_PLUS
+        assert negate.opcode == exprs.ExprOpcode.UNARY_NEGATE
+        assert exprs.Literal(1).opcode == exprs.ExprOpcode.LITERAL
+
+    @pytest.mark.parametrize('node', [exprs.Binary, exprs.Grouping, exprs.Literal, exprs.Unary, exprs.Variable, exprs.Assign])
+    def test_opcode_is_a_slot(self, node: type):
+        assert 'opcode' in node.__slots__
+        assert 'opcode' not in node.__dict__ or isinstance(node.__dict__['opcode'], types.MemberDescriptorType)
+
+    def test_table(self):
+        class Visitor(exprs.ExprVisitor):
+            def visit_binary(self, node):
+                return 'binary'
+
+            def visit_binary_plus(self, node):
+                return 'plus'
+
+        class Override(Visitor):
+            def visit_binary(self, node):
+                return 'override'
+
+        module = generate_module(False)
+        operator = module.Operator(module.OperatorType.PLUS, None)
+        minus = exprs.Binary(exprs.Literal(1), exprs.BinaryOperator(exprs.BinaryOperatorType.MINUS, None), exprs.Literal(2))
+        plus = exprs.Binary(exprs.Literal(1), exprs.BinaryOperator(exprs.BinaryOperatorType.PLUS, None), exprs.Literal(2))
+
+        assert [Visitor.expr_table[node.opcode](Visitor(), node) for node in [minus, plus]] == ['binary', 'plus']
+        # a node's visit method overridden in a subclass wins over the operator's from further up
+        assert Override.expr_table[plus.opcode](Override(), plus) == 'override'
+        assert len(module.NodeVisitor.node_table) == module.NodeOpcode.LEAF + 1
+        assert module.Pair(module.Leaf(1), operator, module.Leaf(2)).opcode == module.NodeOpcode.PAIR_PLUS
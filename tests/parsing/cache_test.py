@@ -0,0 +1,105 @@
+import pytest
+
+from parsing.cache import LruCache, tree_size
+from parsing.expr import Expr
+from parsing.hash_cons import hash_cons
+
+
+def parse_expr(input: str) -> Expr:
+    from parsing.lexer import get_all_tokens, Lexer
+    from parsing.parser import Parser
+
+    lexer = Lexer(input)
+    tokens = get_all_tokens(lexer)
+
+    parser = Parser(tokens)
+    return parser.expression()
+
+
+class TestLruCache:
+    def test_hit(self):
+        cache: LruCache[int] = LruCache()
+        calls = []
+
+        assert cache.get('a', lambda: calls.append('a') or 1) == 1
+        assert cache.get('a', lambda: calls.append('a') or 2) == 1
+
+        assert calls == ['a']
+        assert cache.stats.hits == 1
+        assert cache.stats.misses == 1
+
+    def test_evicts_least_recently_used(self):
+        cache: LruCache[int] = LruCache(max_entries=2)
+
+        cache.get('a', lambda: 1)
+        cache.get('b', lambda: 2)
+        cache.get('a', lambda: 1)
+        cache.get('c', lambda: 3)
+
+        assert 'a' in cache
+        assert 'b' not in cache
+        assert 'c' in cache
+        assert cache.stats.evictions == 1
+
+    def test_evicts_by_size(self):
+        cache: LruCache[str] = LruCache(max_bytes=10, weigh=lambda key, value: len(value))
+
+        cache.get('a', lambda: 'aaaa')
+        cache.get('b', lambda: 'bbbb')
+        cache.get('c', lambda: 'cccc')
+
+        assert len(cache) == 2
+        assert 'a' not in cache
+        assert cache.stats.size == 8
+
+    def test_caches_errors(self):
+        cache: LruCache[int] = LruCache(errors=(ValueError,))
+        calls = []
+
+        def create() -> int:
+            calls.append('a')
+            raise ValueError('bad')
+
+        for _ in range(2):
+            with pytest.raises(ValueError, match='bad'):
+                cache.get('a', create)
+
+        assert calls == ['a']
+        assert cache.stats.hits == 1
+
+    def test_does_not_cache_other_errors(self):
+        cache: LruCache[int] = LruCache(errors=(ValueError,))
+
+        with pytest.raises(KeyError):
+            cache.get('a', lambda: {}['a'])
+
+        assert cache.get('a', lambda: 1) == 1
+
+    def test_clear(self):
+        cache: LruCache[int] = LruCache()
+        cache.get('a', lambda: 1)
+
+        cache.clear()
+
+        assert len(cache) == 0
+        assert cache.stats.size == 0
+
+    def test_concurrent_misses(self):
+        cache: LruCache[str] = LruCache(weigh=lambda key, value: len(value))
+
+        # another thread creates and adds the key while this one is still creating it
+        def create() -> str:
+            cache.get('a', lambda: 'inner')
+            return 'outer'
+
+        assert cache.get('a', create) == 'outer'
+        assert cache.get('a', lambda: 'other') == 'outer'
+        assert len(cache) == 1
+        assert cache.stats.size == 5
+
+
+class TestTreeSize:
+    def test_counts_shared_nodes_once(self):
+        expr = parse_expr('(1 + 2) * (1 + 2)')
+
+        assert tree_size(hash_cons(expr)) < tree_size(expr)
@@ -0,0 +1,67 @@
+import os
+
+from parsing.disk_cache import DiskCache
+from parsing.expr import Expr
+from parsing.serialize import FORMAT_VERSION
+
+
+def parse_expr(input: str) -> Expr:
+    from parsing.lexer import get_all_tokens, Lexer
+    from parsing.parser import Parser
+
+    lexer = Lexer(input)
+    tokens = get_all_tokens(lexer)
+
+    parser = Parser(tokens)
+    return parser.expression()
+
+
+class TestDiskCache:
+    def test_hit(self, tmp_path):
+        input = '(1 + 2) * "a"'
+
+        first = DiskCache(str(tmp_path)).get(input, lambda: parse_expr(input))
+        cache = DiskCache(str(tmp_path))
+        second = cache.get(input, lambda: parse_expr('1'))
+
+        assert second == first
+        assert str(second.span) == str(first.span)
+        assert cache.hits == 1
+
+    def test_options_are_part_of_the_key(self, tmp_path):
+        cache = DiskCache(str(tmp_path))
+
+        cache.get('1 + 2', lambda: parse_expr('1 + 2'))
+        cache.get('1 + 2', lambda: parse_expr('1 + 2'), 'optimize')
+
+        assert cache.misses == 2
+
+    def test_corrupt_file(self, tmp_path):
+        cache = DiskCache(str(tmp_path))
+        cache.get('1 + 2', lambda: parse_expr('1 + 2'))
+
+        path = cache.path('1 + 2')
+        with open(path, 'r+b') as f:
+            f.seek(-2, os.SEEK_END)
+            f.write(b'xx')
+
+        assert cache.get('1 + 2', lambda: parse_expr('1 + 2')) == parse_expr('1 + 2')
+        assert cache.misses == 2
+        # and it was written again
+        assert cache.get('1 + 2', lambda: parse_expr('1')) == parse_expr('1 + 2')
+
+    def test_version_mismatch(self, tmp_path, monkeypatch):
+        cache = DiskCache(str(tmp_path))
+        cache.get('1 + 2', lambda: parse_expr('1 + 2'))
+
+        monkeypatch.setattr('parsing.disk_cache.FORMAT_VERSION', FORMAT_VERSION + 1)
+
+        assert cache.get('1 + 2', lambda: parse_expr('1 + 2')) == parse_expr('1 + 2')
+        assert cache.misses == 2
+
+    def test_unwritable_directory(self, tmp_path):
+        blocker = tmp_path / 'file'
+        blocker.write_text('')
+        cache = DiskCache(str(blocker))
+
+        assert cache.get('1 + 2', lambda: parse_expr('1 + 2')) == parse_expr('1 + 2')
@@ -0,0 +1,103 @@
+import parsing.expr as exprs
+from parsing.expr import Expr
+from parsing.hash_cons import hash_cons, HashConsFactory, shared_nodes
+
+
+def parse_expr(input: str) -> Expr:
+    from parsing.lexer import get_all_tokens, Lexer
+    from parsing.parser import Parser
+
+    lexer = Lexer(input)
+    tokens = get_all_tokens(lexer)
+
+    parser = Parser(tokens)
+    return parser.expression()
+
+
+class TestStructuralEquality:
+    def test_equal_trees(self):
+        assert parse_expr('1 + -(2 * "a")') == parse_expr('1   +  -(2*"a")')
+        assert hash(parse_expr('1 + -(2 * "a")')) == hash(parse_expr('1   +  -(2*"a")'))
+
+    def test_different_trees(self):
+        assert parse_expr('1 + 2') != parse_expr('1 - 2')
+        assert parse_expr('1 + 2') != parse_expr('2 + 1')
+        assert parse_expr('-1') != parse_expr('!1')
+        assert parse_expr('(1)') != parse_expr('1')
+
+    def test_literal_types(self):
+        assert parse_expr('1') != parse_expr('true')
+        assert parse_expr('1') != parse_expr('"1"')
+        assert exprs.Literal(1) != exprs.Literal(1.0)
+
+    def test_float_sign(self):
+        assert exprs.Literal(0.0) != exprs.Literal(-0.0)
+        assert hash(exprs.Literal(0.0)) != hash(exprs.Literal(-0.0))
+        assert exprs.Literal(-0.0) == exprs.Literal(-0.0)
+
+    def test_deep_trees(self):
+        from parsing.stack_parser import StackParser
+        from parsing.lexer import get_all_tokens, Lexer
+
+        input = '-(' * 5000 + '1' + ')' * 5000
+        first = StackParser(get_all_tokens(Lexer(input))).expression()
+        second = StackParser(get_all_tokens(Lexer(input))).expression()
+
+        assert hash(first) == hash(second)
+        assert first == second
+
+
+class TestHashCons:
+    def test_shares_identical_subtrees(self):
+        expr = hash_cons(parse_expr('(1 + 2) * (1 + 2)'))
+
+        assert isinstance(expr, exprs.Binary)
+        assert expr.left is expr.right
+        assert expr == parse_expr('(1 + 2) * (1 + 2)')
+
+    def test_keeps_first_span(self):
+        expr = hash_cons(parse_expr('(1 + 2) * (1 + 2)'))
+
+        assert str(expr.span) == 'line 1 offset 1-18'
+        assert str(expr.right.span) == 'line 1 offset 1-8'
+
+    def test_only_shares_numbers(self):
+        expr = hash_cons(parse_expr('(a - "b") * (a - "b") - ("c" + 1) * ("c" + 1) - (1 + 2) * (1 + 2)'))
+
+        # ((variables * variables) - (strings * strings)) - (numbers * numbers)
+        assert isinstance(expr, exprs.Binary) and isinstance(expr.left, exprs.Binary)
+        variables, strings, numbers = expr.left.left, expr.left.right, expr.right
+        assert isinstance(variables, exprs.Binary) and isinstance(strings, exprs.Binary) and isinstance(numbers, exprs.Binary)
+        assert variables.left is not variables.right
+        assert strings.left is not strings.right
+        assert numbers.left is numbers.right
+        assert str(strings.right.span) == 'line 1 offset 37-46'
+
+    def test_factory_counts(self):
+        factory = HashConsFactory()
+
+        hash_cons(parse_expr('1 + 1 + 1 + 1'), factory)
+
+        # 1, 1 + 1, (1 + 1) + 1, ((1 + 1) + 1) + 1
+        assert len(factory) == 4
+        assert factory.shared == 3
+
+    def test_factory_is_shared_between_trees(self):
+        factory = HashConsFactory()
+
+        first = hash_cons(parse_expr('-(1 + 2)'), factory)
+        second = hash_cons(parse_expr('!(1 + 2)'), factory)
+
+        assert isinstance(first, exprs.Unary) and isinstance(second, exprs.Unary)
+        assert first.expression is second.expression
+
+    def test_deep(self):
+        expr = hash_cons(parse_expr('1' + ' + 1' * 400))
+
+        assert len(shared_nodes(expr)) == 1
+
+    def test_shared_nodes(self):
+        expr = hash_cons(parse_expr('(1 + 2) * (1 + 2) - 3'))
+
+        assert isinstance(expr, exprs.Binary) and isinstance(expr.left, exprs.Binary)
+        assert shared_nodes(expr) == {id(expr.left.left)}
@@ -2,6 +2,7 @@ from typing import List
 
 import pytest
 
+from parsing.diagnostics import Diagnostic
 from parsing.lexer import get_all_tokens, Lexer, LexerException
 from parsing.token import TokenType, Token
 
@@ -99,3 +100,18 @@ class TestLexer:
 
         with pytest.raises(LexerException):
             lexer.next()
+
+    def test_recovers_from_errors(self):
+        diagnostics: List[Diagnostic] = []
+        lexer = Lexer('1 @@ + 2 # "abc', diagnostics)
+
+        tokens = get_all_tokens(lexer)
+
+        assert [token.type for token in tokens] == [TokenType.NUMBER, TokenType.PLUS, TokenType.NUMBER, TokenType.EOF]
+        assert [(diagnostic.message, diagnostic.span.start) for diagnostic in diagnostics] == [
+            ('Invalid char \'@\'', 2),
+            ('Invalid char \'@\'', 3),
+            ('Invalid char \'#\'', 9),
+            ('Unterminated string', 11),
+        ]
+        assert str(diagnostics[0]) == str(diagnostics[0].error)
@@ -1,7 +1,13 @@
-from typing import cast
+from typing import cast, List, Tuple
+
+import pytest
 
 import parsing.expr as exprs
+import parsing.stmt as stmts
+from parsing.diagnostics import Diagnostic
 from parsing.expr import Expr
+from parsing.parser import ParserException
+from parsing.stmt import Stmt
 
 
 def parse_expr(input: str) -> Expr:
@@ -15,6 +21,28 @@ def parse_expr(input: str) -> Expr:
     return parser.expression()
 
 
+def parse_program(input: str) -> List[Stmt]:
+    from parsing.lexer import get_all_tokens, Lexer
+    from parsing.parser import Parser
+
+    lexer = Lexer(input)
+    tokens = get_all_tokens(lexer)
+
+    parser = Parser(tokens)
+    return parser.parse()
+
+
+def parse_program_with_diagnostics(input: str) -> Tuple[List[Stmt], List[Diagnostic]]:
+    from parsing.lexer import get_all_tokens, Lexer
+    from parsing.parser import Parser
+
+    diagnostics: List[Diagnostic] = []
+    tokens = get_all_tokens(Lexer(input, diagnostics))
+
+    parser = Parser(tokens, diagnostics)
+    return parser.parse(), diagnostics
+
+
 def assert_number(expr: Expr, value: float):
     __tracebackhide__ = True
     assert isinstance(expr, exprs.Literal)
@@ -52,6 +80,13 @@ class TestParser:
         assert isinstance(expr, exprs.Grouping)
         assert_number(expr.expression, 123)
 
+    def test_variable(self):
+        expr = parse_expr('abc')
+
+        assert isinstance(expr, exprs.Variable)
+        assert expr.name == 'abc'
+        assert str(expr.span) == 'line 1 offset 1-4'
+
     def test_unary(self):
         expr = parse_expr('-123')
 
@@ -74,3 +109,93 @@ class TestParser:
         expr = assert_binary(expr.right, exprs.BinaryOperatorType.MULTIPLY)
         assert_number(expr.left, 456)
         assert_number(expr.right, 789)
+
+
+class TestProgramParser:
+    def test_var(self):
+        program = parse_program('var a = 1 + 2; var b;')
+
+        assert len(program) == 2
+        assert isinstance(program[0], stmts.Var)
+        assert program[0].name == 'a'
+        assert str(program[0].span) == 'line 1 offset 1-15'
+        assert_binary(program[0].initializer, exprs.BinaryOperatorType.PLUS)
+        assert isinstance(program[1], stmts.Var)
+        assert program[1].initializer is None
+
+    def test_block(self):
+        program = parse_program('{ var a = 1; { a; } }')
+
+        block = program[0]
+        assert isinstance(block, stmts.Block)
+        assert str(block.span) == 'line 1 offset 1-22'
+        assert isinstance(block.statements[0], stmts.Var)
+        assert isinstance(block.statements[1], stmts.Block)
+
+    def test_deeply_nested_blocks(self):
+        program = parse_program('{' * 5000 + 'a;' + '}' * 5000)
+
+        block = program[0]
+        for _ in range(4999):
+            assert isinstance(block, stmts.Block)
+            block = block.statements[0]
+        assert isinstance(block, stmts.Block)
+        assert isinstance(block.statements[0], stmts.Expression)
+        assert str(program[0].span) == 'line 1 offset 1-10003'
+
+    def test_assignment(self):
+        program = parse_program('a = b = 1 + 2;')
+
+        statement = program[0]
+        assert isinstance(statement, stmts.Expression)
+        expr = statement.expression
+        assert isinstance(expr, exprs.Assign)
+        assert expr.name == 'a'
+        assert str(expr.span) == 'line 1 offset 1-14'
+        assert isinstance(expr.value, exprs.Assign)
+        assert expr.value.name == 'b'
+
+    @pytest.mark.parametrize('input, message', [
+        ('var 1 = 2;', 'Expected variable name'),
+        ('var a = 1', 'Expected \';\' after variable declaration'),
+        ('1 + 2', 'Expected \';\' after expression'),
+        ('{ var a;', 'Expected \'}\' after block'),
+        ('1 + a = 2;', 'Invalid assignment target'),
+    ])
+    def test_errors(self, input: str, message: str):
+        with pytest.raises(ParserException) as e:
+            parse_program(input)
+
+        assert e.value.message == message
+
+    def test_recovers_from_errors(self):
+        program, diagnostics = parse_program_with_diagnostics('var 1 = 2; var a = 1; 1 + ; a = 2 var b; } 3 $;')
+
+        assert [diagnostic.message for diagnostic in diagnostics] == [
+            'Invalid char \'$\'',
+            'Expected variable name',
+            'Expected expression',
+            'Expected \';\' after expression',
+            'Expected expression',
+        ]
+        assert [type(statement) for statement in program] == [stmts.Var, stmts.Var, stmts.Expression]
+        assert [statement.name for statement in program[:2]] == ['a', 'b']
+
+    def test_recovers_inside_blocks(self):
+        program, diagnostics = parse_program_with_diagnostics('{ var a = ; a; { 1 + } 2; ')
+
+        assert [diagnostic.message for diagnostic in diagnostics] == [
+            'Expected expression',
+            'Expected expression',
+            'Expected \'}\' after block',
+        ]
+        block = program[0]
+        assert isinstance(block, stmts.Block)
+        assert [type(statement) for statement in block.statements] == [stmts.Expression, stmts.Block, stmts.Expression]
+
+    def test_reports_every_error_in_one_pass(self):
+        program, diagnostics = parse_program_with_diagnostics('var a = 1;\n1 + ;\n' * 1000)
+
+        assert len(program) == 1000
+        assert len(diagnostics) == 1000
+        assert diagnostics[-1].span.start_position.line == 2000
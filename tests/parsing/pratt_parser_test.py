@@ -0,0 +1,66 @@
+from typing import Any
+
+import pytest
+
+import parsing.expr as exprs
+from parsing.expr import Expr
+from parsing.lexer import get_all_tokens, Lexer
+from parsing.parser import Parser, ParserException
+from parsing.pratt_parser import PrattParser
+from parsing.regex_lexer import get_token_buffer
+
+
+def describe(expr: Expr) -> Any:
+    if isinstance(expr, exprs.Binary):
+        return 'binary', str(expr.span), expr.operator.type, str(expr.operator.span), describe(expr.left), describe(expr.right)
+    if isinstance(expr, exprs.Grouping):
+        return 'grouping', str(expr.span), describe(expr.expression)
+    if isinstance(expr, exprs.Literal):
+        return 'literal', str(expr.span), expr.value
+    if isinstance(expr, exprs.Unary):
+        return 'unary', str(expr.span), expr.operator.type, str(expr.operator.span), describe(expr.expression)
+    if isinstance(expr, exprs.Variable):
+        return 'variable', str(expr.span), expr.name
+    raise Exception('Unexpected node {}'.format(expr))
+
+
+def describe_error(parser) -> str:
+    with pytest.raises(ParserException) as e:
+        parser.expression()
+    return '{} {}'.format(type(e.value).__name__, e.value)
+
+
+class TestPrattParser:
+    @pytest.mark.parametrize('input', [
+        '123',
+        '"abc"',
+        'true == false',
+        '(123)',
+        '--!123',
+        '123 + 456 * 789',
+        '1 - 2 - 3 / 4 / 5',
+        '1 < 2 == 3 >= 4 != 5 <= 6 > 7',
+        '-(1 + 2) * !(3 - -4)\n + 5',
+        '1 2',
+    ])
+    def test_matches_parser(self, input: str):
+        tokens = get_all_tokens(Lexer(input))
+
+        assert describe(PrattParser(tokens).expression()) == describe(Parser(tokens).expression())
+
+    @pytest.mark.parametrize('input', [
+        '',
+        '1 +',
+        '(1 + 2',
+        '* 2',
+        '1 + (2 * )',
+    ])
+    def test_errors_match_parser(self, input: str):
+        tokens = get_all_tokens(Lexer(input))
+
+        assert describe_error(PrattParser(tokens)) == describe_error(Parser(tokens))
+
+    def test_accepts_token_buffer(self):
+        tokens = get_token_buffer('1 + 2 * 3')
+
+        assert describe(PrattParser(tokens).expression()) == describe(Parser(tokens).expression())
@@ -0,0 +1,68 @@
+from typing import List, Tuple
+
+import pytest
+
+from parsing.diagnostics import Diagnostic
+from parsing.lexer import get_all_tokens, Lexer, LexerException
+from parsing.regex_lexer import get_token_buffer, RegexLexer
+
+
+def describe(lexer) -> List[Tuple[str, str, str]]:
+    return list(map(lambda x: (x.type, str(x.span), x.literal), get_all_tokens(lexer)))
+
+
+def describe_error(lexer) -> Tuple[type, str]:
+    with pytest.raises(LexerException) as e:
+        get_all_tokens(lexer)
+    return type(e.value), str(e.value)
+
+
+class TestRegexLexer:
+    @pytest.mark.parametrize('input', [
+        '',
+        '()+-/*',
+        '{ var a = 1; }',
+        '! != = == < <= > >=',
+        '1234 12.34 5',
+        'a abc and or true false _x1',
+        '"Hello\nWorld" + "a"',
+        '+ //hello this is a comment\n+',
+        '// only a comment',
+        '1 + 2\n\n  * (3 - 4)\r\n',
+        '1 ',
+    ])
+    def test_matches_lexer(self, input: str):
+        assert describe(RegexLexer(input)) == describe(Lexer(input))
+
+    @pytest.mark.parametrize('input', [
+        '@',
+        '1 +\n  @',
+        '"Hello\nWorld',
+        '1 + "a\nb\nc',
+    ])
+    def test_errors_match_lexer(self, input: str):
+        assert describe_error(RegexLexer(input)) == describe_error(Lexer(input))
+
+    def test_eof_is_emitted_once(self):
+        lexer = RegexLexer('1')
+
+        assert lexer.next() is not None
+        assert lexer.next() is not None
+        assert lexer.next() is None
+
+    @pytest.mark.parametrize('input', [
+        '1 @@ + 2 # "abc',
+        '"a" $ 1\n"b\nc',
+        '1 + 2',
+    ])
+    def test_recovers_like_lexer(self, input: str):
+        diagnostics: List[Diagnostic] = []
+        expected: List[Diagnostic] = []
+
+        buffer = get_token_buffer(input, diagnostics)
+        tokens = get_all_tokens(Lexer(input, expected))
+
+        assert [(buffer.type(i), buffer.span(i).start) for i in range(len(buffer))] == [
+            (token.type, token.span.start) for token in tokens]
+        assert [(diagnostic.message, str(diagnostic.span), diagnostic.text) for diagnostic in diagnostics] == [
+            (diagnostic.message, str(diagnostic.span), diagnostic.text) for diagnostic in expected]
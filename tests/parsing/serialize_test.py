@@ -0,0 +1,59 @@
+import pytest
+
+from parsing.expr import Expr
+from parsing.serialize import dumps, loads, SerializationException
+from parsing.source import Source
+
+
+def parse_expr(input: str) -> Expr:
+    from parsing.lexer import get_all_tokens, Lexer
+    from parsing.parser import Parser
+
+    lexer = Lexer(input)
+    tokens = get_all_tokens(lexer)
+
+    parser = Parser(tokens)
+    return parser.expression()
+
+
+class TestSerialize:
+    @pytest.mark.parametrize('input', [
+        '123',
+        '1.5',
+        '"abc"',
+        'true',
+        '(1 + 2) * -3 == !false',
+        '"a" + 1 >= 2 / 3 - 4',
+        'a + -(b * a)',
+    ])
+    def test_round_trip(self, input: str):
+        expr = parse_expr(input)
+
+        loaded = loads(dumps(expr), Source(input))
+
+        assert loaded == expr
+        assert str(loaded.span) == str(expr.span)
+
+    def test_spans(self):
+        input = '1 +\n(2 * "a")'
+        expr = parse_expr(input)
+
+        loaded = loads(dumps(expr), Source(input))
+
+        assert str(loaded.right.span) == 'line 2 offset 1-10'
+        assert str(loaded.operator.span) == 'line 1 offset 3'
+
+    def test_deep(self):
+        input = '-' * 5000 + '1'
+        expr = parse_expr('1' + ' + 1' * 5000)
+
+        assert dumps(loads(dumps(expr), Source(input))) == dumps(expr)
+
+    @pytest.mark.parametrize('data', [
+        b'',
+        b'garbage',
+        dumps(parse_expr('1 + 2'))[:-3],
+    ])
+    def test_corrupt(self, data: bytes):
+        with pytest.raises(SerializationException):
+            loads(data, Source('1 + 2'))
@@ -1,10 +1,10 @@
-from parsing.source import highlight, SourceSpan, Position
+from parsing.source import highlight, Source, SourceSpan
 
 
 class TestSource:
     def test_highlight_single_line(self):
         source = 'hello world'
-        span = SourceSpan(source, Position.initial(), Position(len(source) - 1, 1, len(source) + 1))
+        span = SourceSpan(Source(source), 0, len(source))
 
         result = highlight(span)
 
@@ -12,7 +12,7 @@ class TestSource:
 
     def test_highlight_partial_single_line(self):
         source = 'hello world'
-        span = SourceSpan(source, Position(0, 1, 4), Position(len(source) - 3, 1, len(source) - 1))
+        span = SourceSpan(Source(source), 3, len(source) - 2)
 
         result = highlight(span)
 
@@ -20,7 +20,7 @@ class TestSource:
 
     def test_highlight_two_lines(self):
         source = 'hello\nworld'
-        span = SourceSpan(source, Position.initial(), Position(len(source) - 1, 2, 6))
+        span = SourceSpan(Source(source), 0, len(source))
 
         result = highlight(span)
 
@@ -28,7 +28,7 @@ class TestSource:
 
     def test_highlight_partial_two_lines(self):
         source = 'hello\nworld'
-        span = SourceSpan(source, Position(0, 1, 3), Position(len(source) - 3, 2, 4))
+        span = SourceSpan(Source(source), 2, len(source) - 2)
 
         result = highlight(span)
 
@@ -36,8 +36,29 @@ class TestSource:
 
     def test_highlight_partial_three_lines(self):
         source = 'hello\ngreen\nworld'
-        span = SourceSpan(source, Position(0, 1, 3), Position(len(source) - 3, 3, 4))
+        span = SourceSpan(Source(source), 2, len(source) - 2)
 
         result = highlight(span)
 
         assert result == '1. hello\n     ~~~\n2. green\n   ~~~~~\n3. world\n   ~~~'
+
+    def test_position(self):
+        source = Source('hello\ngreen\nworld')
+
+        position = source.position(8)
+
+        assert (position.line, position.line_offset) == (2, 3)
+
+    def test_position_after_trailing_newline(self):
+        source = Source('hello\n')
+
+        position = source.position(6)
+
+        assert (position.line, position.line_offset) == (2, 1)
+
+    def test_span_str(self):
+        source = Source('hello\ngreen\nworld')
+
+        assert str(SourceSpan(source, 6, 7)) == 'line 2 offset 1'
+        assert str(SourceSpan(source, 6, 9)) == 'line 2 offset 1-4'
+        assert str(SourceSpan(source, 2, 8)) == 'line 1 offset 3 - line 2 offset 3'
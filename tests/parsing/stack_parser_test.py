@@ -0,0 +1,79 @@
+from typing import Any
+
+import pytest
+
+import parsing.expr as exprs
+from parsing.expr import Expr
+from parsing.lexer import get_all_tokens, Lexer
+from parsing.parser import Parser, ParserException
+from parsing.regex_lexer import get_token_buffer
+from parsing.stack_parser import StackParser
+
+
+def describe(expr: Expr) -> Any:
+    if isinstance(expr, exprs.Binary):
+        return 'binary', str(expr.span), expr.operator.type, str(expr.operator.span), describe(expr.left), describe(expr.right)
+    if isinstance(expr, exprs.Grouping):
+        return 'grouping', str(expr.span), describe(expr.expression)
+    if isinstance(expr, exprs.Literal):
+        return 'literal', str(expr.span), expr.value
+    if isinstance(expr, exprs.Unary):
+        return 'unary', str(expr.span), expr.operator.type, str(expr.operator.span), describe(expr.expression)
+    if isinstance(expr, exprs.Variable):
+        return 'variable', str(expr.span), expr.name
+    raise Exception('Unexpected node {}'.format(expr))
+
+
+def describe_error(parser) -> str:
+    with pytest.raises(ParserException) as e:
+        parser.expression()
+    return '{} {}'.format(type(e.value).__name__, e.value)
+
+
+class TestStackParser:
+    @pytest.mark.parametrize('input', [
+        '123',
+        '"abc"',
+        'true == false',
+        '(123)',
+        '--!123',
+        '123 + 456 * 789',
+        '1 - 2 - 3 / 4 / 5',
+        '1 < 2 == 3 >= 4 != 5 <= 6 > 7',
+        '-(1 + 2) * !(3 - -4)\n + 5',
+        '((1 + 2) * (3 + (4)))',
+        'a + -b * (c_1 - a)',
+        '1 2',
+    ])
+    def test_matches_parser(self, input: str):
+        tokens = get_all_tokens(Lexer(input))
+
+        assert describe(StackParser(tokens).expression()) == describe(Parser(tokens).expression())
+
+    @pytest.mark.parametrize('input', [
+        '',
+        '1 +',
+        '(1 + 2',
+        '* 2',
+        '1 + (2 * )',
+        '(1 2)',
+        '-',
+    ])
+    def test_errors_match_parser(self, input: str):
+        tokens = get_all_tokens(Lexer(input))
+
+        assert describe_error(StackParser(tokens)) == describe_error(Parser(tokens))
+
+    def test_deep_nesting(self):
+        depth = 5000
+        expr = StackParser(get_token_buffer('(' * depth + '-1' + ')' * depth)).expression()
+
+        for _ in range(depth):
+            assert isinstance(expr, exprs.Grouping)
+            expr = expr.expression
+        assert isinstance(expr, exprs.Unary)
+
+    def test_long_chain(self):
+        expr = StackParser(get_token_buffer(' + '.join(['1'] * 5000))).expression()
+
+        assert str(expr.span) == 'line 1 offset 1-19998'
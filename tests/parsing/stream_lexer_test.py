@@ -0,0 +1,99 @@
+import io
+from typing import List, Tuple
+
+import pytest
+
+from parsing.lexer import get_all_tokens, Lexer, LexerException
+from parsing.source import highlight, SourceSpan
+from parsing.stream_lexer import MAX_LINE_PREFIX, StreamLexer
+
+
+def describe(lexer) -> List[Tuple[str, str, str, str]]:
+    return list(map(lambda x: (x.type, str(x.span), x.literal, highlight(x.span)), get_all_tokens(lexer)))
+
+
+def describe_error(lexer) -> Tuple[type, str]:
+    with pytest.raises(LexerException) as e:
+        get_all_tokens(lexer)
+    return type(e.value), str(e.value)
+
+
+inputs = [
+    '',
+    '1 + 2',
+    '1234 12.34 5',
+    'a abc and or true false _x1',
+    '! != = == < <= > >=',
+    '"Hello\nWorld" + "a"',
+    '+ //hello this is a comment\n+',
+    '1 + 2\n\n  * (3 - 4)\r\n',
+    '"a\nb\nc" + "d"\n"e" + 1\n',
+    'var a = 1;\n{ a = a + 2; }',
+]
+
+
+class TestStreamLexer:
+    @pytest.mark.parametrize('chunk_size', [1, 2, 3, 7, 1024])
+    @pytest.mark.parametrize('input', inputs)
+    def test_matches_lexer(self, input: str, chunk_size: int):
+        lexer = StreamLexer(io.StringIO(input), chunk_size)
+
+        assert describe(lexer) == describe(Lexer(input))
+
+    @pytest.mark.parametrize('chunk_size', [1, 3, 1024])
+    @pytest.mark.parametrize('input', [
+        '@',
+        '1 +\n  @ + 2\n3',
+        '"Hello\nWorld',
+        '1 + "a\nb\nc\n',
+    ])
+    def test_errors_match_lexer(self, input: str, chunk_size: int):
+        lexer = StreamLexer(io.StringIO(input), chunk_size)
+
+        assert describe_error(lexer) == describe_error(Lexer(input))
+
+    def test_yields_tokens_before_reaching_the_end_of_the_stream(self):
+        stream = io.StringIO('1 +\n2 +\n' * 100)
+        lexer = StreamLexer(stream, 8)
+
+        lexer.next()
+
+        assert stream.tell() < 100
+
+    def test_yields_tokens_before_the_end_of_a_long_line(self):
+        stream = io.StringIO('1 + ' * 1000)
+        lexer = StreamLexer(stream, 8)
+
+        lexer.next()
+
+        assert stream.tell() < 100
+
+    @pytest.mark.parametrize('chunk_size', [1, 5, 9])
+    def test_fragments_part_way_through_a_line(self, chunk_size: int):
+        input = 'a + "bc" + 12\n  + 3.5 // done\n'
+
+        tokens = get_all_tokens(StreamLexer(io.StringIO(input), chunk_size))
+
+        assert len({token.span.source for token in tokens}) > 2
+        assert describe(StreamLexer(io.StringIO(input), chunk_size)) == describe(Lexer(input))
+
+    def test_very_long_lines_keep_the_end_of_the_line(self):
+        input = '1 + ' * MAX_LINE_PREFIX + '@'
+
+        error = describe_error(StreamLexer(io.StringIO(input), 16))[1]
+
+        assert error.startswith('Invalid char \'@\' at line 1 offset {}'.format(len(input)))
+        # only the end of the line is kept, but the highlight still lines up with it
+        _, line, highlight = error.split('\n')
+        assert MAX_LINE_PREFIX < len(line) < len(input)
+        assert line.endswith('1 + @')
+        assert highlight == ' ' * (len(line) - 1) + '~'
+
+    def test_spans_from_different_fragments_can_be_joined(self):
+        tokens = get_all_tokens(StreamLexer(io.StringIO('1 +\n2 +\n3'), 2))
+
+        span = SourceSpan.from_spans(tokens[0].span, tokens[4].span)
+
+        assert tokens[0].span.source is not tokens[4].span.source
+        assert span.text() == '1 +\n2 +\n3'
+        assert highlight(span) == '1. 1 +\n   ~~~\n2. 2 +\n   ~~~\n3. 3\n   ~'
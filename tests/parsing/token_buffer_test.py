@@ -0,0 +1,67 @@
+import pytest
+
+import parsing.expr as exprs
+from parsing.lexer import get_all_tokens, Lexer, LexerException
+from parsing.parser import Parser, ParserException
+from parsing.regex_lexer import get_token_buffer
+from parsing.source import Source
+from parsing.token_buffer import TokenBuffer, TokenList
+
+
+def describe(tokens):
+    return list(map(lambda x: (x.type, str(x.span), x.literal), tokens))
+
+
+class TestTokenBuffer:
+    @pytest.mark.parametrize('input', [
+        '',
+        '1 + 2.5 * (3 - "abc")',
+        '! != == <= >= and or true false x',
+        '"a\nb" // comment\n + 1',
+    ])
+    def test_get_token_buffer_matches_lexer(self, input: str):
+        buffer = get_token_buffer(input)
+
+        assert describe(buffer[i] for i in range(len(buffer))) == describe(get_all_tokens(Lexer(input)))
+
+    def test_get_token_buffer_errors(self):
+        with pytest.raises(LexerException):
+            get_token_buffer('1 + @')
+
+    def test_from_tokens(self):
+        tokens = get_all_tokens(Lexer('1 + "a"'))
+
+        buffer = TokenBuffer.from_tokens(tokens)
+
+        assert describe(buffer[i] for i in range(len(buffer))) == describe(tokens)
+
+    def test_from_no_tokens(self):
+        source = Source('')
+
+        assert len(TokenBuffer.from_tokens([])) == 0
+        assert TokenBuffer.from_tokens([], source).source is source
+
+    def test_span_between(self):
+        input = '(1 + 2)'
+        buffer = get_token_buffer(input)
+
+        assert str(buffer.span_between(0, 4)) == 'line 1 offset 1-8'
+        assert str(TokenList(get_all_tokens(Lexer(input))).span_between(0, 4)) == 'line 1 offset 1-8'
+
+    def test_literal_is_none_without_value(self):
+        buffer = get_token_buffer('1 + "a"')
+
+        assert list(map(buffer.literal, range(len(buffer)))) == [1, None, 'a', None]
+
+    def test_parser_accepts_buffer(self):
+        expr = Parser(get_token_buffer('1 + 2 * 3')).expression()
+
+        assert isinstance(expr, exprs.Binary)
+        assert expr.operator.type == exprs.BinaryOperatorType.PLUS
+        assert str(expr.span) == 'line 1 offset 1-10'
+
+    def test_parser_error_from_buffer(self):
+        with pytest.raises(ParserException) as e:
+            Parser(get_token_buffer('(1 + 2')).expression()
+
+        assert str(e.value.token.span) == 'line 1 offset 7'
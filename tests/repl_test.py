@@ -0,0 +1,239 @@
+import io
+
+import pytest
+
+import parsing.expr as exprs
+from evaluation.shared_evaluator import SharedEvaluator
+from evaluation.type_checker import TypeException
+from parsing.cache import LruCache
+from parsing.expr import Expr
+from parsing.lexer import LexerException
+from parsing.parser import ParserException
+from parsing.token_buffer import TokenBuffer
+import repl
+from repl import load, parse_arguments, run
+
+
+class TestLoad:
+    @pytest.mark.parametrize('evaluator', ['recursive', 'stack', 'closure', 'vm', 'python', 'shared'])
+    def test_engines(self, evaluator: str):
+        assert load('1 + 2 * 3', evaluator=evaluator, cache=None)() == 7
+
+    @pytest.mark.parametrize('evaluator', ['recursive', 'stack', 'closure', 'vm', 'python', 'shared', 'adaptive'])
+    def test_comparisons(self, evaluator: str):
+        results = [load(input, evaluator=evaluator, cache=None)() for input in ['1 > 1', '2 > 1', '1 >= 1', '1 < 1', '1 <= 1']]
+
+        assert results == [False, True, True, False, True]
+
+    def test_shared_engine_shares_subtrees(self, monkeypatch):
+        evaluated = []
+
+        class RecordingEvaluator(SharedEvaluator):
+            def evaluate(self, expression: Expr):
+                evaluated.append(expression)
+                return super().evaluate(expression)
+
+        monkeypatch.setitem(repl.evaluator_engines, 'shared', RecordingEvaluator)
+
+        assert load('(1 + 2) * (1 + 2)', evaluator='shared', cache=None)() == 9
+        expr = evaluated[0]
+        assert isinstance(expr, exprs.Binary)
+        assert expr.left is expr.right
+
+    @pytest.mark.parametrize('parser', ['recursive', 'pratt', 'stack'])
+    def test_regex_lexer(self, parser: str):
+        assert isinstance(repl.tokenize('1 + 2', 'regex'), TokenBuffer)
+        assert load('(1 + 2) * 4 + "a"', lexer='regex', parser=parser, cache=None)() == '12a'
+
+    def test_optimize(self):
+        assert load('"a" + (1 + 2)', optimize=True, cache=None)() == 'a3'
+
+    def test_optimize_deep_input(self):
+        assert load('1 + ' * 5000 + '1', parser='stack', evaluator='stack', optimize=True, cache=None)() == 5001
+
+    def test_check(self):
+        assert load('-(1 + 2) * 3', check=True, cache=None)() == -9
+        with pytest.raises(TypeException):
+            load('1 - "a"', check=True, cache=None)
+
+    def test_skips_front_end_on_hit(self):
+        cache = LruCache(errors=(LexerException, ParserException))
+
+        first = load('1 + 2', cache=cache)
+        second = load('1 + 2', cache=cache)
+
+        assert first is second
+        assert cache.stats.hits == 1
+
+    def test_options_are_part_of_the_key(self):
+        cache = LruCache(errors=(LexerException, ParserException))
+
+        load('1 + 2', cache=cache)
+        load('1 + 2', evaluator='vm', cache=cache)
+        load('1 + 2', parser='pratt', cache=cache)
+
+        assert cache.stats.misses == 3
+
+    @pytest.mark.parametrize('input, error', [
+        ('1 + $', LexerException),
+        ('1 +', ParserException),
+    ])
+    def test_errors(self, input: str, error: type):
+        cache = LruCache(errors=(LexerException, ParserException))
+
+        with pytest.raises(error) as first:
+            load(input, cache=cache)
+        with pytest.raises(error) as second:
+            load(input, cache=cache)
+
+        assert str(first.value) == str(second.value)
+        assert cache.stats.misses == 1
+        assert cache.stats.hits == 1
+
+
+class TestRun:
+    def test_one_result_per_line(self):
+        output = io.StringIO()
+
+        summary = run(['1 + 2\n', '\n', '"a" + 1\n', '  !true  \n'], output, cache=None)
+
+        assert output.getvalue() == '3\na1\nFalse\n'
+        assert summary.evaluated == 3
+        assert summary.errors == 0
+
+    def test_errors_dont_stop_the_run(self):
+        output = io.StringIO()
+
+        summary = run(['1 / 0', '1 +', 'a', '4'], output, cache=None)
+
+        lines = output.getvalue().splitlines()
+        assert lines[0] == 'line 1: ZeroDivisionError: division by zero'
+        assert lines[1].startswith('line 2: Expected expression')
+        assert any(line.startswith('line 3: Undefined variable \'a\'') for line in lines)
+        assert lines[-1] == '4'
+        assert summary.errors == 3
+        assert str(summary).startswith('4 expressions, 3 errors in ')
+
+    def test_does_not_use_the_program_cache(self):
+        before = repl.program_cache.stats
+
+        run(['1 + 2', '3 + 4'], io.StringIO())
+
+        after = repl.program_cache.stats
+        assert (after.hits, after.misses) == (before.hits, before.misses)
+
+    def test_writes_in_batches(self, monkeypatch):
+        monkeypatch.setattr(repl, 'WRITE_BATCH_SIZE', 2)
+        output = io.StringIO()
+        writes = []
+        monkeypatch.setattr(output, 'write', lambda text: writes.append(text))
+
+        run(['1', '2', '3', '4', '5'], output, cache=None)
+
+        assert writes == ['1\n2\n', '3\n4\n', '5\n']
+
+    def test_reads_lazily(self):
+        def lines():
+            yield '1'
+            raise AssertionError('read past the first line')
+
+        evaluated = repl.evaluate_expressions(repl.read_expressions(lines()), cache=None)
+
+        assert next(evaluated) == (1, 1, None)
+
+    def test_prompt_uses_every_option(self, monkeypatch, capsys):
+        commands = iter(['-"a"', '1 + 2'])
+
+        def prompt(text: str) -> str:
+            command = next(commands, None)
+            if command is None:
+                raise EOFError
+            return command
+
+        loaded = []
+
+        def record(input: str, *args, **kwargs):
+            loaded.append((input, args, kwargs))
+            return load(input, *args, **kwargs)
+
+        monkeypatch.setattr('builtins.input', prompt)
+        monkeypatch.setattr(repl, 'load', record)
+        with pytest.raises(EOFError):
+            repl.main('regex', 'stack', 'vm', True, True)
+
+        assert [(args, kwargs) for _, args, kwargs in loaded] == [(('regex', 'stack', 'vm', True), {'check': True})] * 2
+        lines = capsys.readouterr().out.splitlines()
+        assert lines[0].startswith('Expected a number')
+        assert lines[-1] == '3'
+
+    def test_prompt_keeps_top_level_variables(self, monkeypatch, capsys):
+        commands = iter(['var a = 1; var b;', 'b = a + 1;', '{ var a = 10; b = a + b; }', 'a + b;', 'var a = "x"; a + b;'])
+
+        def prompt(text: str) -> str:
+            command = next(commands, None)
+            if command is None:
+                raise EOFError
+            return command
+
+        monkeypatch.setattr('builtins.input', prompt)
+        with pytest.raises(EOFError):
+            repl.main(statements=True)
+
+        assert capsys.readouterr().out.splitlines()[-2:] == ['13', 'x12']
+
+    def test_run_statements(self):
+        output = io.StringIO()
+
+        assert repl.run_statements('var a = 1;\n{ var b = a + 1; a = b * 10; }\na + 1;\n', output)
+        assert not repl.run_statements('var a = 1;\nvar a = 2;', output)
+
+        lines = output.getvalue().splitlines()
+        assert lines[0] == '21'
+        assert lines[1].startswith('Already a variable called \'a\' in this scope')
+
+    @pytest.mark.parametrize('lexer', ['char', 'regex'])
+    @pytest.mark.parametrize('parser', ['recursive', 'pratt', 'stack'])
+    def test_validate(self, lexer: str, parser: str):
+        output = io.StringIO()
+
+        errors = repl.validate(['1 + 2', '1 + $ @', '(1', '', '"a" + "b', '3 +'], output, lexer, parser)
+
+        lines = [line for line in output.getvalue().splitlines() if line.startswith('line ')]
+        assert errors == 7
+        assert [line.split(' at ')[0] for line in lines] == [
+            'line 2: Invalid char \'$\'',
+            'line 2: Invalid char \'@\'',
+            'line 2: Expected expression (TokenType.EOF',
+            'line 3: Expected \')\' after expression (expected TokenType.RIGHT_PAREN but got TokenType.EOF',
+            'line 5: Unterminated string',
+            'line 5: Expected expression (TokenType.EOF',
+            'line 6: Expected expression (TokenType.EOF',
+        ]
+
+    def test_validate_statements(self):
+        output = io.StringIO()
+
+        errors = repl.validate(['var a = ;\n', '{ 1 + $; }\n', 'var b = 2;\n'], output, statements=True)
+
+        assert errors == 3
+        assert [line.split(' at ')[0] for line in output.getvalue().splitlines() if line[0].isalpha()] == [
+            'Expected expression (TokenType.SEMICOLON',
+            'Invalid char \'$\'',
+            'Expected expression (TokenType.SEMICOLON',
+        ]
+
+    def test_validate_doesnt_evaluate(self):
+        assert repl.validate(['1 / 0', 'a', '-"a"'], io.StringIO()) == 0
+
+    def test_statements_need_the_recursive_engines(self):
+        with pytest.raises(SystemExit):
+            parse_arguments(['--statements', '--parser', 'pratt'])
+
+        assert parse_arguments(['--statements', '--lexer', 'regex']).statements
+
+    def test_arguments(self):
+        args = parse_arguments(['input.lox', '--evaluator', 'vm', '--optimize'])
+
+        assert args.file == 'input.lox'
+        assert args.evaluator == 'vm'
+        assert args.optimize
@@ -0,0 +1,210 @@
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List
+
+import pytest
+
+import server
+from parsing.cache import LruCache
+from parsing.lexer import LexerException
+from parsing.parser import ParserException
+from server import EvaluationServer
+
+
+def new_server(**options) -> EvaluationServer:
+    return EvaluationServer(cache=LruCache(errors=(LexerException, ParserException)), **options)
+
+
+async def request(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, *lines: str) -> List[Dict[str, Any]]:
+    writer.write(''.join(line + '\n' for line in lines).encode('utf-8'))
+    await writer.drain()
+    # blank lines aren't answered
+    return [json.loads(await reader.readline()) for line in lines if line]
+
+
+class CountingExecutor(ThreadPoolExecutor):
+    def __init__(self, max_workers: int) -> None:
+        super().__init__(max_workers)
+        self.submitted = 0
+
+    def submit(self, *args, **kwargs):
+        self.submitted += 1
+        return super().submit(*args, **kwargs)
+
+
+def run(test):
+    async def run_with_server(**options):
+        evaluation_server = new_server(**options)
+        listener = await evaluation_server.start_tcp()
+        port = listener.sockets[0].getsockname()[1]
+        try:
+            await test(evaluation_server, port)
+        finally:
+            listener.close()
+            await listener.wait_closed()
+
+    return run_with_server
+
+
+class TestEvaluationServer:
+    def test_results_in_order(self):
+        @run
+        async def test(evaluation_server: EvaluationServer, port: int):
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+
+            responses = await request(reader, writer, '1 + 2', '', '"a" + 1', '!true')
+
+            assert responses == [{'value': 3}, {'value': 'a1'}, {'value': False}]
+            writer.close()
+
+        asyncio.run(test())
+
+    def test_errors(self):
+        @run
+        async def test(evaluation_server: EvaluationServer, port: int):
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+
+            responses = await request(reader, writer, '1 + $', '1 +', 'a', '1 / 0', '4')
+
+            assert responses[0]['error'].startswith('Invalid char \'$\' at line 1 offset 5\n')
+            assert responses[1]['error'].startswith('Expected expression')
+            assert responses[2]['error'].startswith('Undefined variable \'a\'')
+            assert responses[3]['error'].startswith('ZeroDivisionError')
+            assert responses[4] == {'value': 4}
+            writer.close()
+
+        asyncio.run(test())
+
+    def test_values_json_cant_encode(self):
+        @run
+        async def test(evaluation_server: EvaluationServer, port: int):
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+
+            responses = await request(reader, writer, '1{}.0 * 10'.format('0' * 308), '4')
+
+            assert responses[0]['error'].startswith('ValueError: Out of range float values')
+            assert responses[1] == {'value': 4}
+            writer.close()
+
+        asyncio.run(test())
+
+    @pytest.mark.skipif(not hasattr(sys, 'set_int_max_str_digits'), reason='ints of any size convert to strings')
+    def test_ints_too_long_to_convert(self):
+        @run
+        async def test(evaluation_server: EvaluationServer, port: int):
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+
+            responses = await request(reader, writer, ' * '.join(['9' * 1000] * 5), '4')
+
+            assert responses[0]['error'].startswith('ValueError: Exceeds the limit')
+            assert responses[1] == {'value': 4}
+            writer.close()
+
+        asyncio.run(test())
+
+    def test_concurrent_clients(self):
+        @run
+        async def test(evaluation_server: EvaluationServer, port: int):
+            async def client(i: int):
+                reader, writer = await asyncio.open_connection('127.0.0.1', port)
+                responses = await request(reader, writer, *('{} * {}'.format(i, j) for j in range(20)))
+                writer.close()
+                return [response['value'] for response in responses]
+
+            results = await asyncio.gather(*(client(i) for i in range(10)))
+
+            assert results == [[i * j for j in range(20)] for i in range(10)]
+
+        asyncio.run(test(max_connections=10))
+
+    def test_connection_limit(self):
+        @run
+        async def test(evaluation_server: EvaluationServer, port: int):
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            assert await request(reader, writer, '1') == [{'value': 1}]
+
+            rejected_reader, rejected_writer = await asyncio.open_connection('127.0.0.1', port)
+
+            assert json.loads(await rejected_reader.readline()) == {'error': 'Too many connections'}
+            assert await rejected_reader.read() == b''
+            assert evaluation_server.connections == 1
+            writer.close()
+            rejected_writer.close()
+
+        asyncio.run(test(max_connections=1))
+
+    def test_long_lines(self):
+        @run
+        async def test(evaluation_server: EvaluationServer, port: int):
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            writer.write(b'1' * 2000 + b'\n')
+
+            assert json.loads(await reader.readline()) == {'error': 'Line is longer than 1024 bytes'}
+            assert await reader.read() == b''
+            writer.close()
+
+        asyncio.run(test(max_line=1024))
+
+    def test_idle_timeout(self):
+        @run
+        async def test(evaluation_server: EvaluationServer, port: int):
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+
+            assert json.loads(await reader.readline())['error'].startswith('Idle for more than')
+            writer.close()
+
+        asyncio.run(test(idle_timeout=0.05))
+
+    def test_unix_socket(self):
+        async def test(path: str):
+            listener = await new_server().start_unix(path)
+            reader, writer = await asyncio.open_unix_connection(path)
+
+            assert await request(reader, writer, '2 * 3') == [{'value': 6}]
+            writer.close()
+            listener.close()
+            await listener.wait_closed()
+
+        with tempfile.TemporaryDirectory() as directory:
+            asyncio.run(test(os.path.join(directory, 'plox.sock')))
+
+
+class TestEvaluate:
+    def test_offloads_long_inputs(self, monkeypatch):
+        monkeypatch.setattr(server, 'OFFLOAD_THRESHOLD', 4)
+        executor = ThreadPoolExecutor(1)
+
+        async def test():
+            evaluation_server = new_server(executor=executor)
+            assert await evaluation_server.evaluate('1 + 2') == {'value': 3}
+
+        asyncio.run(test())
+        assert executor._threads
+
+    def test_offloads_inputs_that_arent_cached(self):
+        executor = CountingExecutor(1)
+
+        async def test():
+            evaluation_server = new_server(executor=executor)
+            assert await evaluation_server.evaluate('1 + 2') == {'value': 3}
+            assert await evaluation_server.evaluate('1 + 2') == {'value': 3}
+            assert (await evaluation_server.evaluate('1 +'))['error'].startswith('Expected expression')
+            assert (await evaluation_server.evaluate('1 +'))['error'].startswith('Expected expression')
+
+        asyncio.run(test())
+        assert executor.submitted == 2
+
+    def test_timeout(self, monkeypatch):
+        monkeypatch.setattr(server, 'OFFLOAD_THRESHOLD', 0)
+        monkeypatch.setattr(server, 'load', lambda *args: lambda: time.sleep(0.5))
+
+        async def test():
+            evaluation_server = new_server(timeout=0.01)
+            assert await evaluation_server.evaluate('1') == {'error': 'Timed out after 0.01s'}
+
+        asyncio.run(test())
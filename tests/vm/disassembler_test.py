@@ -0,0 +1,44 @@
+from parsing.expr import Expr
+from vm.compiler import Compiler
+from vm.disassembler import disassemble
+
+
+def parse_expr(input: str) -> Expr:
+    from parsing.lexer import get_all_tokens, Lexer
+    from parsing.parser import Parser
+
+    lexer = Lexer(input)
+    tokens = get_all_tokens(lexer)
+
+    parser = Parser(tokens)
+    return parser.expression()
+
+
+class TestDisassembler:
+    def test_disassemble(self):
+        chunk = Compiler().compile(parse_expr('-(1 + 2) * "a"'))
+
+        result = disassemble(chunk, 'test')
+
+        assert result == '\n'.join([
+            '== test ==',
+            '0000 CONSTANT            0 1',
+            '0002 CONSTANT            1 2',
+            '0004 ADD',
+            '0005 NEGATE           ; line 1 offset 2-9',
+            '0006 CONSTANT            2 \'a\'',
+            '0008 MULTIPLY         ; line 1 offset 1-9, line 1 offset 12-15',
+            '0009 RETURN',
+        ])
+
+    def test_disassemble_variable(self):
+        chunk = Compiler().compile(parse_expr('-abc'))
+
+        result = disassemble(chunk, 'test')
+
+        assert result == '\n'.join([
+            '== test ==',
+            '0000 GET_VARIABLE        0 \'abc\' ; line 1 offset 2-5',
+            '0004 NEGATE           ; line 1 offset 2-5',
+            '0005 RETURN',
+        ])
@@ -0,0 +1,101 @@
+import pytest
+
+from evaluation.expr import ExprEvaluator, RuntimeException
+from evaluation.optimizer import Optimizer
+from parsing.expr import Expr
+from vm.chunk import Chunk, OpCode
+from vm.compiler import Compiler
+from vm.vm import VM
+
+
+def parse_expr(input: str) -> Expr:
+    from parsing.lexer import get_all_tokens, Lexer
+    from parsing.parser import Parser
+
+    lexer = Lexer(input)
+    tokens = get_all_tokens(lexer)
+
+    parser = Parser(tokens)
+    return parser.expression()
+
+
+class TestVM:
+    @pytest.mark.parametrize('input', [
+        '123',
+        '(123)',
+        '-123',
+        '1 + 2 * 3 - 4 / 8',
+        '"a" + "b"',
+        '"a" + 1.5',
+        'true + 1',
+        '!true == !!0',
+        '!"a"',
+        '-(1 - 2) * 3 < 9',
+        '1 > 1',
+        '2 <= 2',
+        '1 != 2',
+        '1 == 1.0',
+    ])
+    def test_matches_evaluator(self, input: str):
+        expr = parse_expr(input)
+
+        result = VM().run(Compiler().compile(expr))
+
+        assert result == ExprEvaluator().evaluate(expr)
+        assert type(result) is type(ExprEvaluator().evaluate(expr))
+
+    @pytest.mark.parametrize('input', [
+        '1 - "a"',
+        '"a" * 2',
+        '-"a" + 1',
+        '(1 + 2) * (3 - "x")',
+    ])
+    def test_errors_match_evaluator(self, input: str):
+        expr = parse_expr(input)
+        chunk = Compiler().compile(expr)
+
+        with pytest.raises(RuntimeException) as expected:
+            ExprEvaluator().evaluate(expr)
+        with pytest.raises(RuntimeException) as actual:
+            VM().run(chunk)
+
+        assert str(actual.value) == str(expected.value)
+
+    def test_constants_are_deduplicated(self):
+        chunk = Compiler().compile(parse_expr('1 + 1 + 1.0 + "1"'))
+
+        assert chunk.constants == [1, 1.0, '1']
+
+    def test_float_sign_is_kept(self):
+        chunk = Compiler().compile(Optimizer().optimize(parse_expr('a + 0.0 + "b" + -0.0 + "b"')))
+
+        assert [str(constant) for constant in chunk.constants] == ['a', '0.0', 'b', '-0.0']
+        assert VM({'a': ''}).run(chunk) == ExprEvaluator({'a': ''}).evaluate(parse_expr('a + 0.0 + "b" + -0.0 + "b"'))
+
+    def test_constant_long(self):
+        chunk = Chunk()
+        for i in range(300):
+            chunk.write_constant(i)
+        for _ in range(299):
+            chunk.write(OpCode.ADD)
+        chunk.write(OpCode.RETURN)
+
+        assert VM().run(chunk) == sum(range(300))
+
+    def test_variables(self):
+        variables = {'a': 1, 'b': 'x'}
+        chunk = Compiler().compile(parse_expr('a + b'))
+
+        assert VM(variables).run(chunk) == '1x'
+        variables['a'] = 2
+        assert VM(variables).run(chunk) == '2x'
+
+    def test_undefined_variable(self):
+        expr = parse_expr('1 + (2 * c)')
+
+        with pytest.raises(RuntimeException) as expected:
+            ExprEvaluator().evaluate(expr)
+        with pytest.raises(RuntimeException) as actual:
+            VM().evaluate(expr)
+
+        assert str(actual.value) == str(expected.value)
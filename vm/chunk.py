@@ -0,0 +1,88 @@
+from enum import IntEnum
+from typing import Any, Dict, Hashable, List, Tuple
+
+from parsing.expr import value_key
+from parsing.source import SourceSpan
+
+
+class OpCode(IntEnum):
+    CONSTANT = 0
+    CONSTANT_LONG = 1
+    TRUE = 2
+    FALSE = 3
+
+    ADD = 4
+    SUBTRACT = 5
+    MULTIPLY = 6
+    DIVIDE = 7
+    EQUAL = 8
+    NOT_EQUAL = 9
+    GREATER = 10
+    GREATER_EQUAL = 11
+    LESS = 12
+    LESS_EQUAL = 13
+
+    NEGATE = 14
+    NOT = 15
+
+    RETURN = 16
+
+    # followed by the 3 byte index of the constant holding the name
+    GET_VARIABLE = 17
+
+
+class Chunk:
+    def __init__(self) -> None:
+        self.__code = bytearray()
+        self.__constants: List[Any] = []
+        self.__constant_indices: Dict[Hashable, int] = {}
+        # spans of the operands of instructions that can raise, keyed by the offset of the instruction
+        self.__spans: Dict[int, Tuple[SourceSpan, ...]] = {}
+
+    @property
+    def code(self) -> bytearray:
+        return self.__code
+
+    @property
+    def constants(self) -> List[Any]:
+        return self.__constants
+
+    @property
+    def spans(self) -> Dict[int, Tuple[SourceSpan, ...]]:
+        return self.__spans
+
+    def write(self, op: OpCode, *spans: SourceSpan):
+        if len(spans):
+            self.__spans[len(self.__code)] = spans
+        self.__code.append(op)
+
+    def write_constant(self, value: Any):
+        index = self.add_constant(value)
+
+        if index < 256:
+            self.__code.append(OpCode.CONSTANT)
+            self.__code.append(index)
+        else:
+            self.__code.append(OpCode.CONSTANT_LONG)
+            self.__code.extend(index.to_bytes(3, 'little'))
+
+    def write_variable(self, name: str, span: SourceSpan):
+        index = self.add_constant(name)
+
+        self.write(OpCode.GET_VARIABLE, span)
+        self.__code.extend(index.to_bytes(3, 'little'))
+
+    def add_constant(self, value: Any) -> int:
+        # True == 1 == 1.0 and 0.0 == -0.0 in python, so the type and the sign of floats are part of the key
+        key = value_key(value)
+
+        index = self.__constant_indices.get(key)
+        if index is None:
+            index = len(self.__constants)
+            if index >= 1 << 24:
+                raise Exception('Too many constants in one chunk')
+
+            self.__constants.append(value)
+            self.__constant_indices[key] = index
+
+        return index
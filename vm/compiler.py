@@ -0,0 +1,74 @@
+from typing import Dict
+
+import parsing.expr as exprs
+from parsing.expr import Expr, ExprVisitor
+from vm.chunk import Chunk, OpCode
+
+binary_opcodes: Dict[exprs.BinaryOperatorType, OpCode] = {
+    exprs.BinaryOperatorType.MINUS: OpCode.SUBTRACT,
+    exprs.BinaryOperatorType.PLUS: OpCode.ADD,
+    exprs.BinaryOperatorType.MULTIPLY: OpCode.MULTIPLY,
+    exprs.BinaryOperatorType.DIVIDE: OpCode.DIVIDE,
+    exprs.BinaryOperatorType.NOT_EQUAL: OpCode.NOT_EQUAL,
+    exprs.BinaryOperatorType.EQUAL: OpCode.EQUAL,
+    exprs.BinaryOperatorType.GREATER: OpCode.GREATER,
+    exprs.BinaryOperatorType.GREATER_EQUAL: OpCode.GREATER_EQUAL,
+    exprs.BinaryOperatorType.LESS: OpCode.LESS,
+    exprs.BinaryOperatorType.LESS_EQUAL: OpCode.LESS_EQUAL,
+}
+unary_opcodes: Dict[exprs.UnaryOperatorType, OpCode] = {
+    exprs.UnaryOperatorType.NEGATE: OpCode.NEGATE,
+    exprs.UnaryOperatorType.NOT: OpCode.NOT,
+}
+
+
+class Compiler(ExprVisitor):
+    def __init__(self) -> None:
+        self.__chunk = Chunk()
+
+    def compile(self, expression: Expr) -> Chunk:
+        self.__chunk = Chunk()
+
+        expression.accept(self)
+        self.__chunk.write(OpCode.RETURN)
+
+        return self.__chunk
+
+    def visit_binary(self, node: exprs.Binary):
+        node.left.accept(self)
+        node.right.accept(self)
+
+        opcode = binary_opcodes.get(node.operator.type)
+        if opcode is None:
+            raise Exception('Handler for {} was None'.format(node.operator))
+
+        if opcode == OpCode.ADD:
+            self.__chunk.write(opcode)
+        else:
+            self.__chunk.write(opcode, node.left.span, node.right.span)
+
+    def visit_grouping(self, node: exprs.Grouping):
+        node.expression.accept(self)
+
+    def visit_literal(self, node: exprs.Literal):
+        if node.value is True:
+            self.__chunk.write(OpCode.TRUE)
+        elif node.value is False:
+            self.__chunk.write(OpCode.FALSE)
+        else:
+            self.__chunk.write_constant(node.value)
+
+    def visit_unary(self, node: exprs.Unary):
+        node.expression.accept(self)
+
+        opcode = unary_opcodes.get(node.operator.type)
+        if opcode is None:
+            raise Exception('Handler for {} was None'.format(node.operator))
+
+        if opcode == OpCode.NEGATE:
+            self.__chunk.write(opcode, node.expression.span)
+        else:
+            self.__chunk.write(opcode)
+
+    def visit_variable(self, node: exprs.Variable):
+        self.__chunk.write_variable(node.name, node.span)
@@ -0,0 +1,36 @@
+from typing import List, Tuple
+
+from vm.chunk import Chunk, OpCode
+
+
+def disassemble(chunk: Chunk, name: str) -> str:
+    output = ['== {} =='.format(name)]
+
+    offset = 0
+    while offset < len(chunk.code):
+        line, offset = disassemble_instruction(chunk, offset)
+        output.append(line)
+
+    return '\n'.join(output)
+
+
+def disassemble_instruction(chunk: Chunk, offset: int) -> Tuple[str, int]:
+    op = OpCode(chunk.code[offset])
+
+    columns: List[str] = ['{:04d}'.format(offset), '{:<16}'.format(op.name)]
+    next_offset = offset + 1
+
+    if op == OpCode.CONSTANT:
+        index = chunk.code[offset + 1]
+        columns.append('{:4d} {!r}'.format(index, chunk.constants[index]))
+        next_offset = offset + 2
+    elif op == OpCode.CONSTANT_LONG or op == OpCode.GET_VARIABLE:
+        index = int.from_bytes(chunk.code[offset + 1:offset + 4], 'little')
+        columns.append('{:4d} {!r}'.format(index, chunk.constants[index]))
+        next_offset = offset + 4
+
+    spans = chunk.spans.get(offset)
+    if spans is not None:
+        columns.append('; {}'.format(', '.join(map(str, spans))))
+
+    return ' '.join(columns).rstrip(), next_offset
@@ -0,0 +1,88 @@
+from typing import Any, Dict, List, Optional
+
+from evaluation.expr import is_truthy, lookup_variable, numeric_binary_operations, RuntimeException, to_string
+from parsing.expr import Expr
+from vm.chunk import Chunk, OpCode
+from vm.compiler import binary_opcodes, Compiler
+
+CONSTANT = OpCode.CONSTANT.value
+CONSTANT_LONG = OpCode.CONSTANT_LONG.value
+TRUE = OpCode.TRUE.value
+FALSE = OpCode.FALSE.value
+ADD = OpCode.ADD.value
+NEGATE = OpCode.NEGATE.value
+NOT = OpCode.NOT.value
+RETURN = OpCode.RETURN.value
+GET_VARIABLE = OpCode.GET_VARIABLE.value
+
+# indexed by opcode, every binary opcode apart from ADD checks its operands are numbers
+numeric_operations: List[Optional[Any]] = [None] * len(OpCode)
+for operator_type, opcode in binary_opcodes.items():
+    if opcode != OpCode.ADD:
+        numeric_operations[opcode] = numeric_binary_operations[operator_type]
+
+
+class VM:
+    def __init__(self, variables: Optional[Dict[str, Any]] = None) -> None:
+        self.__variables = variables if variables is not None else {}
+
+    def evaluate(self, expression: Expr):
+        return self.run(Compiler().compile(expression))
+
+    def run(self, chunk: Chunk) -> Any:
+        code = chunk.code
+        constants = chunk.constants
+        stack: List[Any] = []
+        push = stack.append
+        pop = stack.pop
+        number = (int, float)
+        ip = 0
+
+        while True:
+            instruction = code[ip]
+            ip += 1
+
+            if instruction == CONSTANT:
+                push(constants[code[ip]])
+                ip += 1
+            elif instruction == ADD:
+                right = pop()
+                left = stack[-1]
+                if isinstance(left, str) or isinstance(right, str):
+                    stack[-1] = '{}{}'.format(to_string(left), to_string(right))
+                else:
+                    stack[-1] = left + right
+            elif instruction < NEGATE:
+                operation = numeric_operations[instruction]
+                if operation is not None:
+                    right = pop()
+                    left = stack[-1]
+                    if not isinstance(left, number):
+                        raise RuntimeException(chunk.spans[ip - 1][0], 'Expected a number')
+                    if not isinstance(right, number):
+                        raise RuntimeException(chunk.spans[ip - 1][1], 'Expected a number')
+                    stack[-1] = operation(left, right)
+                elif instruction == TRUE:
+                    push(True)
+                elif instruction == FALSE:
+                    push(False)
+                elif instruction == CONSTANT_LONG:
+                    push(constants[int.from_bytes(code[ip:ip + 3], 'little')])
+                    ip += 3
+                else:
+                    raise Exception('Unknown instruction {}'.format(instruction))
+            elif instruction == NEGATE:
+                value = stack[-1]
+                if not isinstance(value, number):
+                    raise RuntimeException(chunk.spans[ip - 1][0], 'Expected a number')
+                stack[-1] = -value
+            elif instruction == NOT:
+                stack[-1] = not is_truthy(stack[-1])
+            elif instruction == RETURN:
+                return pop()
+            elif instruction == GET_VARIABLE:
+                name = constants[int.from_bytes(code[ip:ip + 3], 'little')]
+                push(lookup_variable(self.__variables, chunk.spans[ip - 1][0], name))
+                ip += 3
+            else:
+                raise Exception('Unknown instruction {}'.format(instruction))